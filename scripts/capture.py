@@ -0,0 +1,444 @@
+# ==================================================================
+# capture.py — v1.0 (2026-10-17)
+# ==================================================================
+# Screen-capture ring buffer for state-aware automation.
+#
+# The farm scripts are blind: they only send keys. This module is the
+# plumbing a vision check needs — fast, cheap frames of a few regions
+# of interest (ROIs) of the FF8 window:
+#
+#   ROI(name, x, y, width, height)   client-area pixels, see ROIS
+#
+# ROIS are laid out for a BASE_SIZE (1280x720) client area;
+# window_rois() scales them to the game window's actual client size
+# and refuses a window of another aspect ratio, where the layout —
+# and so every region — would be off.
+#
+# A CaptureThread grabs every ROI from a source at a fixed rate into
+# a FrameRing: one preallocated uint8 array per ROI,
+#
+#   (capacity, height, width, 4)   BGRA, as GDI returns it
+#
+# plus a capture timestamp per slot (perf_counter clock). The writer
+# fills preallocated slot views in place, so a frame allocates no
+# buffers. Readers get views into the ring, never copies:
+#
+#   frame, t, seq = ring.latest("gil")
+#   ...inspect frame...
+#   if not ring.valid(seq): the writer lapped it; discard the result
+#
+# Sources:
+#   GdiSource    — Windows: BitBlt of each ROI of the game window into
+#                  a DIB section (ctypes, no extra packages)
+#   ReplaySource — frames from a recording (save_recording), for
+#                  offline work and testing on any platform
+#
+# change_times() lists when an ROI changed, the screen-change
+# timestamps frames.estimate_grid() fits the game's frame grid to.
+#
+# Requires NumPy (pip install numpy).
+#
+# Benchmark (replay of a synthetic recording; --live grabs the game
+# window on Windows):
+#   python capture.py
+#   python capture.py --roi 400x60 --rois 3 --fps 60
+#   python capture.py --live --record frames.npz --frames 600
+# ==================================================================
+
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+
+class ROI(NamedTuple):
+    name: str
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+# ----------------------------
+# CONFIG
+# ----------------------------
+# Regions of the game window's client area at BASE_SIZE (borderless
+# windowed); window_rois() scales them to other 16:9 sizes.
+BASE_SIZE = (1280, 720)
+ROIS = (
+    ROI("gil", 1000, 640, 240, 40),           # gil counter, bottom right
+    ROI("cursor_column", 40, 140, 60, 480),   # menu cursor column
+    ROI("menu_title", 40, 20, 480, 56),       # menu title bar
+)
+WINDOW_TITLE = "FINAL FANTASY VIII"
+CAPACITY = 256     # frames kept per ROI (~4 s at 60 fps)
+CAPTURE_FPS = 60
+CHANNELS = 4       # BGRA
+ASPECT_TOLERANCE = 0.01  # client areas further than this from 16:9 are refused
+
+
+def scaled(rois, width: int, height: int, base=BASE_SIZE) -> tuple:
+    """`rois` laid out for a `base` client area, scaled to width x height."""
+    base_width, base_height = base
+    if abs(width * base_height / (height * base_width) - 1) > ASPECT_TOLERANCE:
+        raise ValueError(f"Client area {width}x{height} is not {base_width}x{base_height}'s aspect ratio; "
+                         f"the ROIs would not cover their regions")
+    sx, sy = width / base_width, height / base_height
+    return tuple(ROI(r.name, round(r.x * sx), round(r.y * sy), max(1, round(r.width * sx)),
+                     max(1, round(r.height * sy))) for r in rois)
+
+
+def client_size(title: str = WINDOW_TITLE) -> tuple:
+    """(width, height) of the game window's client area (Windows only)."""
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    user32.FindWindowW.restype = wintypes.HWND
+    user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    hwnd = user32.FindWindowW(None, title)
+    if not hwnd:
+        raise RuntimeError(f"Window {title!r} not found")
+    rect = wintypes.RECT()
+    user32.GetClientRect(hwnd, ctypes.byref(rect))
+    return rect.right - rect.left, rect.bottom - rect.top
+
+
+def window_rois(rois=ROIS, title: str = WINDOW_TITLE) -> tuple:
+    """`rois` scaled to the game window's current client area (Windows only)."""
+    return scaled(rois, *client_size(title))
+
+
+# ----------------------------
+# RING BUFFER
+# ----------------------------
+class FrameRing:
+    """Preallocated frames per ROI; one writer, any number of view readers."""
+
+    def __init__(self, rois=ROIS, capacity: int = CAPACITY):
+        self.rois = tuple(rois)
+        self.capacity = capacity
+        self.frames = {r.name: np.zeros((capacity, r.height, r.width, CHANNELS), np.uint8) for r in self.rois}
+        self.times = np.zeros(capacity)
+        self.count = 0  # frames committed; frame `seq` lives in slot seq % capacity
+        # Writer views per slot, in ROI order, built once.
+        self._slots = [tuple(self.frames[r.name][i] for r in self.rois) for i in range(capacity)]
+
+    def slot(self) -> tuple:
+        """Views the writer fills for the next frame (ROI order)."""
+        return self._slots[self.count % self.capacity]
+
+    def commit(self, t: float) -> None:
+        """Publish the filled slot, captured at `t`."""
+        self.times[self.count % self.capacity] = t
+        self.count += 1
+
+    def valid(self, seq: int) -> bool:
+        """True while frame `seq` is in the ring and not being overwritten."""
+        return 0 <= seq < self.count and self.count - seq < self.capacity
+
+    def get(self, seq: int, name: str):
+        """View of ROI `name` in frame `seq`."""
+        if not self.valid(seq):
+            raise LookupError(f"frame {seq} is not in the ring (frames {self.count})")
+        return self.frames[name][seq % self.capacity]
+
+    def latest(self, name: str):
+        """(view, capture time, seq) of the newest frame of ROI `name`."""
+        seq = self.count - 1
+        if seq < 0:
+            raise LookupError("no frames captured yet")
+        i = seq % self.capacity
+        return self.frames[name][i], float(self.times[i]), seq
+
+    def oldest(self) -> int:
+        """Seq of the oldest frame that is safe to read."""
+        return max(0, self.count - self.capacity + 1)
+
+
+def change_times(ring: FrameRing, name: str) -> list:
+    """Capture times of the frames in which ROI `name` differs from the one before."""
+    times = []
+    prev = None
+    for seq in range(ring.oldest(), ring.count):
+        frame = ring.get(seq, name)
+        if prev is not None and not np.array_equal(frame, prev):
+            times.append(float(ring.times[seq % ring.capacity]))
+        prev = frame
+    return times
+
+
+# ----------------------------
+# SOURCES
+# ----------------------------
+class GdiSource:
+    """Copies each ROI of the game window's client area (Windows only)."""
+
+    SRCCOPY = 0x00CC0020
+
+    def __init__(self, rois=ROIS, title: str = WINDOW_TITLE):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        gdi32 = ctypes.windll.gdi32
+        user32.FindWindowW.restype = wintypes.HWND
+        user32.GetDC.argtypes = [wintypes.HWND]
+        user32.GetDC.restype = wintypes.HDC
+        user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.c_void_p, wintypes.UINT,
+                                           ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+        gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+        gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                 wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+        gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG), ("biHeight", wintypes.LONG),
+                        ("biPlanes", wintypes.WORD), ("biBitCount", wintypes.WORD),
+                        ("biCompression", wintypes.DWORD), ("biSizeImage", wintypes.DWORD),
+                        ("biXPelsPerMeter", wintypes.LONG), ("biYPelsPerMeter", wintypes.LONG),
+                        ("biClrUsed", wintypes.DWORD), ("biClrImportant", wintypes.DWORD)]
+
+        self.hwnd = user32.FindWindowW(None, title)
+        if not self.hwnd:
+            raise RuntimeError(f"Window {title!r} not found")
+        self.user32 = user32
+        self.gdi32 = gdi32
+        self.window_dc = user32.GetDC(self.hwnd)
+        self._blits = []  # (memory DC, x, y, width, height, DIB pixels as an array view)
+        self._handles = []
+        for r in rois:
+            header = BITMAPINFOHEADER(ctypes.sizeof(BITMAPINFOHEADER), r.width, -r.height, 1, 32, 0)  # top-down
+            bits = ctypes.c_void_p()
+            bitmap = gdi32.CreateDIBSection(self.window_dc, ctypes.byref(header), 0, ctypes.byref(bits), None, 0)
+            memory_dc = gdi32.CreateCompatibleDC(self.window_dc)
+            gdi32.SelectObject(memory_dc, bitmap)
+            pixels = (ctypes.c_uint8 * (r.width * r.height * CHANNELS)).from_address(bits.value)
+            view = np.frombuffer(pixels, np.uint8).reshape(r.height, r.width, CHANNELS)
+            self._blits.append((memory_dc, r.x, r.y, r.width, r.height, view))
+            self._handles.append((memory_dc, bitmap))
+        self._bitblt = gdi32.BitBlt
+        self._flush = gdi32.GdiFlush
+
+    def grab(self, views) -> bool:
+        bitblt = self._bitblt
+        window_dc = self.window_dc
+        for memory_dc, x, y, width, height, _ in self._blits:
+            bitblt(memory_dc, 0, 0, width, height, window_dc, x, y, self.SRCCOPY)
+        self._flush()
+        for blit, dst in zip(self._blits, views):
+            np.copyto(dst, blit[5])
+        return True
+
+    def close(self) -> None:
+        for memory_dc, bitmap in self._handles:
+            self.gdi32.DeleteDC(memory_dc)
+            self.gdi32.DeleteObject(bitmap)
+        self._handles = []
+        self.user32.ReleaseDC(self.hwnd, self.window_dc)
+
+
+class ReplaySource:
+    """Replays recorded frames in order (a save_recording file or its dict)."""
+
+    def __init__(self, recording, rois=ROIS, loop: bool = True):
+        data = np.load(recording) if isinstance(recording, str) else recording
+        self.times = np.asarray(data["times"])
+        arrays = []
+        for r in rois:
+            frames = np.asarray(data[r.name])
+            if frames.shape[1:] != (r.height, r.width, CHANNELS):
+                raise ValueError(f"Recording has {r.name} frames of {frames.shape[1:]}, "
+                                 f"ROI needs {(r.height, r.width, CHANNELS)}")
+            arrays.append(frames)
+        # Source views per recorded frame, built once.
+        self._frames = [tuple(a[i] for a in arrays) for i in range(len(self.times))]
+        self.loop = loop
+        self.position = 0
+
+    @property
+    def interval(self) -> float:
+        """Recorded seconds between frames (median)."""
+        if len(self.times) < 2:
+            return 0.0
+        return float(np.median(np.diff(self.times)))
+
+    def grab(self, views) -> bool:
+        i = self.position
+        if i == len(self._frames):
+            if not self.loop:
+                return False
+            i = 0
+        for dst, src in zip(views, self._frames[i]):
+            np.copyto(dst, src)
+        self.position = i + 1
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def save_recording(ring: FrameRing, path: str) -> int:
+    """Write the ring's readable frames, oldest first, for ReplaySource; returns frames."""
+    seqs = range(ring.oldest(), ring.count)
+    slots = [seq % ring.capacity for seq in seqs]
+    np.savez_compressed(path, times=ring.times[slots],
+                        **{name: frames[slots] for name, frames in ring.frames.items()})
+    return len(slots)
+
+
+def synthetic_recording(rois=ROIS, frames: int = 120, fps: float = CAPTURE_FPS) -> dict:
+    """A recording with a bar sweeping across every ROI (tests, benchmarks)."""
+    data = {"times": np.arange(frames) / fps}
+    for r in rois:
+        clip = np.zeros((frames, r.height, r.width, CHANNELS), np.uint8)
+        for i in range(frames):
+            x = i * max(1, r.width // 16) % r.width
+            clip[i, :, x:x + 4] = 255
+        data[r.name] = clip
+    return data
+
+
+# ----------------------------
+# CAPTURE THREAD
+# ----------------------------
+class CaptureThread(threading.Thread):
+    """Grabs `source` into `ring` every 1/fps seconds (fps 0: as fast as it can)."""
+
+    def __init__(self, source, ring: FrameRing, fps: float = CAPTURE_FPS):
+        super().__init__(name="capture", daemon=True)
+        self.source = source
+        self.ring = ring
+        self.interval = 1 / fps if fps else 0.0
+        self.cpu = 0.0      # CPU seconds spent by this thread
+        self.skipped = 0    # capture deadlines missed (frames not taken)
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        clock = time.perf_counter
+        grab = self.source.grab
+        ring = self.ring
+        interval = self.interval
+        stopped = self._halt.is_set
+        cpu_start = time.thread_time()
+        deadline = clock()
+        try:
+            while not stopped():
+                if interval:
+                    delay = deadline - clock()
+                    if delay > 0:
+                        time.sleep(delay)
+                    elif delay < -interval:
+                        missed = int(-delay / interval)
+                        self.skipped += missed
+                        deadline += missed * interval
+                    deadline += interval
+                if not grab(ring.slot()):
+                    break
+                ring.commit(clock())
+        finally:
+            self.cpu = time.thread_time() - cpu_start
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def _measure(source, rois, seconds: float, fps: float):
+    ring = FrameRing(rois)
+    thread = CaptureThread(source, ring, fps)
+    start = time.perf_counter()
+    thread.start()
+    time.sleep(seconds)
+    thread.stop()
+    wall = time.perf_counter() - start
+    return ring.count, wall, thread.cpu
+
+
+def _allocated_per_frame(source, rois, frames: int = 2000) -> float:
+    """Net traced bytes per grab+commit (buffers would show up here)."""
+    import tracemalloc
+
+    ring = FrameRing(rois)
+    clock = time.perf_counter
+    for _ in range(10):
+        source.grab(ring.slot())
+        ring.commit(clock())
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(frames):
+        source.grab(ring.slot())
+        ring.commit(clock())
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / frames
+
+
+def _bench(width: int, height: int, count: int, seconds: float, fps: float, live: bool) -> None:
+    if live:
+        rois = window_rois()
+        source = GdiSource(rois)
+        label = f"{WINDOW_TITLE} window"
+    else:
+        rois = tuple(ROI(f"roi{i}", 0, 0, width, height) for i in range(count))
+        source = ReplaySource(synthetic_recording(rois), rois)
+        label = "synthetic replay"
+    pixels = sum(r.width * r.height for r in rois)
+    print(f"Source:                   {label}, {len(rois)} ROIs, {pixels:,} px per frame")
+    try:
+        frames, wall, cpu = _measure(source, rois, seconds, 0)
+        print(f"Unpaced:                  {frames / wall:,.0f} frames/s, "
+              f"{cpu / frames * 1000:.3f}ms CPU per frame")
+        frames, wall, cpu = _measure(source, rois, seconds, fps)
+        print(f"At {fps:g} fps:                {frames / wall:,.1f} frames/s, "
+              f"{cpu / wall * 100:.1f}% of one core")
+        print(f"Allocated per frame:      {_allocated_per_frame(source, rois):.1f} bytes (net)")
+    finally:
+        source.close()
+
+
+def _record(path: str, frames: int, fps: float) -> None:
+    rois = window_rois()
+    source = GdiSource(rois)
+    ring = FrameRing(rois, capacity=frames)
+    thread = CaptureThread(source, ring, fps)
+    thread.start()
+    while ring.count < frames - 1:
+        time.sleep(0.1)
+    thread.stop()
+    source.close()
+    print(f"Saved {save_recording(ring, path)} frames of {len(rois)} ROIs to {path}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure ROI capture throughput and CPU cost.")
+    parser.add_argument("--roi", default="240x40", help="ROI size WxH for the synthetic replay")
+    parser.add_argument("--rois", type=int, default=3, help="number of ROIs for the synthetic replay")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each measurement")
+    parser.add_argument("--fps", type=float, default=CAPTURE_FPS, help="paced capture rate")
+    parser.add_argument("--live", action="store_true", help="grab the game window (Windows) instead")
+    parser.add_argument("--record", metavar="PATH", help="with --live: save a recording for ReplaySource")
+    parser.add_argument("--frames", type=int, default=CAPACITY, help="frames to record")
+    args = parser.parse_args()
+    if args.live and sys.platform != "win32":
+        parser.error("--live needs Windows (GDI)")
+    if args.record:
+        if not args.live:
+            parser.error("--record needs --live")
+        _record(args.record, args.frames, args.fps)
+    else:
+        w, h = (int(v) for v in args.roi.lower().split("x"))
+        _bench(w, h, args.rois, args.seconds, args.fps, args.live)
@@ -0,0 +1,424 @@
+# ==================================================================
+# emitter.py — v1.0 (2026-10-17)
+# ==================================================================
+# Bulk keyboard emitter for compiled key programs.
+#
+# A burst is a list of timestamped inputs:
+#
+#   (offset, code, is_up)
+#     offset — seconds from burst start
+#     code   — DirectInput scan code (keyprog.KEY_CODES)
+#     is_up  — False = key-down, True = key-up
+#
+# Inputs that share an offset are submitted together in ONE OS call
+# (a SendInput array on Windows), so a key-up and the next key-down
+# of a zero-spaced run go out in a single call. Key-down and key-up of
+# one press never share an offset: every press is held at least
+# MIN_HOLD_S (one frame), because a game that reads the keyboard state
+# once per frame can miss a shorter press. Groups are
+# placed on the scheduler's absolute timeline (scheduler.py), so call
+# overhead and sleep overshoot do not add to the configured spacing.
+#
+# OS layers (pluggable):
+#   SendInputLayer — Windows user32.SendInput via ctypes
+#   NullLayer      — records every input with its send timestamp;
+#                    used for benchmarking on any platform
+#
+# Keyboard is the same layers behind pydirectinput's press/keyDown/
+# keyUp signatures, for scripts that press keys directly instead of
+# running a compiled program (use_x_stat_boost.py): key names become
+# scan-code inputs once at startup, with no per-call mapping lookup,
+# fail-safe mouse check or global PAUSE.
+#
+# Benchmark (any platform, uses NullLayer):
+#   python emitter.py
+#   python emitter.py "10xUp, Enter" --spacing 0.02
+#   python emitter.py --console-ms 60    # inline vs emitter thread with slow logging
+#   python emitter.py --press 10000      # Keyboard.press vs pydirectinput.press per press
+# ==================================================================
+
+import sys
+import time
+
+from keyprog import KEY_CODES
+from scheduler import default_scheduler
+
+MIN_HOLD_S = 1 / 60  # shortest key-down → key-up: one frame at 60 fps
+
+# Arrow keys are sent with the extended-key flag (as pydirectinput does).
+EXTENDED_CODES = {KEY_CODES["up"], KEY_CODES["down"], KEY_CODES["left"], KEY_CODES["right"]}
+
+
+# ----------------------------
+# OS LAYERS
+# ----------------------------
+class NullLayer:
+    """Records inputs instead of sending them."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.calls = 0
+        self.log = []  # (timestamp, code, is_up)
+
+    def send(self, inputs) -> int:
+        now = self.clock()
+        self.calls += 1
+        self.log.extend((now, code, is_up) for code, is_up in inputs)
+        return len(inputs)
+
+
+class SendInputLayer:
+    """Submits input arrays through user32.SendInput (Windows only)."""
+
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_SCANCODE = 0x0008
+    INPUT_KEYBOARD = 1
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        ulong_ptr = ctypes.c_size_t
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD),
+                        ("dwExtraInfo", ulong_ptr)]
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG),
+                        ("mouseData", wintypes.DWORD), ("dwFlags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ulong_ptr)]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+        self._INPUT = INPUT
+        self._size = ctypes.sizeof(INPUT)
+        self._send = ctypes.windll.user32.SendInput
+        # Preresolve one INPUT per (code, is_up); arrays are built by copying.
+        self._templates = {}
+        for code in KEY_CODES.values():
+            for is_up in (False, True):
+                flags = self.KEYEVENTF_SCANCODE
+                if code in EXTENDED_CODES:
+                    flags |= self.KEYEVENTF_EXTENDEDKEY
+                if is_up:
+                    flags |= self.KEYEVENTF_KEYUP
+                inp = INPUT(type=self.INPUT_KEYBOARD)
+                inp.u.ki = KEYBDINPUT(0, code, flags, 0, 0)
+                self._templates[code, is_up] = inp
+        # Built INPUT arrays by input tuple: a program group or a tap is
+        # built on its first send (or prepare) and reused from then on.
+        self._arrays = {}
+
+    def prepare(self, inputs) -> None:
+        """Build the INPUT array for `inputs` ahead of its first send."""
+        if inputs not in self._arrays:
+            self._arrays[inputs] = (self._INPUT * len(inputs))(*(self._templates[i] for i in inputs))
+
+    def send(self, inputs) -> int:
+        arr = self._arrays.get(inputs)
+        if arr is None:
+            self.prepare(inputs)
+            arr = self._arrays[inputs]
+        return self._send(len(inputs), arr, self._size)
+
+
+def default_layer():
+    if sys.platform == "win32":
+        return SendInputLayer()
+    return NullLayer()
+
+
+# ----------------------------
+# BURSTS
+# ----------------------------
+def program_to_burst(events, min_hold: float = MIN_HOLD_S):
+    """
+    Convert keyprog events (code, hold, delay) to a timestamped burst.
+    Holds shorter than `min_hold` are lengthened out of the delay that
+    follows, so key-downs stay where the program put them.
+    """
+    burst = []
+    t = 0.0
+    for code, hold, delay in events:
+        burst.append((t, code, False))
+        held = max(hold, min_hold)
+        t += held
+        burst.append((t, code, True))
+        t += max(0.0, delay - (held - hold))
+    return burst
+
+
+def group_burst(burst):
+    """Group inputs that share an offset into (offset, [(code, is_up), ...])."""
+    groups = []
+    for offset, code, is_up in burst:
+        if groups and groups[-1][0] == offset:
+            groups[-1][1].append((code, is_up))
+        else:
+            groups.append((offset, [(code, is_up)]))
+    return [(offset, tuple(inputs)) for offset, inputs in groups]
+
+
+def parse_burst_spec(spec: str, spacing: float = 0.0):
+    """
+    Parse "10xUp, Enter" (or "10×Up") into keyprog events with
+    `spacing` seconds after each press.
+    """
+    from keyprog import Event
+
+    events = []
+    for part in spec.split(","):
+        part = part.strip().lower().replace("×", "x")
+        if not part:
+            continue
+        count, sep, key = part.partition("x")
+        if sep and count.isdigit():
+            times = int(count)
+        else:
+            times, key = 1, part
+        try:
+            code = KEY_CODES[key.strip()]
+        except KeyError:
+            raise ValueError(f"Unknown key in burst spec: {key.strip()!r}") from None
+        events.extend(Event(code, 0.0, spacing) for _ in range(times))
+    return events
+
+
+# ----------------------------
+# EMITTER
+# ----------------------------
+class Emitter:
+    """keyprog backend that submits each program as grouped bursts."""
+
+    def __init__(self, layer=None, scheduler=None):
+        self.layer = layer if layer is not None else default_layer()
+        self.scheduler = scheduler if scheduler is not None else default_scheduler()
+        self._cache = {}
+
+    def key_down(self, code: int) -> None:
+        self.layer.send(((code, False),))
+
+    def key_up(self, code: int) -> None:
+        self.layer.send(((code, True),))
+
+    def groups_for(self, program):
+        """Grouped burst and duration for a compiled program (cached)."""
+        cached = self._cache.get(program)
+        if cached is None:
+            burst = program_to_burst(program.events)
+            end = max(program.duration, burst[-1][0] if burst else 0.0)
+            cached = self._cache[program] = (group_burst(burst), end)
+        return cached
+
+    def prepare(self, program) -> None:
+        """Build everything run_program(program) needs, before it runs."""
+        groups, _ = self.groups_for(program)
+        prepare = getattr(self.layer, "prepare", None)
+        if prepare is not None:
+            for _, inputs in groups:
+                prepare(inputs)
+
+    def emit_groups(self, groups, duration: float = 0.0) -> float:
+        """Send grouped inputs on the scheduler timeline; returns start time."""
+        send = self.layer.send
+        sched = self.scheduler
+        wait_until = sched.wait_until
+        start = sched.begin()
+        for offset, inputs in groups:
+            wait_until(start + offset)
+            send(inputs)
+        sched.end(start + duration)
+        return start
+
+    def emit_burst(self, burst) -> float:
+        return self.emit_groups(group_burst(burst))
+
+    def run_program(self, program) -> None:
+        groups, duration = self.groups_for(program)
+        self.emit_groups(groups, duration)
+
+
+class Keyboard:
+    """
+    pydirectinput-style press/keyDown/keyUp (same signatures) on an OS
+    layer. Key names are resolved to scan-code inputs once, here; a
+    call does no mapping lookup, fail-safe mouse check or global PAUSE
+    sleep. A press holds its key for `hold` (at least MIN_HOLD_S by
+    default); spacing comes from the caller's `interval`, both on the
+    scheduler timeline.
+    """
+
+    def __init__(self, layer=None, scheduler=None, hold: float = MIN_HOLD_S):
+        self.layer = layer if layer is not None else default_layer()
+        self.scheduler = scheduler if scheduler is not None else default_scheduler()
+        self.hold = hold
+        self._down = {name: ((code, False),) for name, code in KEY_CODES.items()}
+        self._up = {name: ((code, True),) for name, code in KEY_CODES.items()}
+
+    def keyDown(self, key: str) -> None:
+        self.layer.send(self._down[key])
+
+    def keyUp(self, key: str) -> None:
+        self.layer.send(self._up[key])
+
+    def press(self, key: str, presses: int = 1, interval: float = 0.0) -> None:
+        """Press `key` `presses` times, held `hold` each, `interval` after every key-up."""
+        down, up = self._down[key], self._up[key]
+        send = self.layer.send
+        hold = self.hold
+        sched = self.scheduler
+        wait_until = sched.wait_until
+        t = sched.begin()
+        for _ in range(presses):
+            send(down)
+            t += hold
+            wait_until(t)
+            send(up)
+            t += interval
+            wait_until(t)
+        sched.end(t)
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def _bench(spec: str, spacing: float, repeats: int) -> None:
+    from keyprog import Program
+
+    program = Program(spec, parse_burst_spec(spec, spacing))
+    presses = len(program)
+
+    # Per-press path: one call for key-down, one for key-up, then a sleep.
+    per_press = NullLayer()
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for code, hold, delay in program.events:
+            per_press.send(((code, False),))
+            per_press.send(((code, True),))
+            if delay:
+                time.sleep(delay)
+    per_press_s = (time.perf_counter() - t0) / repeats
+
+    bulk = NullLayer()
+    emitter = Emitter(bulk)
+    emitter.scheduler.reset()
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        emitter.run_program(program)
+    bulk_s = (time.perf_counter() - t0) / repeats
+
+    # Spacing error: actual key-down gaps vs configured gaps.
+    downs = [t for t, code, is_up in bulk.log if not is_up]
+    gaps = [b - a for a, b in zip(downs, downs[1:])]
+    expected = [e.hold + e.delay for e in program.events] * repeats
+    errors = [abs(g - e) for g, e in zip(gaps, expected) if e > 0]
+    mean_err_ms = (sum(errors) / len(errors) * 1000) if errors else 0.0
+    max_err_ms = max(errors) * 1000 if errors else 0.0
+
+    print(f"Burst:                    {spec} ({presses} presses, spacing {spacing}s)")
+    print(f"Planned duration:         {program.duration:.4f}s")
+    print(f"Per-press path:           {per_press.calls // repeats} calls, {per_press_s:.4f}s per burst")
+    print(f"Bulk emitter:             {bulk.calls // repeats} calls, {bulk_s:.4f}s per burst")
+    print(f"Spacing error (bulk):     mean {mean_err_ms:.3f}ms, max {max_err_ms:.3f}ms")
+
+
+def _bench_thread(spec: str, spacing: float, repeats: int, console_ms: float) -> None:
+    """Back-to-back programs with `console_ms` of logging after each: inline vs run_ahead."""
+    import keyprog
+    from keyprog import Program
+    from scheduler import DeadlineScheduler
+
+    program = Program(spec, parse_burst_spec(spec, spacing))
+
+    def console():
+        time.sleep(console_ms / 1000)
+
+    def measure(label, loop):
+        layer = NullLayer()
+        sched = DeadlineScheduler()
+        sched.calibrate()
+        emitter = Emitter(layer, sched)
+        t0 = time.perf_counter()
+        loop(emitter)
+        total = time.perf_counter() - t0
+        # Program boundaries: first key-down of each program vs the plan.
+        firsts = [t for t, code, is_up in layer.log if not is_up][::len(program)]
+        errors = [abs(t - (firsts[0] + i * program.duration)) for i, t in enumerate(firsts)]
+        planned = repeats * program.duration
+        print(f"{label:<26}{total:.3f}s total (planned {planned:.3f}s), drift {total - planned:+.4f}s, "
+              f"max start error {max(errors) * 1000:.3f}ms")
+
+    def inline(emitter):
+        for _ in range(repeats):
+            keyprog.run(program, emitter)
+            console()
+
+    def threaded(emitter):
+        for _ in keyprog.run_ahead(((i, program) for i in range(repeats)), emitter):
+            console()
+
+    print(f"Programs:                 {repeats} x {spec} ({program.duration:.4f}s), "
+          f"{console_ms:g}ms logging after each")
+    measure("Inline (keyprog.run):", inline)
+    measure("Emitter thread:", threaded)
+
+
+def _bench_press(presses: int) -> None:
+    """Per-press cost of Keyboard.press vs pydirectinput.press; no key reaches the OS."""
+
+    def per_press(press):
+        t0 = time.perf_counter()
+        for _ in range(presses):
+            press("enter")
+        return (time.perf_counter() - t0) / presses
+
+    layer = default_layer()
+    if isinstance(layer, SendInputLayer):
+        layer._send = lambda n, inputs, size: n  # still builds the INPUT array
+    print(f"Presses:                  {presses} x enter, OS send disabled")
+    print(f"Keyboard.press:           {per_press(Keyboard(layer, hold=0.0).press) * 1e6:.2f}us per press "
+          f"({type(layer).__name__}, hold 0: call cost only)")
+
+    try:
+        import pydirectinput as pdi
+    except ImportError:
+        print("pydirectinput.press:      not installed (Windows only)")
+        return
+    if not hasattr(pdi, "SendInput"):
+        print("pydirectinput.press:      skipped (cannot disable its SendInput)")
+        return
+    send, pause = pdi.SendInput, pdi.PAUSE
+    pdi.SendInput = lambda n, inputs, size: n
+    pdi.PAUSE = 0
+    try:
+        cost = per_press(pdi.press)
+    finally:
+        pdi.SendInput, pdi.PAUSE = send, pause
+    print(f"pydirectinput.press:      {cost * 1e6:.2f}us per press (PAUSE 0; the scripts used 0.02-0.025s)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the bulk emitter on the null backend.")
+    parser.add_argument("spec", nargs="?", default="10xUp, Enter")
+    parser.add_argument("--spacing", type=float, default=0.02)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--console-ms", type=float, default=0.0,
+                        help="compare inline runs with the emitter thread, logging this long after each program")
+    parser.add_argument("--press", type=int, default=0,
+                        help="per-press cost of Keyboard.press vs pydirectinput.press over this many presses")
+    args = parser.parse_args()
+    if args.press:
+        _bench_press(args.press)
+    elif args.console_ms:
+        _bench_thread(args.spec, args.spacing, args.repeats, args.console_ms)
+    else:
+        _bench(args.spec, args.spacing, args.repeats)
@@ -0,0 +1,438 @@
+# ==================================================================
+# frames.py — v1.0 (2026-10-17)
+# ==================================================================
+# Frame-phase-locked input placement.
+#
+# FF8's menus read input once per frame tick; two presses that land
+# between the same two ticks can be merged or dropped. Fixed pauses
+# keep presses apart only on average, so they have to stay well
+# above one frame (0.02-0.025 s in the routines). With the game's
+# frame grid known,
+#
+#   FrameGrid(period, phase)
+#     period — seconds per menu frame
+#     phase  — time of one frame tick, on the scheduler's clock
+#
+# every press can be put `guard` (a fraction of a frame) after a tick,
+# always in a later frame than the previous press and never closer to
+# it than planned:
+#
+#   FrameLock.place(deadline) — next free frame slot at or after the
+#                               deadline
+#   FrameLockedScheduler      — scheduler proxy that places every
+#                               event deadline this way
+#
+# keyprog.FRAME_GRID turns it on: default_backend() locks the live
+# backends' scheduler, and compile_routine() caps the hold and the
+# per-press pause at one frame each: they only have to keep key-down
+# and key-up in separate frames, which the lock now guarantees, so a
+# quantity burst costs about two frames per press. Explicit waits stay
+# as planned, rounded up to whole frames.
+#
+# The grid comes from estimate_grid(), a fit over screen-change
+# timestamps (every change lands on some tick), or is configured: the
+# simulator models the game's frames and can hand the script the
+# same grid (python simulator.py ... --frame 60 --frame-lock).
+#
+# Live, `--frame-lock` on a farm script calls enable(): a capture
+# thread grabs the menu cursor column (capture.py) at CAPTURE_FPS and
+# a GridTracker collects the times it changes — every accepted press
+# and menu animation redraws it. The tracker re-fits the grid over the
+# last WINDOW_S seconds every REFIT_S, so a small period error never
+# drifts into whole frames over a long session, and the frame lock
+# moves onto each new fit between programs. Until the first fit,
+# presses are kept (1 + 2 * GUARD) frames apart, which puts a tick
+# between any two of them whatever the phase.
+#
+# Benchmark (real scheduler timing against a virtual frame grid):
+#   python frames.py
+#   python frames.py --hz 30 --phase-error-ms 2
+#   python frames.py --tick-jitter-ms 2
+# ==================================================================
+
+import math
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+GUARD = 0.25  # place presses this fraction of a frame after the tick
+_EPS = 1e-6   # frames; keeps deadlines one period apart in adjacent slots
+
+# Live grid tracking (enable())
+REGION = "cursor_column"  # capture.ROIS entry every press redraws
+CAPTURE_FPS = 240         # screen-change times are known to 1/CAPTURE_FPS
+WINDOW_S = 10.0           # fit over the changes of the last WINDOW_S seconds
+REFIT_S = 2.0             # re-fit this often
+POLL_S = 0.1              # scan the capture ring this often (it holds ~1 s at 240 fps)
+MIN_CHANGES = 20          # fewer changes in the window keep the previous fit
+MAX_PERIOD_ERROR = 0.02   # fits further than this from the nominal period are rejected
+
+
+class FrameGrid(NamedTuple):
+    period: float
+    phase: float = 0.0
+
+    def slot(self, t: float) -> int:
+        """Index of the frame that reads an input sent at `t`."""
+        return math.floor((t - self.phase) / self.period) + 1
+
+
+def estimate_grid(timestamps, nominal: float = 1 / 60) -> FrameGrid:
+    """
+    Frame grid from screen-change timestamps spanning a few seconds.
+    Each change lands on some frame tick (not every tick changes the
+    screen): frames are numbered from the nominal period, then a
+    least-squares line through (frame number, time) gives period and
+    phase; repeated so the numbering follows the fitted period.
+    """
+    ts = sorted(timestamps)
+    if len(ts) < 3:
+        raise ValueError("need at least 3 screen-change timestamps")
+    period, phase = nominal, ts[0]
+    for _ in range(3):
+        frames = [round((t - phase) / period) for t in ts]
+        mean_n = sum(frames) / len(frames)
+        mean_t = sum(ts) / len(ts)
+        var = sum((n - mean_n) ** 2 for n in frames)
+        if var == 0:
+            raise ValueError("screen-change timestamps all fall in one frame")
+        period = sum((n - mean_n) * (t - mean_t) for n, t in zip(frames, ts)) / var
+        phase = mean_t - period * mean_n
+    return FrameGrid(period, phase)
+
+
+class FrameLock:
+    """
+    Places each press in its own frame, `guard` frames after the tick.
+    With a `tracker` (GridTracker), the grid is only known once the
+    tracker has a fit: until then presses are kept 1 + 2 * guard frames
+    apart, and refresh() moves the lock onto every new fit.
+    """
+
+    def __init__(self, grid: FrameGrid, guard: float = GUARD, tracker=None):
+        self.grid = grid
+        self.guard = guard
+        self.offset = guard * grid.period
+        self.tracker = tracker
+        self.phased = tracker is None  # False: phase unknown, spacing only
+        self.last = None    # slot of the last placed press
+        self.placed = None  # time of the last placed press
+
+    def place(self, deadline: float) -> float:
+        period, phase = self.grid
+        if not self.phased:
+            if self.placed is not None:
+                deadline = max(deadline, self.placed + (1 + 2 * self.guard) * period)
+            self.placed = deadline
+            return deadline
+        slot = math.ceil((deadline - phase - self.offset) / period - _EPS)
+        if self.last is not None and slot <= self.last:
+            slot = self.last + 1
+        self.last = slot
+        self.placed = phase + slot * period + self.offset
+        return self.placed
+
+    def retune(self, grid: FrameGrid) -> None:
+        """Continue on a re-fitted grid; the next press still goes after the last one's frame."""
+        self.grid = grid
+        self.offset = self.guard * grid.period
+        self.phased = True
+        if self.placed is not None:
+            self.last = math.floor((self.placed - grid.phase) / grid.period)
+
+    def refresh(self) -> None:
+        """Move onto the tracker's latest fit (between programs)."""
+        fit = self.tracker.fitted if self.tracker is not None else None
+        if fit is not None and fit is not self.grid:
+            self.retune(fit)
+
+
+def frame_lock(grid) -> FrameLock:
+    """FrameLock for keyprog.FRAME_GRID: a FrameGrid, or a GridTracker to follow."""
+    if isinstance(grid, FrameGrid):
+        return FrameLock(grid)
+    return FrameLock(grid.fitted or FrameGrid(grid.period), tracker=grid)
+
+
+class FrameLockedScheduler:
+    """
+    Scheduler proxy that moves every event deadline onto the frame lock.
+    Each deadline is placed after the previous press plus the planned
+    gap, so a wait is never shortened by the placement (it rounds up to
+    whole frames); the program's end keeps the accumulated shift.
+    """
+
+    def __init__(self, inner, lock: FrameLock):
+        self.inner = inner
+        self.lock = lock
+        self.shift = 0.0  # placed minus planned time of the last event
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def begin(self) -> float:
+        self.shift = 0.0
+        self.lock.refresh()
+        return self.inner.begin()
+
+    def wait_until(self, deadline: float) -> None:
+        slip = self.inner.slip  # placed on the real clock, after any stall
+        placed = self.lock.place(deadline + slip + self.shift)
+        self.shift = placed - deadline - slip
+        self.inner.wait_until(placed - slip)
+
+    def end(self, deadline: float) -> None:
+        self.inner.end(deadline + self.shift)
+        self.shift = 0.0
+
+
+class GridTracker(threading.Thread):
+    """
+    Fits the frame grid to a capture ring's screen changes in the
+    background. `period` is the nominal one (what compile_routine caps
+    the pause at); `fitted` the latest accepted fit, or None.
+    """
+
+    def __init__(self, ring, region: str = REGION, nominal: float = 1 / 60,
+                 capture_fps: float = CAPTURE_FPS, clock=time.perf_counter):
+        super().__init__(name="frame-grid", daemon=True)
+        self.ring = ring
+        self.region = region
+        self.period = nominal
+        self.capture_interval = 1 / capture_fps
+        self.clock = clock
+        self.fitted = None
+        self.fits = 0          # fits accepted
+        self.changes = deque()
+        self._seq = 0          # next frame to scan
+        self._prev = None      # last scanned frame (a copy: the ring reuses its slot)
+        self._halt = threading.Event()
+
+    def scan(self) -> None:
+        """Record the change times of the frames captured since the last scan."""
+        import numpy as np
+
+        ring = self.ring
+        seq = max(self._seq, ring.oldest())
+        if seq > self._seq:
+            self._prev = None  # frames were lost; the next one is no change
+        end = ring.count
+        half = self.capture_interval / 2  # a change happened in the interval before its capture
+        for seq in range(seq, end):
+            frame = ring.get(seq, self.region)
+            t = float(ring.times[seq % ring.capacity])
+            if self._prev is None:
+                self._prev = frame.copy()
+            elif not np.array_equal(frame, self._prev):
+                self.changes.append(t - half)
+                np.copyto(self._prev, frame)
+        self._seq = end
+        horizon = self.clock() - WINDOW_S
+        while self.changes and self.changes[0] < horizon:
+            self.changes.popleft()
+
+    def refit(self) -> bool:
+        """Fit the grid to the recorded changes; True if the fit was accepted."""
+        if len(self.changes) < MIN_CHANGES:
+            return False
+        try:
+            fit = estimate_grid(self.changes, nominal=self.period)
+        except ValueError:
+            return False
+        if abs(fit.period / self.period - 1) > MAX_PERIOD_ERROR:
+            return False
+        self.fitted = fit
+        self.fits += 1
+        return True
+
+    def run(self) -> None:
+        next_fit = self.clock() + REFIT_S
+        while not self._halt.wait(POLL_S):
+            self.scan()
+            if self.clock() >= next_fit:
+                self.refit()
+                next_fit += REFIT_S
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+    def describe(self) -> str:
+        if self.fitted is None:
+            return "no fit yet (presses spaced, not phase-locked)"
+        return f"{self.fits:,} fits, last period {self.fitted.period * 1000:.4f}ms"
+
+
+def enable(fps: float = 60) -> str:
+    """
+    Lock live presses to the game's frames (--frame-lock): capture the
+    cursor column, track the grid and set keyprog.FRAME_GRID. Call it
+    before compiling programs. Windows; needs NumPy. Returns a summary.
+    """
+    import atexit
+
+    import capture
+    import keyprog
+
+    rois = capture.window_rois(tuple(r for r in capture.ROIS if r.name == REGION))
+    source = capture.GdiSource(rois)
+    ring = capture.FrameRing(rois)
+    thread = capture.CaptureThread(source, ring, CAPTURE_FPS)
+    tracker = keyprog.FRAME_GRID = GridTracker(ring, REGION, 1 / fps)
+    thread.start()
+    tracker.start()
+    atexit.register(lambda: print(f"Frame lock: {tracker.describe()}"))
+    atexit.register(source.close)
+    atexit.register(thread.stop)
+    atexit.register(tracker.stop)
+    return f"{fps:g} fps menus, fitted from {REGION!r} captured at {CAPTURE_FPS} fps"
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def _sent(sched, deadlines) -> list:
+    """Wait for each deadline on `sched`; returns the send times."""
+    clock = sched.clock
+    sent = []
+    for d in deadlines:
+        sched.wait_until(d)
+        sent.append(clock())
+    return sent
+
+
+class _GameFrames:
+    """Frame ticks of a virtual game whose ticks jitter around the grid."""
+
+    def __init__(self, grid: FrameGrid, jitter: float):
+        import random
+
+        self.grid = grid
+        self.jitter = jitter
+        self.gauss = random.gauss
+        self.ticks = {}
+
+    def tick(self, n: int) -> float:
+        t = self.ticks.get(n)
+        if t is None:
+            t = self.ticks[n] = self.grid.phase + n * self.grid.period + self.gauss(0, self.jitter)
+        return t
+
+    def slot(self, t: float) -> int:
+        """First tick at or after `t` (the frame that reads the input)."""
+        n = self.grid.slot(t) - 1
+        while self.tick(n) >= t:
+            n -= 1
+        while self.tick(n + 1) < t:
+            n += 1
+        return n + 1
+
+
+def _merges(sent, frames: _GameFrames) -> int:
+    slots = [frames.slot(t) for t in sent]
+    return sum(1 for a, b in zip(slots, slots[1:]) if b <= a)
+
+
+def _bench(presses: int, hz: float, phase_error: float, jitter: float, trials: int) -> None:
+    import random
+
+    from scheduler import DeadlineScheduler
+
+    period = 1 / hz
+    sched = DeadlineScheduler()
+    sched.calibrate()
+    rows = {"25 ms pause (GIL_PAUSE)": [0, 0.0], "1 frame, free-running": [0, 0.0],
+            "1 frame, phase-locked": [0, 0.0]}
+    for _ in range(trials):
+        start = sched.clock() + 0.01
+        grid = FrameGrid(period, start + random.random() * period)  # phase unknown to the sender
+        game = _GameFrames(grid, jitter)
+        for label, gap in (("25 ms pause (GIL_PAUSE)", 0.025), ("1 frame, free-running", period)):
+            start = sched.clock() + 0.01
+            sent = _sent(sched, [start + i * gap for i in range(presses)])
+            rows[label][0] += _merges(sent, game)
+            rows[label][1] += sent[-1] - sent[0]
+        locked = FrameLockedScheduler(sched, FrameLock(FrameGrid(period, grid.phase + phase_error)))
+        start = sched.clock() + 0.01
+        sent = _sent(locked, [start + i * period for i in range(presses)])
+        rows["1 frame, phase-locked"][0] += _merges(sent, game)
+        rows["1 frame, phase-locked"][1] += sent[-1] - sent[0]
+
+    print(f"Presses:                  {trials} x {presses} at {hz:g} Hz menu frames "
+          f"(tick jitter {jitter * 1000:g}ms, locked phase off by {phase_error * 1000:g}ms)")
+    for label, (merged, seconds) in rows.items():
+        per_press = seconds / (trials * (presses - 1)) * 1000
+        print(f"{label + ':':<26}{per_press:.2f}ms per press, {merged} merged into the previous frame")
+
+    # Phase and period recovered from jittered, gappy screen changes.
+    game = FrameGrid(period * 1.001, 0.0123)
+    changes = [game.phase + n * game.period + random.gauss(0, 0.0005)
+               for n in range(int(3 * hz)) if random.random() < 0.4]
+    fit = estimate_grid(changes, nominal=period)
+    print(f"Estimate ({len(changes)} changes):    period {fit.period * 1000:.4f}ms "
+          f"(true {game.period * 1000:.4f}), phase error "
+          f"{((fit.phase - game.phase + period / 2) % fit.period - period / 2) * 1000:+.3f}ms")
+
+
+def _bench_tracker(hz: float, seconds: float, jitter: float) -> None:
+    """GridTracker on a virtual capture of a game whose frame period shifts mid-run."""
+    import bisect
+    import random
+
+    from capture import ROI, FrameRing
+
+    period = 1 / hz
+    ring = FrameRing((ROI(REGION, 0, 0, 4, 4),))
+    now = [0.0]
+    tracker = GridTracker(ring, REGION, period, clock=lambda: now[0])
+    # Ticks at 0.05% long for the first half, 0.05% short after; ~40% redraw the column.
+    ticks, t = [], 0.0
+    while t < seconds:
+        t += period * (1.0005 if t < seconds / 2 else 0.9995)
+        ticks.append(t)
+    changes = [tick + random.gauss(0, jitter) for tick in ticks if random.random() < 0.4]
+
+    def error(grid: FrameGrid) -> float:
+        """Phase error of `grid` at the latest tick, in ms (wrapped to +-half a frame)."""
+        last = ticks[bisect.bisect_right(ticks, now[0]) - 1]
+        return ((last - grid.phase) / grid.period + 0.5) % 1 * grid.period * 1000 - grid.period * 500
+
+    first, worst, shown, drawn = None, 0.0, 0, 0
+    next_fit = REFIT_S
+    for k in range(int(seconds * CAPTURE_FPS)):
+        now[0] = (k + 1) / CAPTURE_FPS
+        while drawn < len(changes) and changes[drawn] <= now[0]:
+            drawn += 1
+        ring.slot()[0][:] = drawn % 256
+        ring.commit(now[0])
+        if k % int(POLL_S * CAPTURE_FPS) == 0:
+            tracker.scan()
+        if now[0] >= next_fit:
+            next_fit += REFIT_S
+            if tracker.refit() and first is None:
+                first = tracker.fitted
+            if tracker.fitted is not None and first is not tracker.fitted:
+                worst = max(worst, abs(error(tracker.fitted)))
+                shown += 1
+    print(f"Tracker ({seconds:g}s, period shifts 0.1% mid-run): {tracker.fits} fits; phase error at the end "
+          f"{error(tracker.fitted):+.3f}ms re-fitted (worst {worst:.3f}ms over {shown} fits) "
+          f"vs {error(first):+.3f}ms for the first fit kept")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare free-running and frame-locked press placement.")
+    parser.add_argument("--hz", type=float, default=60.0, help="menu frame rate of the virtual game")
+    parser.add_argument("--presses", type=int, default=60)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--tick-jitter-ms", type=float, default=1.0,
+                        help="standard deviation of the virtual game's frame ticks")
+    parser.add_argument("--phase-error-ms", type=float, default=1.0,
+                        help="error of the locked phase estimate")
+    parser.add_argument("--track-seconds", type=float, default=60.0,
+                        help="length of the virtual session the grid tracker follows")
+    args = parser.parse_args()
+    _bench(args.presses, args.hz, args.phase_error_ms / 1000, args.tick_jitter_ms / 1000, args.trials)
+    _bench_tracker(args.hz, args.track_seconds, args.tick_jitter_ms / 1000)
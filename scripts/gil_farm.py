@@ -1,5 +1,5 @@
 # ============================================================
-# gil_farm.py — v1.0 (2026-02-21)
+# gil_farm.py — v1.3 (2026-10-17)
 # ============================================================
 
 # ============================================================
@@ -30,33 +30,75 @@
 # 4) Keep FF8 focused while running (do not alt-tab). Borderless Windowed is recommended.
 #
 # Runtime prompts:
-#   Gil — Enter current gil. The script calculates cycles to reach 99,999,999 gil:
-#           cycles = ceil((99,999,999 - current_gil) / 352,500)
-#         Minimum 210,000 gil required (cost of 100x Cottages + 100x Tents).
+#   Gil    — Enter current gil.
+#            Minimum 210,000 gil required (cost of 100x Cottages + 100x Tents).
+#   Target — Gil to farm up to (blank or "max" = 99,999,999). The script
+#            calculates cycles to reach it:
+#              cycles = ceil((target_gil - current_gil) / 352,500)
 #
 # Script structure (each cycle):
 #   Phase 1: Buy 100x Cottages + 100x Tents from Esthar Shop!!!.
 #   Phase 2: Refine via Recov Med-RF → 25x Mega Potions (Tents) + 75x Mega Potions (Cottages).
 #   Phase 3: Sell 75x Mega Potions at Esthar Shop!!! (+352,500 gil profit per cycle).
+#
+# The LAST cycle is partial: it buys only as many Cottages (in batches
+# of 4 → 3 Mega Potions, +16,500 gil) as the target still needs, skips
+# the Tents and sells just those Mega Potions.
+#
+# LOW JITTER:
+#   `python gil_farm.py --low-jitter` freezes the GC, pins the
+#   process to one core and raises timer resolution and priority
+#   where the OS allows (low_jitter.py) for a steadier key timeline.
+#
+# GAME SPEED:
+#   `python gil_farm.py --boost` runs with the Remastered speed
+#   booster on (`--fps 30`: menus at 30 fps). Waits come from that
+#   mode's timing profile (timing_profile.py), and so do the ETAs.
+#
+# SETTLE:
+#   `python gil_farm.py --settle` ends each menu-transition wait as soon
+#   as the screen has settled (settle.py; Windows, needs NumPy).
+#   The tuned wait stays the timeout.
+#
+# FRAME LOCK:
+#   `python gil_farm.py --frame-lock` puts every press in its own game
+#   frame (frames.py; Windows, needs NumPy). The frame grid is fitted
+#   from captured screen changes and re-fitted as the farm runs.
 # ============================================================
 
 import time
 import math
 import re
+import sys
 from datetime import datetime, timedelta
 
-import pydirectinput as pdi
+import frames
+import keyprog
+import low_jitter
+import profiler
+import routines
+import telemetry
+import timing_model
+import timing_profile
 
 # ----------------------------
 # CONFIG
 # ----------------------------
-pdi.PAUSE = 0.025 # Remove built-in delay
 MAX_GIL = 99_999_999
 PROFIT_PER_CYCLE = 352_500
-SECONDS_PER_CYCLE = 13.51
 FOCUS_GRACE_SECONDS = 5  # time to click back into FF8 after starting script
 MIN_START_GIL = 210_000  # required to buy 100x Cottages + 100x Tents per cycle
 
+# Compile the cycle once; the loop only replays it. Presses run on a
+# deadline timeline; the timing model adds the overhead this machine
+# has shown on top of the planned duration.
+MODE = timing_profile.mode_from_argv()  # game speed / frame rate (--boost, --fps N)
+WAITS = timing_profile.load_waits(mode=MODE)  # per-machine tuned waits (tune_delays.py)
+MODEL = timing_model.attach()  # learns each routine's real duration as it runs
+FRAME_LOCK = frames.enable(MODE.fps) if "--frame-lock" in sys.argv[1:] else ""  # before compiling
+GIL_CYCLE = keyprog.compile_routine("gil_cycle", routines.gil_cycle(), MODE.pause(routines.GIL_PAUSE), waits=WAITS)
+SECONDS_PER_CYCLE = MODEL.predict(GIL_CYCLE)
+
 # ----------------------------
 # LOGGING HELPERS (alignment)
 # ----------------------------
@@ -178,6 +220,21 @@ def get_current_gil_raw(max_gil: int) -> int:
             print("Invalid input. Examples: 210000, 210k, 0.21m, 30m")
 
 
+def get_target_gil(max_gil: int) -> int:
+    """
+    Returns the gil to farm up to (clamped to max_gil); blank or "max"
+    means max_gil.
+    """
+    while True:
+        raw = input("Target gil? (blank or max = 99,999,999; examples: 45m, 60.5m): ").strip().lower()
+        if raw in ("", "max"):
+            return max_gil
+        try:
+            return min(parse_gil_input(raw), max_gil)
+        except ValueError:
+            print("Invalid input. Examples: 45m, 60.5m, max")
+
+
 # ----------------------------
 # START LOGGING
 # ----------------------------
@@ -198,23 +255,36 @@ if entered_gil < MIN_START_GIL:
         f"You need at least {MIN_START_GIL:,} gil to purchase 100x Cottages and 100x Tents."
     )
 
+target_gil = get_target_gil(MAX_GIL)
+
 current_gil = entered_gil
-remaining = MAX_GIL - current_gil
+remaining = max(0, target_gil - current_gil)
 
-# Round UP to the nearest whole cycle (overshoot is allowed)
+# Round UP to the nearest whole cycle; the last one is partial and
+# buys just enough Cottages for what is left.
 cycles = math.ceil(remaining / PROFIT_PER_CYCLE)
+final_profit_needed = remaining - (cycles - 1) * PROFIT_PER_CYCLE
+final_cottages = routines.partial_gil_cycle_cottages(final_profit_needed)
+FINAL_CYCLE = keyprog.compile_routine(
+    "gil_cycle_partial", routines.gil_cycle(cottages=final_cottages), MODE.pause(routines.GIL_PAUSE), waits=WAITS)
 
-estimated_duration = timedelta(seconds=cycles * SECONDS_PER_CYCLE)
+estimated_seconds = (cycles - 1) * SECONDS_PER_CYCLE + MODEL.predict(FINAL_CYCLE) if cycles > 0 else 0
+estimated_duration = timedelta(seconds=estimated_seconds)
 estimated_finish_time = start_time + estimated_duration
 
-estimated_end_gil = current_gil + cycles * PROFIT_PER_CYCLE
+estimated_end_gil = current_gil
+if cycles > 0:
+    estimated_end_gil += (cycles - 1) * PROFIT_PER_CYCLE + routines.partial_gil_cycle_profit(final_cottages)
 projected_over_cap = max(0, estimated_end_gil - MAX_GIL)
 
 print("------------------------------------------")
 log_line("Input:", f"{current_gil:,} gil")
-log_line("Remaining to cap:", f"{remaining:,} gil")
+log_line("Target:", f"{target_gil:,} gil")
+log_line("Remaining to target:", f"{remaining:,} gil")
 log_line("Profit per cycle:", f"{PROFIT_PER_CYCLE:,} gil")
-log_line("Cycles to run:", str(cycles))
+log_line("Cycles to run:", f"{cycles} (last: {final_cottages} Cottages, no Tents)" if cycles > 0 else "0")
+log_line("Timing profile:", timing_profile.describe(WAITS, mode=MODE))
+log_line("Timing model:", MODEL.describe())
 log_line("Estimated duration:", str(estimated_duration))
 log_line("Estimated finish time:", format_timestamp(estimated_finish_time))
 log_line("Projected end gil:", f"{estimated_end_gil:,} gil")
@@ -222,9 +292,22 @@ log_line("Projected over cap:", f"{projected_over_cap:,} gil")
 print("------------------------------------------")
 
 if cycles <= 0:
-    print("No cycles needed (you're at or above the gil cap). Exiting.")
+    print("No cycles needed (you're at or above the target). Exiting.")
     raise SystemExit
 
+backend = keyprog.default_backend()
+if "--low-jitter" in sys.argv[1:]:
+    prepared = low_jitter.warm(backend, (GIL_CYCLE, FINAL_CYCLE))
+    log_line("Low jitter:", f"{low_jitter.enable()}; {prepared} programs prepared")
+
+if "--settle" in sys.argv[1:]:
+    import settle
+
+    log_line("Settle:", settle.enable())
+
+if FRAME_LOCK:
+    log_line("Frame lock:", FRAME_LOCK)
+
 print(f"Click into FF8 now. Starting in {FOCUS_GRACE_SECONDS} seconds...")
 time.sleep(FOCUS_GRACE_SECONDS)
 
@@ -232,118 +315,29 @@ time.sleep(FOCUS_GRACE_SECONDS)
 # MAIN LOOP — RUN CALCULATED CYCLES
 # ============================================================
 run_start_monotonic = time.perf_counter()
-
-for cycle_num in range(1, cycles + 1):
-    cycle_start = time.perf_counter()
-
-    # ============================================================
-    # PHASE 1 — BUY TENTS & COTTAGES
-    # ============================================================
-
-    # Navigate to Tents & Cottages
-    pdi.press("right")
-    time.sleep(0.2)
-    pdi.press("up")
-    pdi.press("up")
-    pdi.press("enter")
-    time.sleep(0.15)
-
-    # Buy 100 Cottages
-    for i in range(10):
-        pdi.press("up")
-    pdi.press("enter")
-    pdi.press("up")
-    pdi.press("enter")
-    time.sleep(0.15)
-
-    # Buy 100 Tents
-    for i in range(10):
-        pdi.press("up")
-    pdi.press("enter")
-
-    # Exit Buy menu
-    pdi.press("c")
-    time.sleep(0.4)
-    pdi.press("c")
-    time.sleep(0.65)
-
-    # ============================================================
-    # PHASE 2 — REFINE ITEMS → MEGA POTIONS
-    # ============================================================
-
-    # Navigate to Recov Med-RF
-    pdi.press("c")
-    time.sleep(0.4)
-    pdi.press("right")
-    time.sleep(0.2)
-    pdi.press("up")
-    pdi.press("enter")
-    time.sleep(0.65)
-    pdi.press("enter")
-    time.sleep(0.2)
-
-    # Refine Tents → 25x Mega Potions
-    for i in range(3):
-        pdi.press("down")
-    pdi.press("enter")
-    time.sleep(0.1)
-    pdi.press("down")
-    pdi.press("enter")
-    time.sleep(0.2)
-
-    # Refine Cottages → 75x Mega Potions
-    for i in range(5):
-        pdi.press("down")
-    pdi.press("enter")
-    time.sleep(0.1)
-
-    # Exit Recov Med-RF
-    pdi.press("c")
-    time.sleep(0.65)
-
-    # ============================================================
-    # PHASE 3 — SELL MEGA POTIONS
-    # ============================================================
-
-    # Navigate to Call Shop → Esthar Shop!!!
-    pdi.press("left")
-    time.sleep(0.2)
-    pdi.press("down")
-    pdi.press("enter")
-    time.sleep(0.4)
-    pdi.press("enter")
-    time.sleep(0.65)
-
-    # Move to Mega Potions
-    pdi.press("right")
-    pdi.press("enter")
-    time.sleep(0.4)
-    pdi.press("down")
-    pdi.press("down")
-    pdi.press("enter")
-    time.sleep(0.2)
-
-    # Sell 75x Mega Potions
-    for i in range(8):
-        pdi.press("up")
-    pdi.press("enter")
-
-    # Exit Sell
-    pdi.press("c")
-    time.sleep(0.4)
-    pdi.press("left")
-    pdi.press("enter")
-    time.sleep(0.4)
+TELEMETRY = telemetry.start("gil_farm", WAITS, mode=MODE.key, gil=current_gil, target=target_gil,
+                            plan_seconds=estimated_seconds)
+PROFILER = profiler.attach()
+
+# Phases 1-3: buy → refine → sell (routines.gil_cycle). Cycles run back
+# to back on the emitter thread; each is logged while the next one runs.
+cycle_programs = ((n, FINAL_CYCLE if n == cycles else GIL_CYCLE) for n in range(1, cycles + 1))
+for cycle_num, job in keyprog.run_ahead(cycle_programs, backend):
+    with PROFILER.phase("Gil cycle", job) as cycle:
+        if cycle_num == cycles:
+            TELEMETRY.record("cycle", phase="gil", cycle=cycle_num,
+                             gil_delta=routines.partial_gil_cycle_profit(final_cottages))
+        else:
+            TELEMETRY.record("cycle", phase="gil", cycle=cycle_num, gil_delta=PROFIT_PER_CYCLE,
+                             mega_delta=routines.MEGA_POTIONS_KEPT)
 
     # ----------------------------
     # PER-CYCLE LOGGING (one line)
     # ----------------------------
-    cycle_end = time.perf_counter()
-    cycle_seconds = cycle_end - cycle_start
-    elapsed = timedelta(seconds=(cycle_end - run_start_monotonic))
+    elapsed = timedelta(seconds=(cycle.end - run_start_monotonic))
 
     print(
-        f"Cycle: {cycle_num}/{cycles} ({cycle_seconds:.2f}s) | "
+        f"Cycle: {cycle_num}/{cycles} ({cycle.seconds:.2f}s) | "
         f"Elapsed: {format_elapsed(elapsed)}"
     )
 
@@ -362,4 +356,8 @@ print("------------------------------------------")
 log_line("Estimated duration:", str(estimated_duration))
 log_line("Estimated finish time:", format_timestamp(estimated_finish_time))
 log_line("Estimate error:", format_eta_error(delta))
-print("==========================================")
\ No newline at end of file
+print("==========================================")
+print(PROFILER.report())
+print("==========================================")
+
+TELEMETRY.close()
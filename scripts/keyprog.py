@@ -0,0 +1,545 @@
+# ==================================================================
+# keyprog.py — v1.0 (2026-10-17)
+# ==================================================================
+# Compiled keystroke programs for the farm scripts.
+#
+# Routines are written as data (a list of press steps, see
+# routines.py) and compiled ONCE at startup into a flat, preresolved
+# program. Each program event is a tuple:
+#
+#   (key_code, hold, delay)
+#     key_code — DirectInput scan code, resolved at compile time
+#     hold     — seconds between key-down and key-up (the emitter
+#                holds a key at least emitter.MIN_HOLD_S)
+#     delay    — seconds to wait after key-up (press pause + any
+#                explicit wait that followed the press)
+#
+# compile_routine() keeps the timing the scripts had when they called
+# pydirectinput.press with PAUSE = pause: keyDown, keyUp and press
+# each sleep PAUSE, so every press holds its key for one pause and
+# waits two after key-up (PRESS_PAUSES pauses per press).
+#
+# The executor (run) walks the flat tuple with no per-press string
+# lookups or global PAUSE handling, which keeps per-press overhead
+# and jitter low over multi-hour sessions. Live backends place every
+# event on the deadline timeline from scheduler.py, so a program's
+# wall time tracks Program.duration instead of drifting with sleep
+# overshoot and call overhead.
+#
+# This module does not import pydirectinput until a live backend is
+# created, so programs can be built and inspected on any platform.
+# ==================================================================
+
+import os
+import queue
+import sys
+import threading
+import time
+from typing import NamedTuple, Optional, Union
+
+# ----------------------------
+# KEY TABLE
+# ----------------------------
+# Scan codes for the keybinds listed in the README (same values as
+# pydirectinput.KEYBOARD_MAPPING).
+KEY_CODES = {
+    "enter": 0x1C,
+    "c": 0x2E,
+    "up": 0xC8,
+    "down": 0xD0,
+    "left": 0xCB,
+    "right": 0xCD,
+}
+KEY_NAMES = {code: name for name, code in KEY_CODES.items()}
+
+DEFAULT_PAUSE = 0.02
+PRESS_PAUSES = 3  # pauses per press: hold, then two after key-up (pydirectinput.press)
+
+# Input backend used by default_backend():
+#   "sendinput" — batched SendInput emitter (emitter.py)
+#   "pdi"       — pydirectinput keyDown/keyUp per event
+#   "sim"       — offline menu simulator (simulator.py)
+INPUT_BACKEND = "sendinput"
+
+# Called as observer(program, start, end) with perf_counter times after
+# every run() (timing_model.py learns the scripts' estimates from them).
+OBSERVERS = []
+
+# run_ahead() runs programs on a dedicated emitter thread (raised
+# priority where the OS allows) while the caller logs and checkpoints.
+# False runs them inline, as run() does; the simulator always does.
+EMITTER_THREAD = True
+SWITCH_INTERVAL_S = 0.001  # GIL switch interval while the emitter thread has programs queued (default 5 ms)
+EMITTER_CORE = None        # core the emitter thread pins itself to (set by low_jitter.enable())
+
+# Opt-in per-press latency instrumentation of live backends (latency.py):
+#   FF8_INSTRUMENT=1 python gil_farm.py
+INSTRUMENT = os.environ.get("FF8_INSTRUMENT", "") not in ("", "0")
+
+# Game menu frame grid (frames.FrameGrid: period, phase on the
+# scheduler clock), e.g. frames.estimate_grid(screen_change_times), or
+# a frames.GridTracker that keeps re-fitting it (frames.enable()).
+# When set, compile_routine() caps the per-press pause at one frame and
+# default_backend() places every live press in its own frame.
+# Set it before the programs are compiled. None keeps fixed pauses.
+FRAME_GRID = None
+
+# Adaptive waits (settle.py): an object with applies(name) -> bool and
+# wait(name, timeout). When set, run() and run_ahead() end each named
+# wait it applies to as soon as the screen has settled; the compiled
+# wait is the timeout. None keeps every wait fixed.
+SETTLER = None
+
+
+# ----------------------------
+# ROUTINE DEFINITIONS
+# ----------------------------
+class Wait(NamedTuple):
+    """A named, tunable wait; `seconds` is the default value."""
+    name: str
+    seconds: float
+
+
+class Step(NamedTuple):
+    """Press `key` `times` times, then wait `wait` seconds (or a Wait)."""
+    key: Optional[str]
+    times: int = 1
+    wait: Union[float, Wait] = 0.0
+
+
+def press(key: str, times: int = 1, wait: Union[float, Wait] = 0.0) -> Step:
+    return Step(key, times, wait)
+
+
+def sleep(seconds: Union[float, Wait]) -> Step:
+    return Step(None, 0, seconds)
+
+
+class Mark(NamedTuple):
+    """Start of a named sub-phase (e.g. "Recov Med-RF"); sends nothing."""
+    name: str
+
+
+def mark(name: str) -> Mark:
+    return Mark(name)
+
+
+def named_waits(steps) -> list:
+    """Distinct Wait entries of a routine, in first-use order."""
+    seen = {}
+    for step in steps:
+        if isinstance(step, Mark):
+            continue
+        if isinstance(step.wait, Wait) and step.times > 0 and step.wait.name not in seen:
+            seen[step.wait.name] = step.wait
+    return list(seen.values())
+
+
+# ----------------------------
+# COMPILED PROGRAMS
+# ----------------------------
+class Event(NamedTuple):
+    code: int
+    hold: float
+    delay: float
+
+
+class Program:
+    """A compiled, immutable sequence of key events."""
+
+    __slots__ = ("name", "events", "pause", "marks", "waits")
+
+    def __init__(self, name: str, events, pause: float = 0.0, marks=(), waits=()):
+        self.name = name
+        self.events = tuple(events)
+        self.pause = pause          # per-press part of each delay (compile_routine's pause)
+        self.marks = tuple(marks)   # (event index, sub-phase name), ascending
+        self.waits = tuple(waits)   # (event index, wait name, seconds in its delay), ascending
+
+    def __add__(self, other: "Program") -> "Program":
+        n = len(self.events)
+        return Program(f"{self.name}+{other.name}", self.events + other.events,
+                       min(self.pause, other.pause),
+                       self.marks + tuple((n + i, name) for i, name in other.marks),
+                       self.waits + tuple((n + i, name, s) for i, name, s in other.waits))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __repr__(self) -> str:
+        return f"Program({self.name!r}, presses={len(self.events)}, duration={self.duration:.3f}s)"
+
+    @property
+    def duration(self) -> float:
+        """Planned seconds (holds + delays), excluding input call overhead."""
+        return sum(e.hold + e.delay for e in self.events)
+
+    @property
+    def wait_sum(self) -> float:
+        return sum(e.delay for e in self.events)
+
+    def key_counts(self) -> dict:
+        counts = {}
+        for e in self.events:
+            name = KEY_NAMES.get(e.code, hex(e.code))
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+def resolve_wait(wait, waits=None) -> float:
+    """Seconds for a plain float or a Wait (overridden by `waits`)."""
+    if isinstance(wait, Wait):
+        if waits is not None:
+            return waits.get(wait.name, wait.seconds)
+        return wait.seconds
+    return wait
+
+
+def press_seconds(pause: float) -> float:
+    """Seconds from one compiled press's key-down to the next at `pause`."""
+    return PRESS_PAUSES * pause
+
+
+def compile_routine(name: str, steps, pause: float = DEFAULT_PAUSE, hold: float = None,
+                    waits: dict = None) -> Program:
+    """
+    Flatten routine steps into a Program.
+    Every press holds its key for `hold` (default: `pause`) and gets
+    two pauses after key-up, as pydirectinput.press did; an explicit
+    wait is added to the delay of the last press of its step; a bare
+    sleep() step is folded into the previous event. Steps with
+    times=0 are dropped. Named waits take their value from `waits` (a
+    timing profile) when present there, else their default. mark()
+    steps become Program.marks and named waits Program.waits.
+    With FRAME_GRID set, hold and gap are at most one frame each (the
+    frame lock puts key-down and key-up in frames of their own).
+    """
+    hold = pause if hold is None else hold
+    gap = (PRESS_PAUSES - 1) * pause
+    if FRAME_GRID is not None:
+        hold = min(hold, FRAME_GRID.period)
+        gap = min(gap, FRAME_GRID.period)
+    events = []
+    marks = []
+    named = []
+    for step in steps:
+        if isinstance(step, Mark):
+            if marks and marks[-1][0] == len(events):
+                marks[-1] = (len(events), step.name)
+            else:
+                marks.append((len(events), step.name))
+            continue
+        wait = resolve_wait(step.wait, waits)
+        if step.key is None:
+            if not events:
+                raise ValueError(f"Routine {name!r} cannot start with a wait")
+            last = events[-1]
+            events[-1] = Event(last.code, last.hold, last.delay + wait)
+            if isinstance(step.wait, Wait):
+                named.append((len(events) - 1, step.wait.name, wait))
+            continue
+        try:
+            code = KEY_CODES[step.key]
+        except KeyError:
+            raise ValueError(f"Unknown key {step.key!r} in routine {name!r}") from None
+        for i in range(step.times):
+            delay = gap + (wait if i == step.times - 1 else 0.0)
+            events.append(Event(code, hold, delay))
+        if isinstance(step.wait, Wait) and step.times > 0:
+            named.append((len(events) - 1, step.wait.name, wait))
+    return Program(name, events, gap, marks, named)
+
+
+# ----------------------------
+# BACKENDS
+# ----------------------------
+class PdiBackend:
+    """Sends events through pydirectinput (names resolved once)."""
+
+    def __init__(self, scheduler=None):
+        import pydirectinput as pdi
+        from scheduler import default_scheduler
+
+        self._names = dict(KEY_NAMES)
+        self._down = pdi.keyDown
+        self._up = pdi.keyUp
+        self.scheduler = scheduler if scheduler is not None else default_scheduler()
+
+    def key_down(self, code: int) -> None:
+        self._down(self._names[code], _pause=False)
+
+    def key_up(self, code: int) -> None:
+        self._up(self._names[code], _pause=False)
+
+    def run_program(self, program: Program) -> None:
+        names = self._names
+        down = self._down
+        up = self._up
+        sched = self.scheduler
+        wait_until = sched.wait_until
+        t = sched.begin()
+        for code, hold, delay in program.events:
+            name = names[code]
+            wait_until(t)
+            down(name, _pause=False)
+            if hold:
+                t += hold
+                wait_until(t)
+            up(name, _pause=False)
+            t += delay
+        sched.end(t)
+
+
+def default_backend(name: str = None):
+    name = name or INPUT_BACKEND
+    if name == "pdi":
+        backend = PdiBackend()
+    elif name == "sendinput":
+        import emitter
+
+        backend = emitter.Emitter()
+    elif name == "sim":
+        import simulator
+
+        return simulator.default_simulator()
+    else:
+        raise ValueError(f"Unknown input backend {name!r}")
+    live = backend
+    if INSTRUMENT:
+        import latency
+
+        backend = latency.instrument(backend)
+    if FRAME_GRID is not None:
+        import frames
+
+        # Outermost, so instrumentation measures against the placed deadlines.
+        live.scheduler = frames.FrameLockedScheduler(live.scheduler, frames.frame_lock(FRAME_GRID))
+    return backend
+
+
+# ----------------------------
+# EXECUTOR
+# ----------------------------
+_settled = {}  # (program, settler) -> [(segment, wait name, timeout)]
+
+
+def _settle_segments(program: Program, settler) -> list:
+    """
+    `program` cut after each press whose named wait the settler
+    handles; the cut wait leaves the segment's last delay and becomes
+    its timeout (None after the final segment).
+    """
+    key = (program, settler)
+    segments = _settled.get(key)
+    if segments is None:
+        segments = []
+        start = 0
+        for i, name, seconds in program.waits:
+            if i < start or not settler.applies(name):
+                continue  # (a second wait on an already cut press stays fixed)
+            code, hold, delay = program.events[i]
+            events = program.events[start:i] + (Event(code, hold, delay - seconds),)
+            segments.append((Program(program.name, events, program.pause), name, seconds))
+            start = i + 1
+        if segments and start < len(program.events):
+            segments.append((Program(program.name, program.events[start:], program.pause), None, 0.0))
+        _settled[key] = segments
+    return segments
+
+
+def _execute(program: Program, backend) -> None:
+    settler = SETTLER
+    if settler is not None and program.waits:
+        segments = _settle_segments(program, settler)
+        if segments:
+            scheduler = getattr(backend, "scheduler", None)
+            for segment, name, timeout in segments:
+                _execute_events(segment, backend)
+                if name is not None:
+                    settler.wait(name, timeout)
+                    if scheduler is not None:
+                        scheduler.detach()  # the next press starts now, not on the old timeline
+            return
+    _execute_events(program, backend)
+
+
+def _execute_events(program: Program, backend) -> None:
+    run_program = getattr(backend, "run_program", None)
+    if run_program is not None:
+        run_program(program)
+    else:
+        down = backend.key_down
+        up = backend.key_up
+        wait = time.sleep
+        for code, hold, delay in program.events:
+            down(code)
+            if hold:
+                wait(hold)
+            up(code)
+            if delay:
+                wait(delay)
+
+
+def run(program: Program, backend) -> None:
+    """
+    Execute a compiled program on `backend`.
+    Backends with run_program (PdiBackend, emitter.Emitter) schedule
+    the whole program; otherwise events are sent one key-down/key-up
+    at a time with plain sleeps. OBSERVERS then see the run's times.
+    """
+    start = time.perf_counter()
+    _execute(program, backend)
+    if OBSERVERS:
+        end = time.perf_counter()
+        for observer in OBSERVERS:
+            observer(program, start, end)
+
+
+class Job:
+    """One program submitted to an emitter thread."""
+
+    __slots__ = ("program", "start", "end", "error", "_done", "_notified")
+
+    def __init__(self, program: Program):
+        self.program = program
+        self.start = self.end = 0.0
+        self.error = None
+        self._done = threading.Event()
+        self._notified = False
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+    def wait(self) -> "Job":
+        """Block until the program finished (re-raising its error)."""
+        # Short timeouts keep CTRL + C responsive on Windows.
+        while not self._done.wait(0.1):
+            pass
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def notify(self) -> None:
+        """Show the finished run to OBSERVERS (once)."""
+        if not self._notified:
+            self._notified = True
+            for observer in OBSERVERS:
+                observer(self.program, self.start, self.end)
+
+
+def _raise_priority() -> bool:
+    """Raise the calling thread's scheduling priority; False if not allowed."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 2))  # HIGHEST
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -5)  # per-thread nice on Linux
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+class EmitterThread(threading.Thread):
+    """Runs submitted programs back to back on `backend`."""
+
+    def __init__(self, backend):
+        super().__init__(name="key-emitter", daemon=True)
+        self.backend = backend
+        self.queue = queue.SimpleQueue()
+        self.raised = None  # whether the priority was raised (set once running)
+
+    def run(self) -> None:
+        self.raised = _raise_priority()
+        if EMITTER_CORE is not None:
+            import low_jitter
+
+            low_jitter.pin_thread((EMITTER_CORE,))
+        previous = None  # the process switch interval, while lowered
+        try:
+            while True:
+                if previous is not None and self.queue.empty():
+                    sys.setswitchinterval(previous)  # idle: the process gets its interval back
+                    previous = None
+                job = self.queue.get()
+                if job is None:
+                    return
+                if previous is None:
+                    previous = sys.getswitchinterval()
+                    sys.setswitchinterval(SWITCH_INTERVAL_S)
+                job.start = time.perf_counter()
+                try:
+                    _execute(job.program, self.backend)
+                except BaseException as e:
+                    job.error = e
+                    self.cancel()  # never start the next program from an unknown menu state
+                job.end = time.perf_counter()
+                job._done.set()
+        finally:
+            if previous is not None:
+                sys.setswitchinterval(previous)
+
+    def submit(self, program: Program) -> Job:
+        job = Job(program)
+        self.queue.put(job)
+        return job
+
+    def cancel(self) -> None:
+        """Stop the running program at its next event; queued ones fail fast."""
+        scheduler = getattr(self.backend, "scheduler", None)
+        if scheduler is not None:
+            scheduler.cancel()
+
+
+_threads = {}
+
+
+def emitter_thread(backend) -> EmitterThread:
+    """The backend's emitter thread, started on first use."""
+    thread = _threads.get(id(backend))
+    if thread is None or thread.backend is not backend:
+        thread = _threads[id(backend)] = EmitterThread(backend)
+        thread.start()
+    return thread
+
+
+def run_ahead(items, backend):
+    """
+    Run (item, program) pairs back to back; yields (item, job) once each
+    job finished, while the next program is already running on the
+    emitter thread. The caller's logging and checkpoints for one item
+    therefore overlap the next item's keys instead of delaying them.
+    Call job.notify() (or profiler phase(name, job)) before recording
+    telemetry for the item. Leaving the loop early (break, error,
+    CTRL + C) cancels the queued program.
+    """
+    if not EMITTER_THREAD or INPUT_BACKEND == "sim":
+        for item, program in items:
+            job = Job(program)
+            job.start = time.perf_counter()
+            _execute(program, backend)
+            job.end = time.perf_counter()
+            yield item, job
+        return
+
+    thread = emitter_thread(backend)
+    pending = []  # (item, job) submitted and not yet handed to the caller
+    try:
+        for item, program in items:
+            pending.append((item, thread.submit(program)))
+            if len(pending) == 2:
+                pending[0][1].wait()
+                yield pending.pop(0)
+        while pending:
+            pending[0][1].wait()
+            yield pending.pop(0)
+    finally:
+        if pending:
+            thread.cancel()
+            for _, job in pending:
+                job._done.wait(1.0)
+            scheduler = getattr(backend, "scheduler", None)
+            if scheduler is not None:
+                scheduler.reset()
@@ -0,0 +1,283 @@
+# ==================================================================
+# latency.py — v1.0 (2026-10-17)
+# ==================================================================
+# Opt-in per-press latency instrumentation for the live backends.
+#
+#   FF8_INSTRUMENT=1 python gil_farm.py
+#
+# keyprog.default_backend() wraps the backend's input calls and its
+# scheduler (keyprog.PdiBackend: keyDown/keyUp; emitter.Emitter: the
+# OS layer's send) and records, into preallocated arrays:
+#
+#   calls     — seconds spent inside each input call
+#   spacing   — actual key-down to key-down gap within a program,
+#               next to its planned gap (hold + delay of the press)
+#   overshoot — how late each scheduler deadline was reached
+#
+# At exit it prints a histogram of the three and a per-routine split
+# of each run's wall time:
+#
+#   Waits   — planned explicit waits (routine wait= / sleep steps)
+#   Pause   — planned per-press pause (compile_routine's pause)
+#   Holds   — planned key-down holds
+#   Extra   — measured wall time beyond the plan
+#
+# Input calls and deadline overshoot run inside the planned gaps on
+# the scheduler timeline; only what outruns a gap shows up as Extra.
+# Instrumentation adds a few clock reads per press, so leave it off
+# for normal sessions. The simulator is never instrumented.
+# ==================================================================
+
+import atexit
+import time
+from array import array
+
+from telemetry import percentile
+
+CAPACITY = 1 << 18  # samples kept per buffer (~15 h of gil cycles); later ones are only totalled
+
+# Histogram bucket upper edges, milliseconds.
+HISTOGRAM_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0)
+
+
+class Recorder:
+    """Preallocated press timing buffers plus per-routine totals."""
+
+    def __init__(self, capacity: int = CAPACITY, clock=time.perf_counter):
+        self.clock = clock
+        self.capacity = capacity
+        zeros = bytes(8 * capacity)
+        self.calls = array("d", zeros)
+        self.spacing = array("d", zeros)
+        self.planned = array("d", zeros)
+        self.overshoot = array("d", zeros)
+        self.n_calls = 0
+        self.n_spacing = 0
+        self.n_overshoot = 0
+        self.presses = 0
+        # name -> [runs, presses, wall, waits, pause, holds, calls, overshoot]
+        self.routines = {}
+        self._plans = {}      # program -> (gaps, waits, pause, holds)
+        self._gaps = ()
+        self._press = 0
+        self._last_down = None
+        self._run_calls = 0.0
+        self._run_over = 0.0
+
+    def plan(self, program):
+        """Planned key-down gaps and wait/pause/hold split of `program` (cached)."""
+        plan = self._plans.get(program)
+        if plan is None:
+            pause = sum(min(e.delay, program.pause) for e in program.events)
+            holds = sum(e.hold for e in program.events)
+            plan = self._plans[program] = (
+                tuple(e.hold + e.delay for e in program.events),
+                program.wait_sum - pause, pause, holds,
+            )
+        return plan
+
+    # ----------------------------
+    # HOOKS
+    # ----------------------------
+    def call(self, t0: float, t1: float, downs: int) -> None:
+        """One input call from t0 to t1 that pressed `downs` keys."""
+        dt = t1 - t0
+        i = self.n_calls
+        if i < self.capacity:
+            self.calls[i] = dt
+        self.n_calls = i + 1
+        self._run_calls += dt
+        for _ in range(downs):
+            p = self._press
+            if p and p <= len(self._gaps):
+                j = self.n_spacing
+                if j < self.capacity:
+                    self.spacing[j] = t0 - self._last_down
+                    self.planned[j] = self._gaps[p - 1]
+                self.n_spacing = j + 1
+            self._press = p + 1
+            self._last_down = t0
+
+    def deadline(self, deadline: float) -> None:
+        """A scheduler wait for `deadline` just returned."""
+        late = self.clock() - deadline
+        i = self.n_overshoot
+        if i < self.capacity:
+            self.overshoot[i] = late
+        self.n_overshoot = i + 1
+        self._run_over += late
+
+    def run(self, backend, program) -> None:
+        """Run `program` on the unwrapped backend and total it under its name."""
+        self._gaps = self.plan(program)[0]
+        self._press = 0
+        self._run_calls = self._run_over = 0.0
+        start = self.clock()
+        backend.run_program(program)
+        wall = self.clock() - start
+        _, waits, pause, holds = self.plan(program)
+        entry = self.routines.get(program.name)
+        if entry is None:
+            entry = self.routines[program.name] = [0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += self._press
+        entry[2] += wall
+        entry[3] += waits
+        entry[4] += pause
+        entry[5] += holds
+        entry[6] += self._run_calls
+        entry[7] += self._run_over
+        self.presses += self._press
+
+    # ----------------------------
+    # REPORT
+    # ----------------------------
+    def report(self) -> str:
+        calls = self.calls[:min(self.n_calls, self.capacity)]
+        overshoot = self.overshoot[:min(self.n_overshoot, self.capacity)]
+        n = min(self.n_spacing, self.capacity)
+        errors = [abs(a - b) for a, b in zip(self.spacing[:n], self.planned[:n])]
+        runs = sum(e[0] for e in self.routines.values())
+
+        lines = [f"Press latency: {self.presses:,} presses in {runs:,} runs, {self.n_calls:,} input calls"]
+        if self.n_calls > self.capacity:
+            lines.append(f"(histograms use the first {self.capacity:,} samples of each buffer)")
+        for label, values in (("Input call", calls), ("Spacing error", errors), ("Overshoot", overshoot)):
+            if values:
+                lines.append(f"{label + ':':<22}mean {sum(values) / len(values) * 1000:.3f}ms, "
+                             f"p50 {percentile(values, 50) * 1000:.3f}ms, "
+                             f"p95 {percentile(values, 95) * 1000:.3f}ms, max {max(values) * 1000:.3f}ms")
+
+        lines.append("")
+        lines.append(f"{'ms':>8} {'Calls':>10} {'Spacing':>10} {'Overshoot':>10}")
+        columns = [histogram(v) for v in (calls, errors, overshoot)]
+        edges = [f"<{e:g}" for e in HISTOGRAM_MS] + [f">={HISTOGRAM_MS[-1]:g}"]
+        for row, edge in enumerate(edges):
+            lines.append(f"{edge:>8} " + " ".join(f"{c[row]:>10,}" for c in columns))
+
+        lines.append("")
+        lines.append(f"{'Routine':<28} {'Runs':>6} {'Wall':>8} {'Waits':>8} {'Pause':>8} {'Holds':>8} "
+                     f"{'Extra':>8} {'Calls':>8} {'Overshoot':>9}")
+        lines.append("-" * 99)
+        for name, (r, presses, wall, waits, pause, holds, call_s, over_s) in sorted(
+                self.routines.items(), key=lambda kv: -kv[1][2]):
+            extra = round((wall - waits - pause - holds) / r, 3) or 0.0
+            lines.append(f"{name[:28]:<28} {r:>6,} {wall / r:>7.3f}s {waits / r:>7.3f}s {pause / r:>7.3f}s "
+                         f"{holds / r:>7.3f}s {extra:>+7.3f}s {call_s / r:>7.3f}s {over_s / r:>8.3f}s")
+        lines.append("(per run; Calls and Overshoot are spent inside the planned gaps)")
+        return "\n".join(lines)
+
+    def print_report(self) -> None:
+        if self.n_calls:
+            print()
+            print(self.report())
+
+
+def histogram(values) -> list:
+    """Counts per HISTOGRAM_MS bucket (last bucket: at or above the top edge)."""
+    counts = [0] * (len(HISTOGRAM_MS) + 1)
+    edges = [e / 1000 for e in HISTOGRAM_MS]
+    for v in values:
+        for i, edge in enumerate(edges):
+            if v < edge:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+# ----------------------------
+# WRAPPERS
+# ----------------------------
+class _TimedScheduler:
+    """Scheduler proxy that reports how late each deadline is reached."""
+
+    def __init__(self, inner, recorder: Recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def wait_until(self, deadline: float) -> None:
+        due = deadline + self.inner.slip
+        self.inner.wait_until(deadline)
+        self.recorder.deadline(due)
+
+    def end(self, deadline: float) -> None:
+        self.wait_until(deadline)
+        self.inner.end(deadline)
+
+
+class _TimedLayer:
+    """emitter OS layer proxy that times each send()."""
+
+    def __init__(self, inner, recorder: Recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def send(self, inputs) -> int:
+        clock = self.recorder.clock
+        t0 = clock()
+        sent = self.inner.send(inputs)
+        self.recorder.call(t0, clock(), sum(1 for _, is_up in inputs if not is_up))
+        return sent
+
+
+def _timed(func, recorder: Recorder, downs: int):
+    clock = recorder.clock
+
+    def timed(*args, **kwargs):
+        t0 = clock()
+        func(*args, **kwargs)
+        recorder.call(t0, clock(), downs)
+    return timed
+
+
+class InstrumentedBackend:
+    """keyprog backend that runs programs on `backend` under a Recorder."""
+
+    def __init__(self, backend, recorder: Recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    @property
+    def scheduler(self):
+        return self.backend.scheduler
+
+    def key_down(self, code: int) -> None:
+        self.backend.key_down(code)
+
+    def key_up(self, code: int) -> None:
+        self.backend.key_up(code)
+
+    def run_program(self, program) -> None:
+        self.recorder.run(self.backend, program)
+
+    def prepare(self, program) -> None:
+        self.recorder.plan(program)
+        prepare = getattr(self.backend, "prepare", None)
+        if prepare is not None:
+            prepare(program)
+
+
+def instrument(backend, recorder: Recorder = None):
+    """
+    Wrap a PdiBackend or emitter.Emitter so every press is recorded;
+    the report prints at exit. Other backends are returned unchanged.
+    """
+    recorder = recorder if recorder is not None else Recorder()
+    if hasattr(backend, "layer"):
+        backend.layer = _TimedLayer(backend.layer, recorder)
+    elif hasattr(backend, "_down"):
+        backend._down = _timed(backend._down, recorder, 1)
+        backend._up = _timed(backend._up, recorder, 0)
+    else:
+        return backend
+    backend.scheduler = _TimedScheduler(backend.scheduler, recorder)
+    atexit.register(recorder.print_report)
+    return InstrumentedBackend(backend, recorder)
@@ -0,0 +1,189 @@
+# ==================================================================
+# low_jitter.py — v1.0 (2026-10-17)
+# ==================================================================
+# Low-jitter runtime mode for long sessions (--low-jitter).
+#
+# Occasional stalls show up as late deadlines on the key timeline:
+#
+#   garbage collection — a full collection pauses every thread
+#   core migration     — the OS moves the process between cores
+#   timer granularity  — Windows sleeps in ~15.6 ms ticks by default
+#
+# enable() applies whatever the platform allows:
+#
+#   GC       — collect once, gc.freeze() the startup objects and turn
+#              automatic collection off; collect() runs it by hand at
+#              iteration boundaries, between key programs
+#   Affinity — give the key emitter thread (keyprog.EMITTER_CORE) the
+#              last core to itself: it pins itself there when it
+#              starts, and this thread, with every thread it starts
+#              from now on (telemetry, logging), stays on the others
+#              (SetThreadAffinityMask / sched_setaffinity per thread)
+#   Timer    — timeBeginPeriod(1) on Windows (ended at exit)
+#   Priority — HIGH_PRIORITY_CLASS on Windows, nice -5 elsewhere
+#              (needs privileges; skipped otherwise)
+#
+# and warm() builds every per-program cache (grouped bursts, input
+# arrays) before the first cycle instead of during it.
+#
+# Benchmark (deadline lateness with allocation churn, before/after):
+#   python low_jitter.py
+#   python low_jitter.py --events 2000 --gap 0.01
+# ==================================================================
+
+import atexit
+import gc
+import os
+import sys
+import threading
+
+_enabled = []  # measures applied by enable()
+
+
+def pin_thread(cores) -> bool:
+    """Restrict the calling thread to `cores`; False if the OS does not allow it."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            mask = sum(1 << core for core in cores)
+            return bool(kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask))
+        os.sched_setaffinity(threading.get_native_id(), cores)
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+def _isolate_emitter() -> str:
+    import keyprog
+
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    if len(cores) < 2 or not pin_thread(cores[:-1]):
+        return ""
+    keyprog.EMITTER_CORE = cores[-1]
+    return f"emitter thread to core {cores[-1]}"
+
+
+def _timer_resolution() -> str:
+    if sys.platform != "win32":
+        return ""
+    import ctypes
+
+    winmm = ctypes.windll.winmm
+    if winmm.timeBeginPeriod(1) != 0:
+        return ""
+    atexit.register(winmm.timeEndPeriod, 1)
+    return "1 ms"
+
+
+def _raise_priority() -> str:
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        if kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), 0x80):  # HIGH_PRIORITY_CLASS
+            return "high"
+        return ""
+    os.nice(-5)
+    return "nice -5"
+
+
+def enable() -> str:
+    """Apply every low-jitter measure the platform allows; returns a summary."""
+    if not _enabled:
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        _enabled.append("GC frozen")
+        for label, apply in (("pinned", _isolate_emitter), ("timer", _timer_resolution),
+                             ("priority", _raise_priority)):
+            try:
+                result = apply()
+            except (AttributeError, OSError):
+                result = ""
+            if result:
+                _enabled.append(f"{label} {result}")
+    return ", ".join(_enabled)
+
+
+def enabled() -> bool:
+    return bool(_enabled)
+
+
+def collect() -> None:
+    """Run the collection the GC would have done (low-jitter mode only)."""
+    if _enabled:
+        gc.collect()
+
+
+def warm(backend, programs) -> int:
+    """Build the backend's per-program caches now; returns programs prepared."""
+    prepare = getattr(backend, "prepare", None)
+    if prepare is None:
+        return 0
+    count = 0
+    for program in programs:
+        prepare(program)
+        count += 1
+    return count
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def _lateness(events: int, gap: float) -> list:
+    """Deadline lateness (s) of `events` waits while cyclic garbage piles up."""
+    from scheduler import DeadlineScheduler
+
+    sched = DeadlineScheduler()
+    sched.calibrate()
+    clock = sched.clock
+    garbage = []
+    late = []
+    start = sched.begin()
+    for i in range(events):
+        # Logging-like allocation churn with reference cycles (what the
+        # collector has to walk).
+        for _ in range(100):
+            node = {"line": f"Cycle {i}", "next": None}
+            node["next"] = node
+            garbage.append(node)
+        if len(garbage) > 20_000:
+            garbage = []
+        deadline = start + (i + 1) * gap
+        due = deadline + sched.slip
+        sched.wait_until(deadline)
+        late.append(clock() - due)
+    return late
+
+
+def _bench(events: int, gap: float) -> None:
+    from telemetry import percentile
+
+    def show(label, late):
+        print(f"{label:<26}p50 {percentile(late, 50) * 1000:.3f}ms, p99 {percentile(late, 99) * 1000:.3f}ms, "
+              f"max {max(late) * 1000:.3f}ms")
+
+    print(f"Deadlines:                {events} x {gap}s with allocation churn")
+    show("Default runtime:", _lateness(events, gap))
+    summary = enable()
+    import keyprog
+
+    if keyprog.EMITTER_CORE is not None:
+        pin_thread((keyprog.EMITTER_CORE,))  # measure where the emitter thread runs
+    show("Low jitter:", _lateness(events, gap))
+    print(f"Applied:                  {summary}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure deadline jitter before and after low-jitter mode.")
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--gap", type=float, default=0.005)
+    args = parser.parse_args()
+    _bench(args.events, args.gap)
@@ -0,0 +1,777 @@
+# ==================================================================
+# max_party_farm.py — v1.0 (2026-10-17)
+# ==================================================================
+# Session mode of max_stat_farm.py: maxes several (character, stat)
+# targets in one process, from one shared plan.
+#
+# SHARING:
+#   - Stat farm cycles buy every stat item that still needs cycles in
+#     one Esthar Pet Shop visit and refine them all in one GFAbl
+#     Med-RF visit (routines.stat_cycle with several items).
+#   - Each iteration ends with ONE Item menu visit that uses every
+#     stat-up on every target (routines.nav_stat_to_party_items).
+#   - Gil farming is shared: an iteration farms only when the balance
+#     can't cover its stat farm cost + 210k, and then only up to what
+#     the rest of the plan needs.
+#
+# PLAN:
+#   Each stat is a lane holding the cycles its targets still need
+#   (HP: 10 HP Up per cycle; Str/Vit/Mag: 1 per cycle). A run is up to
+#   10 cycles, and each cycle buys one batch for every lane still open.
+#   An iteration is up to 6 runs (an HP lane joins only the first: its
+#   100 HP Up fill the stack), then the Item menu visit.
+#   Targets sharing a stat share its lane; each iteration's stat-ups go
+#   to them in the order entered.
+#
+# Every program is compiled before the start, so the plan carries the
+# predicted duration of each iteration and of the whole session: the
+# planned timeline plus the overhead this machine has shown so far
+# (timing_model.py).
+# ==================================================================
+
+# ==================================================================
+# DISCLAIMER / READ BEFORE RUNNING
+# ==================================================================
+# This script simulates keyboard inputs only. It does NOT read game
+# memory, detect screen state, or verify menus. It will blindly
+# press keys based on hard-coded assumptions.
+#
+# If the game/menu state is not EXACTLY as expected, inputs can
+# desync and may cause unintended purchases, item loss, or other
+# unwanted actions. You must monitor the script while running and
+# stop it if it desynchronizes.
+#
+# Stop execution:
+#   - Press CTRL + C in the terminal, or
+#   - Close the terminal / end the Python process.
+#
+# By running this script, you accept full responsibility for the
+# outcome. If you are not comfortable reviewing and modifying Python
+# code, do not use it.
+# ==================================================================
+
+# ==================================================================
+# REQUIRED SETUP (before running)
+# ==================================================================
+# 1) Item menu: Page 1 must be COMPLETELY empty (no stat-ups held).
+# 2) Starting menu (the script prints which one before starting):
+#    - Gil covers the first iteration (+ 210k):
+#        Call Shop → Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+#    - Otherwise:
+#        Call Shop → Esthar Shop!!! → Buy menu, cursor on "Potion"
+# 3) Keep FF8 focused while running (do not alt-tab).
+#
+# Runtime prompts:
+#   Targets — one per line: character, stat, current base stat
+#             (e.g. "zell str 120", "squall hp 4200"); blank to finish.
+#   Gil     — current gil (e.g. 30m, max).
+#   Max gil when done — y/n.
+#
+# LOW JITTER:
+#   `python max_party_farm.py --low-jitter` freezes the GC, pins the
+#   process to one core and raises timer resolution and priority
+#   where the OS allows (low_jitter.py) for a steadier key timeline.
+#
+# GAME SPEED:
+#   `python max_party_farm.py --boost` runs with the Remastered speed
+#   booster on (`--fps 30`: menus at 30 fps). Waits come from that
+#   mode's timing profile (timing_profile.py), and so do the ETAs.
+#
+# SETTLE:
+#   `python max_party_farm.py --settle` ends each menu-transition wait as soon
+#   as the screen has settled (settle.py; Windows, needs NumPy).
+#   The tuned wait stays the timeout.
+#
+# FRAME LOCK:
+#   `python max_party_farm.py --frame-lock` puts every press in its own game
+#   frame (frames.py; Windows, needs NumPy). The frame grid is fitted
+#   from captured screen changes and re-fitted as the farm runs.
+# ==================================================================
+
+import math
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import frames
+import keyprog
+import low_jitter
+import profiler
+import routines
+import telemetry
+import timing_model
+import timing_profile
+
+# ==================================================================
+# CONFIG
+# ==================================================================
+FOCUS_GRACE_SECONDS = 5
+MAX_GIL = 99_999_999
+
+# Gil farm
+GIL_PROFIT_PER_CYCLE = 352_500
+GIL_MIN_START = 210_000
+
+# Stat farm
+STAT_CYCLES = 10
+STAT_COST_PER_CYCLE = 1_500_000  # per item bought in a cycle
+MAX_RUNS = 6
+# Item purchases one iteration can pay for from max gil (keeping the reserve).
+MAX_PURCHASES = (MAX_GIL - GIL_MIN_START) // STAT_COST_PER_CYCLE
+
+CHARACTERS = {
+    "squall": 1, "zell": 2, "irvine": 3,
+    "quistis": 4, "rinoa": 5, "selphie": 6,
+}
+
+STAT_OPTIONS = {
+    "hp": {
+        "item": "Giant's Ring", "stat_up": "HP Up",
+        "max_stat": 9999, "gain_per_item": 10,
+        "items_per_cycle": 10, "max_runs": 1,
+    },
+    "str": {
+        "item": "Power Wrist", "stat_up": "Str Up",
+        "max_stat": 255, "gain_per_item": 1,
+        "items_per_cycle": 1, "max_runs": 6,
+    },
+    "vit": {
+        "item": "Force Armlet", "stat_up": "Vit Up",
+        "max_stat": 255, "gain_per_item": 1,
+        "items_per_cycle": 1, "max_runs": 6,
+    },
+    "mag": {
+        "item": "Hypno Crown", "stat_up": "Mag Up",
+        "max_stat": 255, "gain_per_item": 1,
+        "items_per_cycle": 1, "max_runs": 6,
+    },
+}
+
+# ==================================================================
+# LOGGING HELPERS
+# ==================================================================
+LABEL_W = 30
+PLAN_W = 36
+TAG_W = 13
+
+
+def format_timestamp(dt: datetime) -> str:
+    tz_abbr = "".join(w[0] for w in dt.strftime("%Z").split())
+    return dt.strftime("%Y-%m-%d %H:%M:%S ") + tz_abbr
+
+
+def log_line(label: str, value: str = "", width: int = LABEL_W) -> None:
+    print(f"{label:<{width}} {value}")
+
+
+def format_elapsed(td: timedelta) -> str:
+    total = td.total_seconds()
+    if total < 0:
+        total = 0.0
+    if total < 60:
+        return f"{total:.2f}s"
+    h = int(total // 3600)
+    m = int((total % 3600) // 60)
+    s = int(total % 60)
+    if h > 0:
+        return f"{h}hr {m}m {s}s" if s else (f"{h}hr {m}m" if m else f"{h}hr")
+    return f"{m}m {s}s" if s else f"{m}m"
+
+
+def format_duration_short(seconds):
+    """Format seconds as 20.55s, 9m 52s, or 1hr 24m 32s."""
+    if seconds < 60:
+        return f"{seconds:.2f}s"
+    h = int(seconds // 3600)
+    m = int((seconds % 3600) // 60)
+    s = int(seconds % 60)
+    if h > 0:
+        return f"{h}hr {m}m {s}s" if s else (f"{h}hr {m}m" if m else f"{h}hr")
+    return f"{m}m {s}s" if s else f"{m}m"
+
+
+def format_estimate(seconds):
+    """Format seconds as human-readable estimate like ~5m 30s or ~1h 23m."""
+    seconds = max(0, seconds)
+    if seconds < 60:
+        return f"~{int(round(seconds))}s"
+    if seconds < 3600:
+        m = int(seconds // 60)
+        s = int(round(seconds % 60))
+        if s == 60:
+            m += 1
+            s = 0
+        return f"~{m}m {s}s" if s else f"~{m}m"
+    h = int(seconds // 3600)
+    m = int(round((seconds % 3600) / 60))
+    if m == 60:
+        h += 1
+        m = 0
+    return f"~{h}h {m}m" if m else f"~{h}h"
+
+
+# ==================================================================
+# INPUT HELPERS
+# ==================================================================
+def parse_gil_input(s: str) -> int:
+    """
+    Accepts:
+      - "210000", "210,000"
+      - "210k", "210K"
+      - "0.21m", "30m", "30M"
+    Returns gil as int.
+    """
+    s = s.strip().lower().replace(",", "")
+    m = re.fullmatch(r"(\d+(\.\d+)?)([km]?)", s)
+    if not m:
+        raise ValueError("Invalid format")
+
+    value = float(m.group(1))
+    suffix = m.group(3)
+
+    if suffix == "k":
+        value *= 1_000
+    elif suffix == "m":
+        value *= 1_000_000
+
+    return int(value)
+
+
+def parse_target(s: str):
+    """"zell str 120" → (character key, stat key, base stat)."""
+    parts = s.strip().lower().split()
+    if len(parts) != 3 or parts[0] not in CHARACTERS or parts[1] not in STAT_OPTIONS:
+        raise ValueError("Enter: character stat base (e.g. zell str 120)")
+    try:
+        base = int(parts[2])
+    except ValueError:
+        raise ValueError("Base stat must be an integer.") from None
+    if base < 0:
+        raise ValueError("Base stat must be non-negative.")
+    return parts[0], parts[1], base
+
+
+# ====================================================================
+# ROUTINE PROGRAMS
+# ====================================================================
+# Programs are compiled on first use and cached by their arguments;
+# planning compiles everything the session runs.
+# ====================================================================
+MODE = timing_profile.mode_from_argv()  # game speed / frame rate (--boost, --fps N)
+WAITS = timing_profile.load_waits(mode=MODE)  # per-machine tuned waits (tune_delays.py)
+MODEL = timing_model.attach()  # learns each routine's real duration as it runs
+FRAME_LOCK = frames.enable(MODE.fps) if "--frame-lock" in sys.argv[1:] else ""  # before compiling
+PROGRAMS = {}
+
+
+def program(name, *args):
+    """Compiled routines.<name>(*args), cached."""
+    key = (name, *args)
+    if key not in PROGRAMS:
+        steps = getattr(routines, name)(*args)
+        PROGRAMS[key] = keyprog.compile_routine(name, steps, MODE.pause(routines.STAT_PAUSE), waits=WAITS)
+    return PROGRAMS[key]
+
+
+def items_of(stats):
+    return tuple(STAT_OPTIONS[k]["item"] for k in stats)
+
+
+def cycle_program(stats, later_run, final, held):
+    return program("stat_cycle", items_of(stats), later_run, final, held)
+
+
+def refine_program(stats, later_run, held):
+    return program("stat_refine", later_run, len(stats), held)
+
+
+def gil_program(cottages=None, to_stat_farm=False):
+    """Full gil cycle, or the partial last one (cottages), optionally fused into the stat farm."""
+    if to_stat_farm:
+        return program("gil_cycle_to_stat", cottages)
+    return program("gil_cycle", True, cottages)
+
+
+# ====================================================================
+# GIL HELPERS
+# ====================================================================
+def needs_gil_farm(gil, stat_cost):
+    """True if gil can't pay stat_cost and still keep the GIL_MIN_START reserve."""
+    return gil < stat_cost + GIL_MIN_START
+
+
+def gil_farm_target(remaining_costs):
+    """Gil the rest of the plan needs: its stat farm costs + the reserve, capped at max."""
+    return min(MAX_GIL, sum(remaining_costs) + GIL_MIN_START)
+
+
+def gil_farm_cycles(current_gil_amount, target_gil=MAX_GIL):
+    """Gil cycles needed to reach target_gil (capped at max) from current_gil_amount."""
+    target_gil = min(target_gil, MAX_GIL)
+    if current_gil_amount >= target_gil:
+        return 0
+    return math.ceil((target_gil - current_gil_amount) / GIL_PROFIT_PER_CYCLE)
+
+
+def final_gil_cycle_cottages(current_gil_amount, target_gil=MAX_GIL):
+    """Cottages bought by the partial last cycle of a gil farm to target_gil."""
+    cycles = gil_farm_cycles(current_gil_amount, target_gil)
+    needed = min(target_gil, MAX_GIL) - current_gil_amount - (cycles - 1) * GIL_PROFIT_PER_CYCLE
+    return routines.partial_gil_cycle_cottages(needed)
+
+
+def gil_after_farm(current_gil_amount, target_gil=MAX_GIL):
+    """Gil after farming to target_gil (the game caps gil at max)."""
+    cycles = gil_farm_cycles(current_gil_amount, target_gil)
+    if cycles <= 0:
+        return current_gil_amount
+    cottages = final_gil_cycle_cottages(current_gil_amount, target_gil)
+    profit = (cycles - 1) * GIL_PROFIT_PER_CYCLE + routines.partial_gil_cycle_profit(cottages)
+    return min(MAX_GIL, current_gil_amount + profit)
+
+
+def estimate_gil_farm_seconds(current_gil_amount, target_gil=MAX_GIL, to_stat_farm=False):
+    """Planned seconds for a gil farm from current_gil_amount to target_gil."""
+    cycles = gil_farm_cycles(current_gil_amount, target_gil)
+    if cycles <= 0:
+        return 0
+    cottages = final_gil_cycle_cottages(current_gil_amount, target_gil)
+    return (cycles - 1) * MODEL.predict(gil_program()) + MODEL.predict(gil_program(cottages, to_stat_farm))
+
+
+# ====================================================================
+# PLANNING
+# ====================================================================
+def plan_runs(lanes):
+    """
+    Runs of the next iteration; takes their cycles out of `lanes`
+    ({stat key: cycles still needed}). A run is a list of cycles, each
+    the tuple of stat keys bought in it. The iteration ends early when
+    the next cycle would cost more than max gil can pay.
+    """
+    runs = []
+    budget = MAX_PURCHASES
+    for r in range(MAX_RUNS):
+        open_lanes = [k for k in STAT_OPTIONS if lanes[k] > 0 and r < STAT_OPTIONS[k]["max_runs"]]
+        cycles = []
+        while open_lanes and len(cycles) < STAT_CYCLES:
+            stats = tuple(k for k in open_lanes if lanes[k] > 0)
+            if not stats or len(stats) > budget:
+                break
+            for k in stats:
+                lanes[k] -= 1
+            budget -= len(stats)
+            cycles.append(stats)
+        if not cycles:
+            break
+        runs.append(cycles)
+    return runs
+
+
+def plan_uses(runs, targets):
+    """
+    Split the iteration's stat-ups between the targets (in entry
+    order); the rounding surplus goes to the last one served.
+    Returns ((stat_up, character_position, count), ...) and updates each
+    target's 'remaining'.
+    """
+    produced = Counter()
+    for run in runs:
+        for cycle in run:
+            for k in cycle:
+                produced[k] += STAT_OPTIONS[k]["items_per_cycle"]
+    uses = []
+    for k, amount in produced.items():
+        stat_up = STAT_OPTIONS[k]["stat_up"]
+        served = None
+        for t in targets:
+            if t["stat"] != k or t["remaining"] <= 0 or amount <= 0:
+                continue
+            n = min(amount, t["remaining"])
+            t["remaining"] -= n
+            amount -= n
+            served = [stat_up, t["position"], n]
+            uses.append(served)
+        served[2] += amount
+    return tuple(tuple(u) for u in uses)
+
+
+def stat_farm_seconds(runs):
+    """Planned seconds for an iteration's runs (cycles, refines, transitions)."""
+    held = len(runs[0][0])
+    total = 0
+    for r, run in enumerate(runs):
+        later = r > 0
+        for c, stats in enumerate(run):
+            total += MODEL.predict(cycle_program(stats, later, c == len(run) - 1, held))
+        total += MODEL.predict(refine_program(run[0], later, held))
+        if r < len(runs) - 1:
+            total += MODEL.predict(program("stat_run_transition"))
+    return total
+
+
+def describe_runs(runs):
+    parts = []
+    for run in runs:
+        counts = Counter(k for cycle in run for k in cycle)
+        parts.append("+".join(f"{k.capitalize()}×{counts[k]}" for k in STAT_OPTIONS if counts[k]))
+    return ", ".join(parts)
+
+
+# ====================================================================
+# EXECUTION
+# ====================================================================
+def run_gil_farm(current_gil, run_start_monotonic, target_gil=MAX_GIL, to_stat_farm=False):
+    """
+    Farm from current_gil up to target_gil; returns the gil afterwards.
+    Starting state: Esthar Shop!!! → Buy menu, cursor on "Potion"
+    Ending state:   Esthar Shop!!! → Buy menu
+                    (to_stat_farm: Esthar Pet Shop → Buy, cursor on "G-Potion")
+    """
+    cycles = gil_farm_cycles(current_gil, target_gil)
+    if cycles <= 0:
+        print("  Gil already at target. Skipping gil farm.")
+        return current_gil
+    final_cottages = final_gil_cycle_cottages(current_gil, target_gil)
+    print(f"  Gil farm: {cycles} cycles ({current_gil:,} → {min(target_gil, MAX_GIL):,} gil)")
+
+    # Cycles run back to back on the emitter thread; each is logged while the next runs.
+    cycle_programs = ((n, gil_program(final_cottages, to_stat_farm) if n == cycles else gil_program())
+                      for n in range(1, cycles + 1))
+    for cycle_num, job in keyprog.run_ahead(cycle_programs, backend):
+        with PROFILER.phase("Gil cycle", job) as cycle:
+            if cycle_num == cycles:
+                profit, kept = routines.partial_gil_cycle_profit(final_cottages), 0
+            else:
+                profit, kept = GIL_PROFIT_PER_CYCLE, routines.MEGA_POTIONS_KEPT
+            TELEMETRY.record("cycle", phase="gil", cycle=cycle_num, gil_delta=profit, mega_delta=kept)
+        elapsed = timedelta(seconds=(cycle.end - run_start_monotonic))
+        print(
+            f"  Gil Cycle: {cycle_num}/{cycles} ({cycle.seconds:.2f}s) | "
+            f"Elapsed: {format_elapsed(elapsed)}"
+        )
+
+    return gil_after_farm(current_gil, target_gil)
+
+
+def run_stat_farm(runs, run_start_monotonic):
+    """
+    Starting state: Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    Ending state:   Abilities menu, inside Forbid Med-RF (after final refine)
+    """
+    held = len(runs[0][0])
+    for r, run in enumerate(runs):
+        later = r > 0
+        print(f"  --- Stat Run {r + 1}/{len(runs)} ({describe_runs([run])}) ---")
+        cycle_programs = (((c, stats), cycle_program(stats, later, c == len(run) - 1, held))
+                          for c, stats in enumerate(run))
+        for (c, stats), job in keyprog.run_ahead(cycle_programs, backend):
+            with PROFILER.phase("Stat cycle", job) as step:
+                TELEMETRY.record("cycle", phase="stat", run=r + 1, cycle=c + 1,
+                                 gil_delta=-len(stats) * STAT_COST_PER_CYCLE)
+            elapsed = timedelta(seconds=(step.end - run_start_monotonic))
+            event = f"St. Cycle: {c + 1}/{len(run)} ({', '.join(k.capitalize() for k in stats)})"
+            print(f"  {event:<40}| {step.seconds:.2f}s | Elapsed: {format_elapsed(elapsed)}")
+
+        with PROFILER.phase("Stat refine") as step:
+            keyprog.run(refine_program(run[0], later, held), backend)
+            TELEMETRY.record("phase", phase="stat", run=r + 1,
+                             items_delta=sum(STAT_OPTIONS[k]["items_per_cycle"] for stats in run for k in stats))
+        elapsed = timedelta(seconds=(step.end - run_start_monotonic))
+        print(f"  {'St. Refine: 1/1':<40}| Elapsed: {format_elapsed(elapsed)}")
+
+        if r < len(runs) - 1:
+            with PROFILER.phase("Run transition"):
+                keyprog.run(program("stat_run_transition"), backend)
+                TELEMETRY.record("nav", phase="stat", run=r + 2)
+
+
+# ====================================================================
+# USER INPUT
+# ====================================================================
+print("==========================================")
+print("FF8 Party Stat Maxing Script")
+print("==========================================")
+
+# --- TARGETS ---
+print("------------------------------------------")
+print("Enter targets, one per line: character stat current_base")
+print("  e.g. zell str 120 / squall hp 4200 — blank line when done")
+print("  Characters: Squall, Zell, Irvine, Quistis, Rinoa, Selphie")
+print("  Stats: HP, Str, Vit, Mag")
+print("------------------------------------------")
+
+targets = []
+while True:
+    raw = input(f"Target {len(targets) + 1}: ").strip()
+    if raw == "":
+        if targets:
+            break
+        print("Enter at least one target.")
+        continue
+    try:
+        char_key, stat_key, base = parse_target(raw)
+    except ValueError as e:
+        print(e)
+        continue
+    stat = STAT_OPTIONS[stat_key]
+    if any(t["character"] == char_key and t["stat"] == stat_key for t in targets):
+        print(f"{char_key.capitalize()} {stat_key.capitalize()} is already a target.")
+        continue
+    if base >= stat["max_stat"]:
+        print(f"Already at or above max ({stat['max_stat']:,}). Skipped.")
+        continue
+    items = math.ceil((stat["max_stat"] - base) / stat["gain_per_item"])
+    targets.append({
+        "character": char_key, "name": char_key.capitalize(), "position": CHARACTERS[char_key],
+        "stat": stat_key, "base": base, "items": items, "remaining": items,
+    })
+
+# --- GIL INPUT ---
+print("------------------------------------------")
+print("How much gil do you currently have?")
+print("  (examples: 210000, 210k, 0.21m, 99m, max)")
+print("------------------------------------------")
+
+while True:
+    raw = input("Current gil: ").strip()
+    if raw.lower() == "max":
+        current_gil = MAX_GIL
+        break
+    try:
+        current_gil = min(parse_gil_input(raw), MAX_GIL)
+        break
+    except ValueError:
+        print("Invalid input. Examples: 210000, 210k, 0.21m, 99m, max")
+
+# --- MAX GIL OPTION ---
+print("------------------------------------------")
+print("Max your gil after stat farming is complete?")
+print("------------------------------------------")
+while True:
+    choice = input("Max gil when done? (y/n): ").strip().lower()
+    if choice in ("y", "yes"):
+        max_gil_when_done = True
+        break
+    elif choice in ("n", "no"):
+        max_gil_when_done = False
+        break
+    print("Enter y or n.")
+
+# --- BUILD EXECUTION PLAN ---
+# Runs and item uses per iteration first; then gil, as in
+# max_stat_farm: farm only when the balance can't cover the iteration,
+# and only up to what the rest of the plan needs.
+lanes = Counter()
+for t in targets:
+    lanes[t["stat"]] += t["items"]
+for k in lanes:
+    lanes[k] = math.ceil(lanes[k] / STAT_OPTIONS[k]["items_per_cycle"])
+
+iterations = []
+while any(lanes.values()):
+    runs = plan_runs(lanes)
+    iterations.append({
+        "runs": runs,
+        "uses": plan_uses(runs, targets),
+        "cost": sum(len(cycle) for run in runs for cycle in run) * STAT_COST_PER_CYCLE,
+    })
+total_iterations = len(iterations)
+costs = [it["cost"] for it in iterations]
+
+plan_gil = current_gil
+for i, it in enumerate(iterations):
+    it["farm_gil"] = needs_gil_farm(plan_gil, it["cost"])
+    it["gil_target"] = gil_farm_target(costs[i:]) if it["farm_gil"] else plan_gil
+    it["gil_est"] = estimate_gil_farm_seconds(plan_gil, it["gil_target"], True) if it["farm_gil"] else 0
+    it["gil_cycles"] = gil_farm_cycles(plan_gil, it["gil_target"]) if it["farm_gil"] else 0
+    it["stat_est"] = stat_farm_seconds(it["runs"])
+    it["item_est"] = MODEL.predict(program("nav_stat_to_party_items", it["uses"]))
+    plan_gil = gil_after_farm(plan_gil, it["gil_target"]) - it["cost"]
+    it["gil_after"] = plan_gil
+    it["nav_est"] = 0
+    if i + 1 < total_iterations:
+        nav = "nav_items_to_gil" if needs_gil_farm(plan_gil, costs[i + 1]) else "nav_items_to_stat"
+        it["nav_est"] = MODEL.predict(program(nav))
+    it["total"] = it["gil_est"] + it["stat_est"] + it["item_est"] + it["nav_est"]
+
+stat_farm_est_s = sum(it["total"] for it in iterations)
+ending_gil_est = iterations[-1]["gil_after"]
+max_gil_farm_cycles = gil_farm_cycles(ending_gil_est)
+max_gil_farm_est_s = estimate_gil_farm_seconds(ending_gil_est) + MODEL.predict(program("nav_items_to_gil"))
+total_est_s = stat_farm_est_s + (max_gil_farm_est_s if max_gil_when_done and max_gil_farm_cycles else 0)
+estimated_duration = timedelta(seconds=total_est_s)
+
+# --- CONFIGURATION SUMMARY ---
+print("==========================================")
+print("Configuration Summary")
+print("------------------------------------------")
+for t in targets:
+    stat = STAT_OPTIONS[t["stat"]]
+    log_line(f"{t['name']} {t['stat'].capitalize()}:",
+             f"{t['base']:,} → {stat['max_stat']:,} ({t['items']}x {stat['stat_up']})")
+log_line("Total iterations:", str(total_iterations))
+log_line("Current gil:", f"{current_gil:,}")
+log_line("Starting phase:", "Gil Farm" if iterations[0]["farm_gil"] else "Stat Farm")
+log_line("Max gil when done:", "Yes" if max_gil_when_done else "No")
+log_line("Timing profile:", timing_profile.describe(WAITS, mode=MODE))
+log_line("Timing model:", MODEL.describe())
+print("==========================================")
+
+# --- EXECUTION PLAN ---
+print("Execution Plan")
+for i, it in enumerate(iterations):
+    print("------------------------------------------")
+    log_line(f"Iteration {i + 1}/{total_iterations}:", format_estimate(it["total"]), PLAN_W)
+    if it["farm_gil"]:
+        log_line(f"  Gil Farm ({it['gil_cycles']} cycles):", format_estimate(it["gil_est"]), PLAN_W)
+    n_runs = len(it["runs"])
+    log_line(f"  Stat Farm ({n_runs} {'run' if n_runs == 1 else 'runs'}):", format_estimate(it["stat_est"]), PLAN_W)
+    print(f"    {describe_runs(it['runs'])}")
+    n_items = sum(u[2] for u in it["uses"])
+    log_line(f"  Nav + Items ({n_items}x):", format_estimate(it["item_est"] + it["nav_est"]), PLAN_W)
+if max_gil_when_done and max_gil_farm_cycles:
+    print("------------------------------------------")
+    log_line(f"Max Gil Farm ({max_gil_farm_cycles} cycles):", format_estimate(max_gil_farm_est_s), PLAN_W)
+print("------------------------------------------")
+log_line("Total estimated:", format_estimate(total_est_s), PLAN_W)
+print("==========================================")
+
+if not iterations[0]["farm_gil"]:
+    print("REQUIRED: Esthar Pet Shop → Buy menu, cursor on 'G-Potion'")
+else:
+    print("REQUIRED: Esthar Shop!!! → Buy menu, cursor on 'Potion'")
+
+backend = keyprog.default_backend()
+if "--low-jitter" in sys.argv[1:]:
+    prepared = low_jitter.warm(backend, PROGRAMS.values())
+    log_line("Low jitter:", f"{low_jitter.enable()}; {prepared} programs prepared")
+
+if "--settle" in sys.argv[1:]:
+    import settle
+
+    log_line("Settle:", settle.enable())
+
+if FRAME_LOCK:
+    log_line("Frame lock:", FRAME_LOCK)
+
+print(f"Click into FF8 now. Starting in {FOCUS_GRACE_SECONDS} seconds...")
+time.sleep(FOCUS_GRACE_SECONDS)
+
+# ====================================================================
+# MAIN LOOP
+# ====================================================================
+start_time = datetime.now().astimezone()
+estimated_finish_time = start_time + estimated_duration
+run_start_monotonic = time.perf_counter()
+names = {t["position"]: t["name"] for t in targets}
+TELEMETRY = telemetry.start("max_party_farm", WAITS, mode=MODE.key, gil=current_gil, plan_seconds=total_est_s,
+                            targets=[[t["name"], t["stat"], t["items"]] for t in targets])
+PROFILER = profiler.attach()
+
+print("==========================================")
+print("Party Stat Maxing Started")
+log_line("Start time:", format_timestamp(start_time))
+log_line("Estimated finish:", format_timestamp(estimated_finish_time))
+print("==========================================")
+
+for iteration, it in enumerate(iterations, start=1):
+    low_jitter.collect()  # between key programs, never during one
+    iter_start_mono = time.perf_counter()
+
+    print("==========================================")
+    print(f"Iteration {iteration}/{total_iterations}")
+    log_line("  Runs:", describe_runs(it["runs"]))
+    log_line("  Items:", ", ".join(f"{n}x {s} → {names[p]}" for s, p, n in it["uses"]))
+    if it["farm_gil"]:
+        log_line("  Gil farm:", f"Yes (to {it['gil_target']:,})")
+    else:
+        log_line("  Gil farm:", f"Skipped ({current_gil:,} covers {it['cost']:,})")
+    log_line("  Iteration ETA:", format_estimate(it["total"]))
+    print("==========================================")
+
+    # --- GIL FARM (only if the balance can't cover this iteration) ---
+    if needs_gil_farm(current_gil, it["cost"]):
+        if current_gil < GIL_MIN_START:
+            print(f"ERROR: Insufficient gil ({current_gil:,}). Need at least {GIL_MIN_START:,}.")
+            raise SystemExit
+        gil_target = gil_farm_target(costs[iteration - 1:])
+        print(f"{'[Gil Farm]':<{TAG_W}}Farming to {gil_target:,} gil... (ETA: {format_estimate(it['gil_est'])})")
+        with PROFILER.phase("Gil farm"):
+            current_gil = run_gil_farm(current_gil, run_start_monotonic, gil_target, to_stat_farm=True)
+
+    # --- STAT FARM ---
+    print(f"{'[St. Farm]':<{TAG_W}}Farming stat-up items... (ETA: {format_estimate(it['stat_est'])})")
+    with PROFILER.phase("Stat farm"):
+        run_stat_farm(it["runs"], run_start_monotonic)
+    current_gil -= it["cost"]
+
+    # --- ITEM USAGE (one Item menu visit for every target) ---
+    print(f"{'[Item Use]':<{TAG_W}}Using stat-ups on the party... (ETA: {format_estimate(it['item_est'])})")
+    used = sum(n for _, _, n in it["uses"])
+    with PROFILER.phase("Item use") as step:
+        keyprog.run(program("nav_stat_to_party_items", it["uses"]), backend)
+        TELEMETRY.record("items", phase="items", items_delta=-used)
+    elapsed = timedelta(seconds=(step.end - run_start_monotonic))
+    event = f"Item usage complete ({used} used, {used / step.seconds:.1f}/s)"
+    print(f"  {event:<40}| Elapsed: {format_elapsed(elapsed)}")
+
+    # --- NAVIGATE TO NEXT ITERATION'S FIRST PHASE ---
+    if iteration < total_iterations:
+        with PROFILER.phase("Navigation"):
+            if needs_gil_farm(current_gil, costs[iteration]):
+                print(f"{'[Navigate]':<{TAG_W}}Item Use → Gil Farm")
+                keyprog.run(program("nav_items_to_gil"), backend)
+                TELEMETRY.record("nav", phase="gil")
+            else:
+                print(f"{'[Navigate]':<{TAG_W}}Item Use → Stat Farm (gil covers next iteration)")
+                keyprog.run(program("nav_items_to_stat"), backend)
+                TELEMETRY.record("nav", phase="stat")
+
+    iter_seconds = time.perf_counter() - iter_start_mono
+    TELEMETRY.record("iteration", iteration=iteration, start=iter_start_mono, end=iter_start_mono + iter_seconds,
+                     planned=it["total"], gil=current_gil)
+    elapsed = timedelta(seconds=(time.perf_counter() - run_start_monotonic))
+    print("------------------------------------------")
+    log_line(f"Iteration {iteration} complete:",
+             f"{format_duration_short(iter_seconds)} (estimated {format_estimate(it['total'])})")
+    log_line("  Elapsed:", format_elapsed(elapsed))
+    print("------------------------------------------")
+
+# ====================================================================
+# MAX GIL FARM
+# ====================================================================
+if max_gil_when_done and current_gil < MAX_GIL:
+    with PROFILER.phase("Max gil farm"):
+        print(f"{'[Navigate]':<{TAG_W}}Item Use → Gil Farm")
+        with PROFILER.phase("Navigation"):
+            keyprog.run(program("nav_items_to_gil"), backend)
+            TELEMETRY.record("nav", phase="gil")
+        print(f"{'[Gil Farm]':<{TAG_W}}Farming to max gil... (ETA: {format_estimate(max_gil_farm_est_s)})")
+        current_gil = run_gil_farm(current_gil, run_start_monotonic)  # the only farm that targets max gil
+
+# ====================================================================
+# FINISH
+# ====================================================================
+end_time = datetime.now().astimezone()
+actual_duration = end_time - start_time
+
+print("==========================================")
+print("Party Stat Maxing Complete!")
+print("------------------------------------------")
+for t in targets:
+    stat = STAT_OPTIONS[t["stat"]]
+    log_line(f"{t['name']} {t['stat'].capitalize()}:", f"→ {stat['max_stat']:,} ({t['items']}x {stat['stat_up']})")
+log_line("Total iterations:", str(total_iterations))
+log_line("Estimated gil remaining:", f"{current_gil:,}")
+print("------------------------------------------")
+log_line("Start:", format_timestamp(start_time))
+log_line("Finish:", format_timestamp(end_time))
+log_line("Duration:", f"{format_elapsed(actual_duration)} (estimated {format_estimate(total_est_s)})")
+print("==========================================")
+print(PROFILER.report())
+print("==========================================")
+
+TELEMETRY.close()
@@ -1,5 +1,5 @@
 # ==================================================================
-# max_stat_farm.py — v1.2 (2026-02-23)
+# max_stat_farm.py — v1.6 (2026-10-17)
 # ==================================================================
 # Automated stat maxing for a single FF8 character.
 # Combines gil_farm.py and stat_up_farm.py
@@ -7,7 +7,11 @@
 # stat reaches its maximum value.
 #
 # WORKFLOW (per iteration):
-#   1. Gil Farm  — Buy/sell Mega Potions to reach 99,999,999 gil
+#   1. Gil Farm  — Buy/sell Mega Potions up to the gil the rest of
+#                  the plan needs (its stat farm costs + 210k reserve,
+#                  at most 99,999,999); skipped while the balance
+#                  covers the iteration. The last cycle is partial
+#                  (only the Cottages still needed, no Tents).
 #   2. St. Farm  — Buy shop items + GF ability refine into stat-ups
 #   3. Item Use  — Apply stat-up items to the target character
 #   4. Repeat until the stat is maxed
@@ -74,26 +78,61 @@
 # ==================================================================
 # 1) Item menu: Page 1 must be COMPLETELY empty (keeps item
 #    ordering consistent after refinements).
-# 2) Starting state depends on your current gil:
-#    - Max gil (99,999,999):
+# 2) Starting state depends on your current gil (the script prints
+#    which one applies):
+#    - Gil covers the first iteration's stat farm cost + 210,000:
 #      Call Shop → Esthar Pet Shop → Buy menu, cursor on "G-Potion"
-#    - Not max gil:
+#    - Otherwise (gil farm first):
 #      Call Shop → Esthar Shop!!! → Buy menu, cursor on "Potion"
 # 3) Keep FF8 focused while running (do not alt-tab).
 #    Borderless Windowed is recommended.
+#
+# RESUMING:
+#   Progress is checkpointed after every cycle. After a crash or
+#   Ctrl+C, run `python max_stat_farm.py --resume`: it skips the
+#   prompts, prints the menu state to restore and continues with the
+#   next step.
+#
+# LOW JITTER:
+#   `python max_stat_farm.py --low-jitter` freezes the GC, pins the
+#   process to one core and raises timer resolution and priority
+#   where the OS allows (low_jitter.py) for a steadier key timeline.
+#
+# GAME SPEED:
+#   `python max_stat_farm.py --boost` runs with the Remastered speed
+#   booster on (`--fps 30`: menus at 30 fps). Waits come from that
+#   mode's timing profile (timing_profile.py), and so do the ETAs.
+#
+# SETTLE:
+#   `python max_stat_farm.py --settle` ends each menu-transition wait as soon
+#   as the screen has settled (settle.py; Windows, needs NumPy).
+#   The tuned wait stays the timeout.
+#
+# FRAME LOCK:
+#   `python max_stat_farm.py --frame-lock` puts every press in its own game
+#   frame (frames.py; Windows, needs NumPy). The frame grid is fitted
+#   from captured screen changes and re-fitted as the farm runs.
 # ==================================================================
 
-import time
+import json
 import math
 import re
+import sys
+import time
 from datetime import datetime, timedelta
 
-import pydirectinput as pdi
+import frames
+import keyprog
+import low_jitter
+import profiler
+import routines
+import telemetry
+import timing_model
+import timing_profile
 
 # ==================================================================
 # CONFIG
 # ==================================================================
-pdi.PAUSE = 0.02
 FOCUS_GRACE_SECONDS = 5
 MAX_GIL = 99_999_999
 
@@ -107,7 +146,10 @@ STAT_CYCLES = 10
 STAT_COST_PER_CYCLE = 1_500_000
 STAT_COST_PER_RUN = STAT_COST_PER_CYCLE * STAT_CYCLES
 
-# Time estimates (calibrated from actual runs)
+# Time estimates (calibrated from actual runs). Replaced at startup by
+# use_timeline_estimates() with the predicted duration of the compiled
+# routines: their planned timeline plus the overhead this machine has
+# shown so far (timing_model.py).
 STAT_CYCLE_RETURN_S = 9.35
 STAT_CYCLE_FINAL_S = 6.5
 STAT_REF_S = 2.2
@@ -116,6 +158,7 @@ NAV_GIL_TO_STAT_S = 3
 NAV_STAT_TO_ITEMS_BASE_S = 3
 NAV_STAT_TO_ITEMS_PER_ITEM_S = 0.22
 NAV_ITEMS_TO_GIL_S = 4
+NAV_ITEMS_TO_STAT_S = 4
 
 CHARACTERS = {
     "squall": 1, "zell": 2, "irvine": 3,
@@ -124,22 +167,22 @@ CHARACTERS = {
 
 STAT_OPTIONS = {
     "hp": {
-        "presses": 4, "item": "Giant's Ring", "stat_up": "HP Up",
+        "item": "Giant's Ring", "stat_up": "HP Up",
         "max_stat": 9999, "gain_per_item": 10,
         "items_per_cycle": 10, "max_runs": 1,
     },
     "str": {
-        "presses": 3, "item": "Power Wrist", "stat_up": "Str Up",
+        "item": "Power Wrist", "stat_up": "Str Up",
         "max_stat": 255, "gain_per_item": 1,
         "items_per_cycle": 1, "max_runs": 6,
     },
     "vit": {
-        "presses": 2, "item": "Force Armlet", "stat_up": "Vit Up",
+        "item": "Force Armlet", "stat_up": "Vit Up",
         "max_stat": 255, "gain_per_item": 1,
         "items_per_cycle": 1, "max_runs": 6,
     },
     "mag": {
-        "presses": 1, "item": "Hypno Crown", "stat_up": "Mag Up",
+        "item": "Hypno Crown", "stat_up": "Mag Up",
         "max_stat": 255, "gain_per_item": 1,
         "items_per_cycle": 1, "max_runs": 6,
     },
@@ -305,12 +348,38 @@ def estimate_stat_farm_seconds(num_runs, last_run_cycles):
     return total
 
 
-def estimate_gil_farm_seconds(current_gil_amount):
-    """Estimate seconds for gil farm from current_gil_amount to max."""
-    if current_gil_amount >= MAX_GIL:
+def gil_farm_cycles(current_gil_amount, target_gil=MAX_GIL):
+    """Gil cycles needed to reach target_gil (capped at max) from current_gil_amount."""
+    target_gil = min(target_gil, MAX_GIL)
+    if current_gil_amount >= target_gil:
+        return 0
+    return math.ceil((target_gil - current_gil_amount) / GIL_PROFIT_PER_CYCLE)
+
+
+def final_gil_cycle_cottages(current_gil_amount, target_gil=MAX_GIL):
+    """Cottages bought by the partial last cycle of a gil farm to target_gil."""
+    cycles = gil_farm_cycles(current_gil_amount, target_gil)
+    needed = min(target_gil, MAX_GIL) - current_gil_amount - (cycles - 1) * GIL_PROFIT_PER_CYCLE
+    return routines.partial_gil_cycle_cottages(needed)
+
+
+def gil_after_farm(current_gil_amount, target_gil=MAX_GIL):
+    """Gil after farming to target_gil (the game caps gil at max)."""
+    cycles = gil_farm_cycles(current_gil_amount, target_gil)
+    if cycles <= 0:
+        return current_gil_amount
+    cottages = final_gil_cycle_cottages(current_gil_amount, target_gil)
+    profit = (cycles - 1) * GIL_PROFIT_PER_CYCLE + routines.partial_gil_cycle_profit(cottages)
+    return min(MAX_GIL, current_gil_amount + profit)
+
+
+def estimate_gil_farm_seconds(current_gil_amount, target_gil=MAX_GIL):
+    """Estimate seconds for gil farm from current_gil_amount to target_gil."""
+    cycles = gil_farm_cycles(current_gil_amount, target_gil)
+    if cycles <= 0:
         return 0
-    cycles = math.ceil((MAX_GIL - current_gil_amount) / GIL_PROFIT_PER_CYCLE)
-    return cycles * GIL_SECONDS_PER_CYCLE
+    cottages = final_gil_cycle_cottages(current_gil_amount, target_gil)
+    return (cycles - 1) * GIL_SECONDS_PER_CYCLE + MODEL.predict(gil_program(cottages))
 
 
 def estimate_item_usage_seconds(num_items):
@@ -318,6 +387,11 @@ def estimate_item_usage_seconds(num_items):
     return NAV_STAT_TO_ITEMS_BASE_S + num_items * NAV_STAT_TO_ITEMS_PER_ITEM_S
 
 
+def needs_gil_farm(gil, stat_cost):
+    """True if gil can't pay stat_cost and still keep the GIL_MIN_START reserve."""
+    return gil < stat_cost + GIL_MIN_START
+
+
 def calculate_stat_farm_cost(num_runs, last_run_cycles):
     """Calculate exact gil cost for stat farming, accounting for partial runs."""
     if num_runs <= 0:
@@ -327,114 +401,240 @@ def calculate_stat_farm_cost(num_runs, last_run_cycles):
     return num_runs * STAT_COST_PER_RUN
 
 
+def gil_farm_target(remaining_costs):
+    """Gil the rest of the plan needs: its stat farm costs + the reserve, capped at max."""
+    return min(MAX_GIL, sum(remaining_costs) + GIL_MIN_START)
+
+
+# ====================================================================
+# ROUTINE PROGRAMS
+# ====================================================================
+# Key routines are compiled once at startup (build_programs) and
+# replayed by keyprog.run; see routines.py for the key sequences.
+# ====================================================================
+MODE = timing_profile.mode_from_argv()  # game speed / frame rate (--boost, --fps N)
+WAITS = timing_profile.load_waits(mode=MODE)  # per-machine tuned waits (tune_delays.py)
+MODEL = timing_model.attach()  # learns each routine's real duration as it runs
+FRAME_LOCK = frames.enable(MODE.fps) if "--frame-lock" in sys.argv[1:] else ""  # before compiling
+
+
+def compile_max_stat(name, steps):
+    return keyprog.compile_routine(name, steps, MODE.pause(routines.STAT_PAUSE), waits=WAITS)
+
+
+def build_programs(stat):
+    """Compile every fixed routine used by the main loop."""
+    programs = {
+        "gil_cycle": compile_max_stat("gil_cycle", routines.gil_cycle()),
+        "gil_cycle_to_stat": compile_max_stat("gil_cycle_to_stat", routines.gil_cycle_to_stat()),
+        "stat_run_transition": compile_max_stat("stat_run_transition", routines.stat_run_transition()),
+        "nav_items_to_gil": compile_max_stat("nav_items_to_gil", routines.nav_items_to_gil()),
+        "nav_items_to_stat": compile_max_stat("nav_items_to_stat", routines.nav_items_to_stat()),
+    }
+    for later in (False, True):
+        programs["stat_refine", later] = compile_max_stat("stat_refine", routines.stat_refine(later))
+        for final in (False, True):
+            steps = routines.stat_cycle(stat["item"], later_run=later, final=final)
+            programs["stat_cycle", later, final] = compile_max_stat("stat_cycle", steps)
+    return programs
+
+
+def gil_program(cottages=None, to_stat_farm=False):
+    """Gil cycle program; cottages = partial last cycle, compiled once per count."""
+    name = "gil_cycle_to_stat" if to_stat_farm else "gil_cycle"
+    if cottages is None:
+        return PROGRAMS[name]
+    key = (name, cottages)
+    if key not in PROGRAMS:
+        steps = routines.gil_cycle_to_stat(cottages) if to_stat_farm else routines.gil_cycle(cottages=cottages)
+        PROGRAMS[key] = compile_max_stat(name, steps)
+    return PROGRAMS[key]
+
+
+def use_program(count, character_position):
+    """Item-use burst of `count` stat-ups on the highlighted character."""
+    return compile_max_stat("use_burst", routines.use_burst([(character_position, count)], character_position))
+
+
+def use_timeline_estimates(programs, character_position):
+    """Set the time estimate constants from the compiled routines."""
+    global GIL_SECONDS_PER_CYCLE, STAT_CYCLE_RETURN_S, STAT_CYCLE_FINAL_S
+    global STAT_REF_S, STAT_RUN_TRANSITION_S, NAV_GIL_TO_STAT_S
+    global NAV_STAT_TO_ITEMS_BASE_S, NAV_STAT_TO_ITEMS_PER_ITEM_S, NAV_ITEMS_TO_GIL_S, NAV_ITEMS_TO_STAT_S
+
+    predict = MODEL.predict
+    GIL_SECONDS_PER_CYCLE = predict(programs["gil_cycle"])
+    STAT_CYCLE_RETURN_S = predict(programs["stat_cycle", False, False])
+    STAT_CYCLE_FINAL_S = predict(programs["stat_cycle", False, True])
+    STAT_REF_S = predict(programs["stat_refine", False])
+    # Later runs press one extra "down" per cycle and in St.Refine;
+    # charge that to the run transition.
+    later_run_extra = (
+        (STAT_CYCLES - 1) * (predict(programs["stat_cycle", True, False]) - STAT_CYCLE_RETURN_S)
+        + predict(programs["stat_cycle", True, True]) - STAT_CYCLE_FINAL_S
+        + predict(programs["stat_refine", True]) - STAT_REF_S
+    )
+    STAT_RUN_TRANSITION_S = predict(programs["stat_run_transition"]) + later_run_extra
+    # Gil → stat is fused into the last gil cycle; only its extra time counts.
+    NAV_GIL_TO_STAT_S = predict(programs["gil_cycle_to_stat"]) - GIL_SECONDS_PER_CYCLE
+    NAV_ITEMS_TO_GIL_S = predict(programs["nav_items_to_gil"])
+    NAV_ITEMS_TO_STAT_S = predict(programs["nav_items_to_stat"])
+
+    # Per item: what one more use adds to a burst (planned time plus the
+    # learned per-press overhead); the rest of a burst is paid once per
+    # iteration.
+    nav = compile_max_stat("nav_stat_to_items", routines.nav_stat_to_items(character_position))
+    use_one = predict(use_program(1, character_position))
+    NAV_STAT_TO_ITEMS_PER_ITEM_S = predict(use_program(2, character_position)) - use_one
+    NAV_STAT_TO_ITEMS_BASE_S = predict(nav) + use_one - NAV_STAT_TO_ITEMS_PER_ITEM_S
+
+
+# ====================================================================
+# CHECKPOINT
+# ====================================================================
+# The session's inputs and bookkeeping are written (atomically, see
+# timing_profile.atomic_write_json) after every cycle and phase, so a
+# killed or interrupted session continues with --resume from the step
+# after the last one that finished. `phase` is that last step:
+#
+#   start    — iteration not begun (gil or stat farm next)
+#   gil      — gil_cycle gil cycles of this iteration's farm done
+#   stat     — run `run`, `cycle` stat cycles done (shop next)
+#   refine   — run `run`, all stat cycles done (St.Refine next)
+#   refined  — run `run` refined (transition or item use next)
+#   use      — at the stat-up item, ready to use
+#   used     — items used (navigation to the next iteration next)
+#   max_gil  — gil_cycle cycles of the max gil farm done
+# ====================================================================
+CHECKPOINT_VERSION = 1
+CHECKPOINT_PATH = timing_profile.DATA_DIR / "max_stat_farm_checkpoint.json"
+PHASES = ("start", "gil", "stat", "refine", "refined", "use", "used", "max_gil")
+
+REQUIRED_STATES = {
+    "gil": "Esthar Shop!!! → Buy menu, cursor on 'Potion'",
+    "stat": "Esthar Pet Shop → Buy menu, cursor on 'G-Potion'",
+    "refine": "Abilities menu, cursor on 'GFAbl Med-RF'",
+    "refined": "Abilities menu, inside Forbid Med-RF",
+    "use": "Item menu → {stat_up} selected → {character} highlighted, cursor on 'Use'",
+    "used": "Item menu",
+    "max_gil": "Esthar Shop!!! → Buy menu, cursor on 'Potion'",
+}
+
+POSITIONS = {
+    "start": "Iteration {iteration}, start",
+    "gil": "Iteration {iteration}, gil cycle {gil_cycle} done",
+    "stat": "Iteration {iteration}, run {run_num}, St. cycle {cycle} done",
+    "refine": "Iteration {iteration}, run {run_num}, St.Refine next",
+    "refined": "Iteration {iteration}, run {run_num}, St.Refine done",
+    "use": "Iteration {iteration}, item use next",
+    "used": "Iteration {iteration}, items used",
+    "max_gil": "Max gil farm, gil cycle {gil_cycle} done",
+}
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """Return the saved checkpoint, or None if no session is unfinished."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    if data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {path}: {data.get('version')!r}")
+    return data
+
+
+def save_checkpoint(phase, run=0, cycle=0, gil_cycle=0, gil=None, iteration_num=None):
+    """Record `phase` as the last finished step, with the main loop's bookkeeping."""
+    now = time.perf_counter()
+    started = phase == "start" or phase == "max_gil"
+    if iteration_num is None:
+        iteration_num = total_iterations + 1 if phase == "max_gil" else iteration
+    timing_profile.atomic_write_json(CHECKPOINT_PATH, {
+        "version": CHECKPOINT_VERSION,
+        "updated": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "session": session,
+        "iteration": iteration_num,
+        "phase": phase, "run": run, "cycle": cycle, "gil_cycle": gil_cycle,
+        "remaining_items": remaining_items,
+        "current_gil": current_gil if gil is None else gil,
+        "iteration_times": iteration_times,
+        "elapsed": now - run_start_monotonic,
+        "iteration_elapsed": 0 if started else now - iter_start_mono,
+    })
+
+
+def clear_checkpoint():
+    """Forget the checkpoint once the session is complete."""
+    try:
+        CHECKPOINT_PATH.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def describe_position(cp):
+    return POSITIONS[cp["phase"]].format(run_num=cp["run"] + 1, **cp)
+
+
+def required_state(phase, iteration_num):
+    """Menu state the game must be in before `phase`'s next step."""
+    if phase == "start":
+        cost = execution_plan[iteration_num - 1]['cost']
+        phase = "gil" if needs_gil_farm(current_gil, cost) else "stat"
+    return REQUIRED_STATES[phase].format(stat_up=stat['stat_up'], character=character_name)
+
+
 # ====================================================================
 # GIL FARM
 # ====================================================================
 # Buy Cottages/Tents → Refine to Mega Potions → Sell for profit.
 # Starting state: Esthar Shop!!! → Buy menu, cursor on "Potion"
 # Ending state:   Esthar Shop!!! → Buy menu (after last sell cycle)
+#                 to_stat_farm: the last cycle leaves the Sell list
+#                 straight for Esthar Pet Shop → Buy, cursor on "G-Potion"
 # ====================================================================
-def run_gil_farm(current_gil, run_start_monotonic):
-    remaining = MAX_GIL - current_gil
-    cycles = math.ceil(remaining / GIL_PROFIT_PER_CYCLE)
+def run_gil_farm(current_gil, run_start_monotonic, target_gil=MAX_GIL, to_stat_farm=False,
+                 phase="gil", cycles_done=0):
+    """
+    Farm from current_gil up to target_gil; returns the gil afterwards.
+    Every full cycle is checkpointed as `phase`; cycles_done counts the
+    cycles a resumed farm already ran (for the cycle numbering only).
+    """
+    cycles = gil_farm_cycles(current_gil, target_gil)
+    final_cottages = final_gil_cycle_cottages(current_gil, target_gil)
 
     if cycles <= 0:
-        print("  Gil already at max. Skipping gil farm.")
-        return
-
-    print(f"  Gil farm: {cycles} cycles ({current_gil:,} → {MAX_GIL:,} gil)")
-
-    for cycle_num in range(1, cycles + 1):
-        cycle_start = time.perf_counter()
-
-        # PHASE 1 — BUY TENTS & COTTAGES
-        pdi.press("right")
-        time.sleep(0.2)
-        pdi.press("up")
-        pdi.press("up")
-        pdi.press("enter")
-        time.sleep(0.15)
-
-        for i in range(10):
-            pdi.press("up")
-        pdi.press("enter")
-        pdi.press("up")
-        pdi.press("enter")
-        time.sleep(0.15)
-
-        for i in range(10):
-            pdi.press("up")
-        pdi.press("enter")
-
-        pdi.press("c")
-        time.sleep(0.4)
-        pdi.press("c")
-        time.sleep(0.65)
-
-        # PHASE 2 — REFINE ITEMS → MEGA POTIONS
-        pdi.press("c")
-        time.sleep(0.4)
-        pdi.press("right")
-        time.sleep(0.2)
-        pdi.press("up")
-        pdi.press("enter")
-        time.sleep(0.65)
-        pdi.press("enter")
-        time.sleep(0.2)
-
-        for i in range(3):
-            pdi.press("down")
-        pdi.press("enter")
-        time.sleep(0.1)
-        pdi.press("down")
-        pdi.press("enter")
-        time.sleep(0.2)
-
-        for i in range(5):
-            pdi.press("down")
-        pdi.press("enter")
-        time.sleep(0.1)
-
-        pdi.press("c")
-        time.sleep(0.65)
-
-        # PHASE 3 — SELL MEGA POTIONS
-        pdi.press("left")
-        time.sleep(0.2)
-        pdi.press("down")
-        pdi.press("enter")
-        time.sleep(0.4)
-        pdi.press("enter")
-        time.sleep(0.65)
-
-        pdi.press("right")
-        pdi.press("enter")
-        time.sleep(0.4)
-        pdi.press("down")
-        pdi.press("down")
-        pdi.press("enter")
-        time.sleep(0.2)
-
-        for i in range(8):
-            pdi.press("up")
-        pdi.press("enter")
-
-        pdi.press("c")
-        time.sleep(0.4)
-        pdi.press("left")
-        pdi.press("enter")
-        time.sleep(0.4)
+        print("  Gil already at target. Skipping gil farm.")
+        return current_gil
+
+    print(f"  Gil farm: {cycles} cycles ({current_gil:,} → {min(target_gil, MAX_GIL):,} gil)")
+
+    # PHASE 1-3 — BUY → REFINE → SELL (last cycle: partial,
+    # to_stat_farm: → Esthar Pet Shop). Cycles run back to back on the
+    # emitter thread; each is checkpointed and logged while the next runs.
+    cycle_programs = ((n, gil_program(final_cottages, to_stat_farm) if n == cycles else PROGRAMS["gil_cycle"])
+                      for n in range(1, cycles + 1))
+    for cycle_num, job in keyprog.run_ahead(cycle_programs, backend):
+        with PROFILER.phase("Gil cycle", job) as cycle:
+            if cycle_num == cycles:
+                profit, kept = routines.partial_gil_cycle_profit(final_cottages), 0
+            else:
+                save_checkpoint(phase, gil_cycle=cycles_done + cycle_num,
+                                gil=current_gil + cycle_num * GIL_PROFIT_PER_CYCLE)
+                profit, kept = GIL_PROFIT_PER_CYCLE, routines.MEGA_POTIONS_KEPT
+            TELEMETRY.record("cycle", phase=phase, cycle=cycles_done + cycle_num, gil_delta=profit,
+                             mega_delta=kept)
 
         # PER-CYCLE LOGGING
-        cycle_end = time.perf_counter()
-        cycle_seconds = cycle_end - cycle_start
-        elapsed = timedelta(seconds=(cycle_end - run_start_monotonic))
+        elapsed = timedelta(seconds=(cycle.end - run_start_monotonic))
 
         print(
-            f"  Gil Cycle: {cycle_num}/{cycles} ({cycle_seconds:.2f}s) | "
+            f"  Gil Cycle: {cycles_done + cycle_num}/{cycles_done + cycles} ({cycle.seconds:.2f}s) | "
             f"Elapsed: {format_elapsed(elapsed)}"
         )
 
+    return gil_after_farm(current_gil, target_gil)
+
 
 # ====================================================================
 # STAT FARM
@@ -443,7 +643,12 @@ def run_gil_farm(current_gil, run_start_monotonic):
 # Starting state: Esthar Pet Shop → Buy menu, cursor on "G-Potion"
 # Ending state:   Abilities menu, inside Forbid Med-RF (after final refine)
 # ====================================================================
-def run_stat_up_farm(stat, num_runs, run_start_monotonic, last_run_cycles=STAT_CYCLES):
+def run_stat_up_farm(stat, num_runs, run_start_monotonic, last_run_cycles=STAT_CYCLES, resume_at=None):
+    """
+    Run the stat farm, checkpointing every cycle and refine.
+    resume_at = (phase, run, cycle) from a checkpoint continues after
+    that step instead of starting at run 1, cycle 1.
+    """
     run_word = "run" if num_runs == 1 else "runs"
     if last_run_cycles < STAT_CYCLES:
         cycle_word = "cycle" if last_run_cycles == 1 else "cycles"
@@ -454,145 +659,75 @@ def run_stat_up_farm(stat, num_runs, run_start_monotonic, last_run_cycles=STAT_C
     else:
         print(f"  Stat farm: {stat['item']} → {stat['stat_up']} ({num_runs} {run_word})")
 
-    for run in range(num_runs):
+    resume_phase, first_run, cycles_done = resume_at or ("stat", 0, 0)
+
+    for run in range(first_run, num_runs):
         cycles_this_run = last_run_cycles if run == num_runs - 1 else STAT_CYCLES
+        if run > first_run:
+            resume_phase, cycles_done = "stat", 0
 
         if num_runs > 1:
             cw = "cycle" if cycles_this_run == 1 else "cycles"
             print(f"  --- Stat Run {run + 1}/{num_runs} ({cycles_this_run} {cw}) ---")
 
-        # PHASE 1 — SHOP + GFAbl Med-RF LOOP
-        for cycle in range(1, cycles_this_run + 1):
-            cycle_start = time.perf_counter()
-
-            # PHASE 1.0 — BUY ITEM
-            pdi.press('right')
-            time.sleep(0.3)
-            for i in range(stat["presses"]):
-                pdi.press('up')
-            pdi.press('enter')
-            time.sleep(0.2)
-            for i in range(10):
-                pdi.press('up')
-            pdi.press('enter')
-
-            pdi.press('c')
-            time.sleep(0.4)
-            pdi.press('c')
-            time.sleep(0.65)
-            pdi.press('c')
-            time.sleep(0.4)
-
-            # PHASE 1.2 — REFINE ITEM → Mid Tier (GFAbl Med-RF)
-            pdi.press('right')
-            time.sleep(0.25)
-            for i in range(5):
-                pdi.press('down')
-            pdi.press('enter')
-            time.sleep(0.65)
-            if run > 0:
-                pdi.press('down')
-            pdi.press('enter')
-            time.sleep(0.15)
-            pdi.press('down')
-            pdi.press('enter')
-            time.sleep(0.15)
-
-            # PHASE 1.3 — RETURN TO SHOP (or exit on final cycle)
-            pdi.press('c')
-            time.sleep(0.65)
-            if cycle == cycles_this_run:
+        # PHASE 1 — SHOP + GFAbl Med-RF LOOP (none left when resuming at St.Refine)
+        cycles_left = range(cycles_done + 1, cycles_this_run + 1) if resume_phase == "stat" else ()
+        # PHASE 1.0 — BUY ITEM
+        # PHASE 1.2 — REFINE ITEM → Mid Tier (GFAbl Med-RF)
+        # PHASE 1.3 — RETURN TO SHOP (or exit on final cycle)
+        cycle_programs = ((c, PROGRAMS["stat_cycle", run > 0, c == cycles_this_run]) for c in cycles_left)
+        for cycle, job in keyprog.run_ahead(cycle_programs, backend):
+            with PROFILER.phase("Stat cycle", job) as step:
+                final_cycle = cycle == cycles_this_run
+                TELEMETRY.record("cycle", phase="stat", run=run + 1, cycle=cycle, gil_delta=-STAT_COST_PER_CYCLE)
+                save_checkpoint("refine" if final_cycle else "stat", run=run, cycle=cycle)
+            if final_cycle:
                 break
-            pdi.press('left')
-            time.sleep(0.25)
-            for i in range(5):
-                pdi.press('up')
-            pdi.press('enter')
-            time.sleep(0.4)
-            pdi.press('enter')
-            time.sleep(0.65)
-            pdi.press('enter')
-            time.sleep(0.4)
 
             # PER-CYCLE LOGGING
-            cycle_end = time.perf_counter()
-            cycle_seconds = cycle_end - cycle_start
-            elapsed = timedelta(seconds=(cycle_end - run_start_monotonic))
+            elapsed = timedelta(seconds=(step.end - run_start_monotonic))
 
             run_prefix = f"Run: {run + 1}/{num_runs} | " if num_runs > 1 else ""
             event = f"St. Cycle: {cycle}/{cycles_this_run}"
             print(
                 f"  {run_prefix}{event:<17}"
-                f"({cycle_seconds:.2f}s) | "
+                f"({step.seconds:.2f}s) | "
                 f"Elapsed: {format_elapsed(elapsed)}"
             )
 
         # PHASE 2 — FINAL REFINE (Forbid Med-RF)
-        phase2_start = time.perf_counter()
-
-        for i in range(2):
-            pdi.press('up')
-        pdi.press('enter')
-        time.sleep(0.65)
-
-        pdi.press('down')
-        if run > 0:
-            pdi.press('down')
-        pdi.press('enter')
-        for i in range(10):
-            pdi.press('down')
-        pdi.press('enter')
-
-        phase2_end = time.perf_counter()
-        phase2_seconds = phase2_end - phase2_start
-        elapsed = timedelta(seconds=(phase2_end - run_start_monotonic))
-
-        run_prefix = f"Run: {run + 1}/{num_runs} | " if num_runs > 1 else ""
-        event = "St.Refine: 1/1"
-        print(
-            f"  {run_prefix}{event:<17}"
-            f"({phase2_seconds:.2f}s) | "
-            f"Elapsed: {format_elapsed(elapsed)}"
-        )
+        if resume_phase != "refined":
+            with PROFILER.phase("Stat refine") as step:
+                keyprog.run(PROGRAMS["stat_refine", run > 0], backend)
+                save_checkpoint("refined", run=run, cycle=cycles_this_run)
+                TELEMETRY.record("phase", phase="stat", run=run + 1,
+                                 items_delta=cycles_this_run * stat['items_per_cycle'])
+
+            elapsed = timedelta(seconds=(step.end - run_start_monotonic))
+
+            run_prefix = f"Run: {run + 1}/{num_runs} | " if num_runs > 1 else ""
+            event = "St.Refine: 1/1"
+            print(
+                f"  {run_prefix}{event:<17}"
+                f"({step.seconds:.2f}s) | "
+                f"Elapsed: {format_elapsed(elapsed)}"
+            )
 
         # PHASE 3 — RETURN TO SHOP (for next run, skipped on final run)
         if run < num_runs - 1:
-            pdi.press('c')
-            time.sleep(0.65)
-            pdi.press('left')
-            time.sleep(0.25)
-            for i in range(3):
-                pdi.press('up')
-            pdi.press('enter')
-            time.sleep(0.4)
-            pdi.press('enter')
-            time.sleep(0.65)
-            pdi.press('enter')
-            time.sleep(0.4)
+            with PROFILER.phase("Run transition"):
+                keyprog.run(PROGRAMS["stat_run_transition"], backend)
+                save_checkpoint("stat", run=run + 1)
+                TELEMETRY.record("nav", phase="stat", run=run + 2)
 
 
 # ====================================================================
 # NAVIGATION
 # ====================================================================
-def navigate_gil_farm_to_stat_farm():
-    """
-    Navigate from gil farm end state to stat farm start state.
-    Starting state: Esthar Shop!!! → Buy menu (after last sell cycle)
-    Target state:   Esthar Pet Shop → Buy menu, cursor on "G-Potion"
-    """
-    pdi.press('c')
-    time.sleep(0.4)
-    pdi.press('c')
-    time.sleep(0.65)
-    for i in range(2):
-        pdi.press('up')
-    pdi.press('enter')
-    time.sleep(0.65)
-    pdi.press('enter')
-    time.sleep(0.4)
-
-
-def navigate_stat_farm_to_item_usage(character_position, stat_up_name, items_to_use):
+# Phase joins are the fastest paths in the menu model (routines.join).
+# Gil Farm → Stat Farm is fused into the last gil cycle (run_gil_farm).
+# ====================================================================
+def navigate_stat_farm_to_item_usage(character_position, stat_up_name):
     """
     Navigate from stat farm end state to item usage ready state.
     Starting state: Abilities menu, inside Forbid Med-RF (after final refine)
@@ -603,22 +738,9 @@ def navigate_stat_farm_to_item_usage(character_position, stat_up_name, items_to_
       Squall=1, Zell=2, Irvine=3, Quistis=4, Rinoa=5, Selphie=6
     The stat-up item to select is stat_up_name (e.g. "HP Up", "Str Up").
     """
-    pdi.press('c')
-    time.sleep(0.65)
-    pdi.press('c')
-    time.sleep(0.8)
-    for i in range(4):
-        pdi.press('up')
-    pdi.press('enter')
-    time.sleep(0.65)
-    pdi.press('enter')
-    time.sleep(0.2)
-    for i in range(character_position-1):
-        pdi.press('down')
-    for i in range(items_to_use):
-        pdi.press('enter')
-        time.sleep(0.2)
-        pdi.press('enter')
+    steps = routines.nav_stat_to_items(character_position)
+    keyprog.run(compile_max_stat("nav_stat_to_items", steps), backend)
+    TELEMETRY.record("nav", phase="items")
 
 
 def navigate_item_usage_to_gil_farm():
@@ -627,47 +749,38 @@ def navigate_item_usage_to_gil_farm():
     Starting state: Item menu (after using all stat-up items)
     Target state:   Esthar Shop!!! → Buy menu, cursor on "Potion"
     """
-    pdi.press('c')
-    time.sleep(0.2)
-    pdi.press('c')
-    time.sleep(0.65)
-    for i in range(4):
-        pdi.press('down')
-    pdi.press('enter')
-    time.sleep(0.65)
-    for i in range(3):
-        pdi.press('down')
-    pdi.press('enter')
-    time.sleep(0.4)
-    pdi.press('up')
-    pdi.press('enter')
-    time.sleep(0.65)
-    pdi.press('enter')
-    time.sleep(0.4)
+    keyprog.run(PROGRAMS["nav_items_to_gil"], backend)
+    TELEMETRY.record("nav", phase="gil")
+
+
+def navigate_item_usage_to_stat_farm():
+    """
+    Navigate from item usage end state straight to the stat farm
+    (next iteration's cost is covered without gil farming).
+    Starting state: Item menu (after using all stat-up items)
+    Target state:   Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    """
+    keyprog.run(PROGRAMS["nav_items_to_stat"], backend)
+    TELEMETRY.record("nav", phase="stat")
 
 # ====================================================================
 # ITEM USAGE
 # ====================================================================
-# Use stat-up items on the selected character.
+# Use stat-up items on the selected character (routines.use_burst).
 # Starting state: Item menu, stat-up item selected, target character
 #                 highlighted, cursor on "Use" / Confirm.
-# Each item use = 2 confirm presses (confirm character + confirm usage).
+# Each item use = 2 confirm presses (confirm character + confirm usage),
+# paced by the use.confirm_use wait.
 # ====================================================================
-def use_stat_items(count, run_start_monotonic):
-    item_start = time.perf_counter()
-    elapsed_start = timedelta(seconds=(item_start - run_start_monotonic))
-    event = f"Using {count}x stat-up items..."
-    print(f"  {event:<40}| Elapsed: {format_elapsed(elapsed_start)}")
-    original_pause = pdi.PAUSE
-    pdi.PAUSE = 0.00000000001
-    for i in range(count):
-        pdi.press('enter')
-        pdi.press('enter')
-    pdi.PAUSE = original_pause
-    item_end = time.perf_counter()
-    item_seconds = item_end - item_start
-    elapsed_end = timedelta(seconds=(item_end - run_start_monotonic))
-    event = f"Item usage complete ({count} used, {item_seconds:.2f}s)"
+def use_stat_items(count, character_position, run_start_monotonic):
+    with PROFILER.phase("Item use") as step:
+        elapsed_start = timedelta(seconds=(step.start - run_start_monotonic))
+        event = f"Using {count}x stat-up items..."
+        print(f"  {event:<40}| Elapsed: {format_elapsed(elapsed_start)}")
+        keyprog.run(use_program(count, character_position), backend)
+        TELEMETRY.record("items", phase="items", items_delta=-count)
+    elapsed_end = timedelta(seconds=(step.end - run_start_monotonic))
+    event = f"Item usage complete ({count} used, {count / step.seconds:.1f}/s)"
     print(f"  {event:<40}| Elapsed: {format_elapsed(elapsed_end)}")
 
 
@@ -678,54 +791,118 @@ print("==========================================")
 print("FF8 Automated Stat Maxing Script")
 print("==========================================")
 
-# --- CHARACTER SELECTION ---
-print("------------------------------------------")
-print("Select character to max:")
-print("  Squall, Zell, Irvine, Quistis, Rinoa, Selphie")
-print("------------------------------------------")
+# --- RESUME (python max_stat_farm.py --resume) ---
+checkpoint = None
+if "--resume" in sys.argv[1:]:
+    checkpoint = load_checkpoint()
+    if checkpoint is None:
+        print(f"No unfinished session to resume ({CHECKPOINT_PATH}).")
+        raise SystemExit
+    print(f"Resuming the session saved {checkpoint['updated']}.")
+elif CHECKPOINT_PATH.exists():
+    print(f"Unfinished session in {CHECKPOINT_PATH}.")
+    print("  Run with --resume to continue it; answering the prompts starts a new one.")
+
+if checkpoint is None:
+    # --- CHARACTER SELECTION ---
+    print("------------------------------------------")
+    print("Select character to max:")
+    print("  Squall, Zell, Irvine, Quistis, Rinoa, Selphie")
+    print("------------------------------------------")
 
-while True:
-    char_input = input("Character: ").strip().lower()
-    if char_input in CHARACTERS:
-        break
-    print("Invalid. Enter one of: Squall, Zell, Irvine, Quistis, Rinoa, Selphie")
+    while True:
+        char_input = input("Character: ").strip().lower()
+        if char_input in CHARACTERS:
+            break
+        print("Invalid. Enter one of: Squall, Zell, Irvine, Quistis, Rinoa, Selphie")
 
-character_name = char_input.capitalize()
-character_position = CHARACTERS[char_input]
+    # --- STAT SELECTION ---
+    print("------------------------------------------")
+    print("Which stat do you want to max?")
+    print("  Options: HP, Str, Vit, Mag")
+    print("------------------------------------------")
 
-# --- STAT SELECTION ---
-print("------------------------------------------")
-print("Which stat do you want to max?")
-print("  Options: HP, Str, Vit, Mag")
-print("------------------------------------------")
+    while True:
+        stat_choice = input("Stat: ").strip().lower()
+        if stat_choice in STAT_OPTIONS:
+            break
+        print("Invalid. Enter one of: HP, Str, Vit, Mag")
 
-while True:
-    stat_choice = input("Stat: ").strip().lower()
-    if stat_choice in STAT_OPTIONS:
-        break
-    print("Invalid. Enter one of: HP, Str, Vit, Mag")
+    # --- BASE STAT INPUT ---
+    stat = STAT_OPTIONS[stat_choice]
+    stat_label = stat['stat_up'].replace(' Up', '')
+    print("------------------------------------------")
+    print(f"Enter {char_input.capitalize()}'s current base {stat_label} stat.")
+    print(f"  Max: {stat['max_stat']:,}")
+    print("------------------------------------------")
 
-stat = STAT_OPTIONS[stat_choice]
+    while True:
+        try:
+            base_stat = int(input(f"Current base {stat_label}: ").strip())
+            if base_stat < 0:
+                print("Enter a non-negative value.")
+                continue
+            if base_stat >= stat['max_stat']:
+                print(f"Stat is already at or above max ({stat['max_stat']:,}). Nothing to do.")
+                raise SystemExit
+            break
+        except ValueError:
+            print("Enter a valid integer.")
+
+    # --- GIL INPUT ---
+    print("------------------------------------------")
+    print("How much gil do you currently have?")
+    print("  (examples: 210000, 210k, 0.21m, 99m, max)")
+    print("------------------------------------------")
 
-# --- BASE STAT INPUT ---
+    while True:
+        raw = input("Current gil: ").strip()
+        if raw.lower() == "max":
+            current_gil = MAX_GIL
+            break
+        try:
+            current_gil = parse_gil_input(raw)
+            if current_gil < 0:
+                print("Enter a non-negative amount.")
+                continue
+            if current_gil > MAX_GIL:
+                current_gil = MAX_GIL
+            break
+        except ValueError:
+            print("Invalid input. Examples: 210000, 210k, 0.21m, 99m, max")
+
+    # --- MAX GIL OPTION ---
+    print("------------------------------------------")
+    print("Max your gil after stat farming is complete?")
+    print("------------------------------------------")
+    while True:
+        choice = input("Max gil when done? (y/n): ").strip().lower()
+        if choice in ("y", "yes"):
+            max_gil_when_done = True
+            break
+        elif choice in ("n", "no"):
+            max_gil_when_done = False
+            break
+        print("Enter y or n.")
+
+    session = {
+        "character": char_input, "stat": stat_choice, "base_stat": base_stat,
+        "gil": current_gil, "max_gil_when_done": max_gil_when_done,
+    }
+else:
+    # The plan is rebuilt from the session's original answers.
+    session = checkpoint["session"]
+    char_input, stat_choice = session["character"], session["stat"]
+    base_stat, current_gil = session["base_stat"], session["gil"]
+    max_gil_when_done = session["max_gil_when_done"]
+
+character_name = char_input.capitalize()
+character_position = CHARACTERS[char_input]
+stat = STAT_OPTIONS[stat_choice]
 stat_label = stat['stat_up'].replace(' Up', '')
-print("------------------------------------------")
-print(f"Enter {character_name}'s current base {stat_label} stat.")
-print(f"  Max: {stat['max_stat']:,}")
-print("------------------------------------------")
 
-while True:
-    try:
-        base_stat = int(input(f"Current base {stat_label}: ").strip())
-        if base_stat < 0:
-            print("Enter a non-negative value.")
-            continue
-        if base_stat >= stat['max_stat']:
-            print(f"Stat is already at or above max ({stat['max_stat']:,}). Nothing to do.")
-            raise SystemExit
-        break
-    except ValueError:
-        print("Enter a valid integer.")
+PROGRAMS = build_programs(stat)
+use_timeline_estimates(PROGRAMS, character_position)
 
 # --- CALCULATE ITEMS & ITERATIONS ---
 stat_deficit = stat['max_stat'] - base_stat
@@ -736,48 +913,12 @@ max_runs_per_exec = stat['max_runs']
 max_items_per_exec = items_per_full_run * max_runs_per_exec
 total_iterations = math.ceil(items_needed / max_items_per_exec)
 
-# --- GIL INPUT ---
-print("------------------------------------------")
-print("How much gil do you currently have?")
-print("  (examples: 210000, 210k, 0.21m, 99m, max)")
-print("------------------------------------------")
-
-while True:
-    raw = input("Current gil: ").strip()
-    if raw.lower() == "max":
-        current_gil = MAX_GIL
-        break
-    try:
-        current_gil = parse_gil_input(raw)
-        if current_gil < 0:
-            print("Enter a non-negative amount.")
-            continue
-        if current_gil > MAX_GIL:
-            current_gil = MAX_GIL
-        break
-    except ValueError:
-        print("Invalid input. Examples: 210000, 210k, 0.21m, 99m, max")
-
-has_max_gil = current_gil >= MAX_GIL
-
-# --- MAX GIL OPTION ---
-print("------------------------------------------")
-print("Max your gil after stat farming is complete?")
-print("------------------------------------------")
-while True:
-    choice = input("Max gil when done? (y/n): ").strip().lower()
-    if choice in ("y", "yes"):
-        max_gil_when_done = True
-        break
-    elif choice in ("n", "no"):
-        max_gil_when_done = False
-        break
-    print("Enter y or n.")
-
 # --- BUILD EXECUTION PLAN ---
-execution_plan = []
+# Runs/cycles per iteration first; then gil: an iteration farms gil
+# only when the balance can't cover its stat farm cost (+ reserve),
+# and then only up to what the rest of the plan needs.
+iteration_runs = []
 plan_remaining = items_needed
-plan_gil = current_gil
 
 for p_idx in range(total_iterations):
     tc = math.ceil(plan_remaining / items_per_cycle)
@@ -793,36 +934,62 @@ for p_idx in range(total_iterations):
         p_lrc = STAT_CYCLES
         p_items = p_runs * items_per_full_run
 
-    p_gil_est = estimate_gil_farm_seconds(plan_gil)
-    p_gil_cy = math.ceil((MAX_GIL - plan_gil) / GIL_PROFIT_PER_CYCLE) if plan_gil < MAX_GIL else 0
-    p_nav_gs = NAV_GIL_TO_STAT_S if plan_gil < MAX_GIL else 0
+    iteration_runs.append((p_runs, p_lrc, p_items))
+    plan_remaining -= p_items
+
+iteration_costs = [calculate_stat_farm_cost(p_runs, p_lrc) for p_runs, p_lrc, _ in iteration_runs]
+execution_plan = []
+plan_gil = current_gil
+
+for p_idx, (p_runs, p_lrc, p_items) in enumerate(iteration_runs):
+    p_cost = iteration_costs[p_idx]
+    p_farm = needs_gil_farm(plan_gil, p_cost)
+
+    p_target = gil_farm_target(iteration_costs[p_idx:]) if p_farm else plan_gil
+    p_gil_cy = gil_farm_cycles(plan_gil, p_target) if p_farm else 0
+    p_gil_est = estimate_gil_farm_seconds(plan_gil, p_target) if p_farm else 0
+    p_nav_gs = NAV_GIL_TO_STAT_S if p_farm else 0
     p_stat_est = estimate_stat_farm_seconds(p_runs, p_lrc)
     p_item_est = estimate_item_usage_seconds(p_items)
-    p_nav_ig = NAV_ITEMS_TO_GIL_S if (plan_remaining - p_items) > 0 else 0
+
+    plan_gil = gil_after_farm(plan_gil, p_target) - p_cost
+
+    # Item Use → next iteration's first phase
+    p_nav_ig = 0
+    if p_idx + 1 < total_iterations:
+        next_cost = calculate_stat_farm_cost(*iteration_runs[p_idx + 1][:2])
+        p_nav_ig = NAV_ITEMS_TO_GIL_S if needs_gil_farm(plan_gil, next_cost) else NAV_ITEMS_TO_STAT_S
     p_total = p_gil_est + p_nav_gs + p_stat_est + p_item_est + p_nav_ig
 
     execution_plan.append({
         'runs': p_runs, 'last_run_cycles': p_lrc, 'items': p_items,
+        'farm_gil': p_farm, 'gil_target': p_target, 'cost': p_cost, 'gil_after': plan_gil,
         'gil_est': p_gil_est, 'gil_cycles': p_gil_cy,
         'stat_est': p_stat_est, 'item_est': p_item_est,
         'nav_total': p_nav_gs + p_nav_ig, 'total': p_total,
     })
 
-    plan_remaining -= p_items
-    plan_gil = MAX_GIL - calculate_stat_farm_cost(p_runs, p_lrc)
-
 stat_farm_est_s = sum(p['total'] for p in execution_plan)
 total_est_s = stat_farm_est_s
 
-last_plan = execution_plan[-1]
-ending_gil_est = MAX_GIL - calculate_stat_farm_cost(last_plan['runs'], last_plan['last_run_cycles'])
-max_gil_deficit = MAX_GIL - ending_gil_est
-max_gil_farm_cycles = math.ceil(max_gil_deficit / GIL_PROFIT_PER_CYCLE)
-max_gil_farm_est_s = max_gil_farm_cycles * GIL_SECONDS_PER_CYCLE + NAV_ITEMS_TO_GIL_S
+ending_gil_est = execution_plan[-1]['gil_after']
+max_gil_farm_cycles = gil_farm_cycles(ending_gil_est)
+max_gil_farm_est_s = estimate_gil_farm_seconds(ending_gil_est) + NAV_ITEMS_TO_GIL_S
 
 if max_gil_when_done:
     total_est_s += max_gil_farm_est_s
 
+# --- RESTORE BOOKKEEPING ---
+if checkpoint is None:
+    resume_phase, start_iteration = "start", 1
+    remaining_items, iteration_times = items_needed, []
+    resumed_s = resumed_iteration_s = 0
+else:
+    resume_phase, start_iteration = checkpoint["phase"], checkpoint["iteration"]
+    remaining_items, iteration_times = checkpoint["remaining_items"], checkpoint["iteration_times"]
+    current_gil = checkpoint["current_gil"]
+    resumed_s, resumed_iteration_s = checkpoint["elapsed"], checkpoint["iteration_elapsed"]
+
 estimated_duration = timedelta(seconds=total_est_s)
 
 # --- CONFIGURATION SUMMARY ---
@@ -836,8 +1003,14 @@ log_line("Target stat:", f"{stat['max_stat']:,}")
 log_line(f"{stat['stat_up']}s needed:", f"{items_needed:,}")
 log_line("Total iterations:", str(total_iterations))
 log_line("Current gil:", f"{current_gil:,}")
-log_line("Starting phase:", "Stat Farm" if has_max_gil else "Gil Farm")
+if checkpoint is None:
+    log_line("Starting phase:", "Gil Farm" if execution_plan[0]['farm_gil'] else "Stat Farm")
+else:
+    log_line("Resume point:", describe_position(checkpoint))
+    log_line("Already run:", format_elapsed(timedelta(seconds=resumed_s)))
 log_line("Max gil when done:", "Yes" if max_gil_when_done else "No")
+log_line("Timing profile:", timing_profile.describe(WAITS, mode=MODE))
+log_line("Timing model:", MODEL.describe())
 print("==========================================")
 
 # --- EXECUTION PLAN ---
@@ -870,10 +1043,23 @@ print("------------------------------------------")
 log_line("Total estimated:", format_estimate(total_est_s), PLAN_W)
 print("==========================================")
 
-if has_max_gil:
-    print("REQUIRED: Esthar Pet Shop → Buy menu, cursor on 'G-Potion'")
-else:
-    print("REQUIRED: Esthar Shop!!! → Buy menu, cursor on 'Potion'")
+if checkpoint is not None:
+    print("If the script stopped in the middle of a step, finish or undo that step")
+    print("in game first: the checkpoint only covers steps that completed.")
+print(f"REQUIRED: {required_state(resume_phase, start_iteration)}")
+
+backend = keyprog.default_backend()
+if "--low-jitter" in sys.argv[1:]:
+    prepared = low_jitter.warm(backend, PROGRAMS.values())
+    log_line("Low jitter:", f"{low_jitter.enable()}; {prepared} programs prepared")
+
+if "--settle" in sys.argv[1:]:
+    import settle
+
+    log_line("Settle:", settle.enable())
+
+if FRAME_LOCK:
+    log_line("Frame lock:", FRAME_LOCK)
 
 print(f"Click into FF8 now. Starting in {FOCUS_GRACE_SECONDS} seconds...")
 time.sleep(FOCUS_GRACE_SECONDS)
@@ -881,7 +1067,7 @@ time.sleep(FOCUS_GRACE_SECONDS)
 # ====================================================================
 # START LOGGING
 # ====================================================================
-start_time = datetime.now().astimezone()
+start_time = datetime.now().astimezone() - timedelta(seconds=resumed_s)
 estimated_finish_time = start_time + estimated_duration
 
 print("==========================================")
@@ -889,34 +1075,31 @@ print(f"{stat['stat_up']} Maxing Script Started")
 log_line("Start time:", format_timestamp(start_time))
 log_line("Estimated finish:", format_timestamp(estimated_finish_time))
 log_line("Estimated duration:", format_estimate(total_est_s))
+log_line("Checkpoint:", f"{CHECKPOINT_PATH} (--resume continues after a stop)")
 print("==========================================")
 
 # ====================================================================
 # MAIN LOOP
 # ====================================================================
-run_start_monotonic = time.perf_counter()
-remaining_items = items_needed
-iteration_times = []
-
-for iteration in range(1, total_iterations + 1):
-    iter_start_mono = time.perf_counter()
-
-    # --- CALCULATE EXECUTION PLAN FOR THIS ITERATION ---
-    total_cycles_needed = math.ceil(remaining_items / items_per_cycle)
-    full_runs = total_cycles_needed // STAT_CYCLES
-    leftover_cycles = total_cycles_needed % STAT_CYCLES
-    total_runs_needed = full_runs + (1 if leftover_cycles > 0 else 0)
-
-    runs_this_iter = min(total_runs_needed, max_runs_per_exec)
-    if runs_this_iter == total_runs_needed and leftover_cycles > 0:
-        last_run_cycles = leftover_cycles
-        items_this_iter = (runs_this_iter - 1) * items_per_full_run + leftover_cycles * items_per_cycle
-    else:
-        last_run_cycles = STAT_CYCLES
-        items_this_iter = runs_this_iter * items_per_full_run
-
-    gil_cost_this_iter = calculate_stat_farm_cost(runs_this_iter, last_run_cycles)
+run_start_monotonic = time.perf_counter() - resumed_s
+TELEMETRY = telemetry.start("max_stat_farm", WAITS, mode=MODE.key, inputs=session, resumed=checkpoint is not None,
+                            plan_seconds=total_est_s)
+PROFILER = profiler.attach()
+if checkpoint is None:
+    save_checkpoint("start", iteration_num=1)
+
+for iteration in range(start_iteration, total_iterations + 1):
+    low_jitter.collect()  # between key programs, never during one
+    # Steps up to `phase` are done (a resumed iteration starts part-way).
+    phase = resume_phase if iteration == start_iteration else "start"
+    done = PHASES.index(phase)
+    iter_start_mono = time.perf_counter() - (resumed_iteration_s if iteration == start_iteration else 0)
+
+    # --- EXECUTION PLAN FOR THIS ITERATION ---
     plan = execution_plan[iteration - 1]
+    runs_this_iter, last_run_cycles = plan['runs'], plan['last_run_cycles']
+    items_this_iter = plan['items']
+    gil_cost_this_iter = plan['cost']
 
     # --- ITERATION HEADER ---
     elapsed_so_far = timedelta(seconds=(iter_start_mono - run_start_monotonic))
@@ -924,7 +1107,7 @@ for iteration in range(1, total_iterations + 1):
     print("==========================================")
     print(f"Iteration {iteration}/{total_iterations} — {stat['stat_up']} → {character_name}")
     log_line("  Items this iteration:", str(items_this_iter))
-    log_line("  Items remaining after:", str(max(0, remaining_items - items_this_iter)))
+    log_line("  Items remaining after:", str(sum(p['items'] for p in execution_plan[iteration:])))
     if runs_this_iter == 1 and last_run_cycles < STAT_CYCLES:
         c = last_run_cycles
         log_line("  Runs:", f"1 run, {c} {'cycle' if c == 1 else 'cycles'}")
@@ -936,6 +1119,12 @@ for iteration in range(1, total_iterations + 1):
         log_line("  Runs:", "1 run")
     else:
         log_line("  Runs:", f"{runs_this_iter} runs")
+    if plan['farm_gil']:
+        log_line("  Gil farm:", f"Yes (to {plan['gil_target']:,})")
+    else:
+        log_line("  Gil farm:", f"Skipped ({current_gil:,} covers {gil_cost_this_iter:,})")
+    if phase != "start":
+        log_line("  Resume point:", describe_position(checkpoint))
     log_line("  Iteration ETA:", format_estimate(plan['total']))
     if iteration > 1:
         log_line("  Elapsed:", format_elapsed(elapsed_so_far))
@@ -949,40 +1138,54 @@ for iteration in range(1, total_iterations + 1):
         log_line("  ETA finish:", format_timestamp(eta_finish))
     print("==========================================")
 
-    # --- GIL FARM (if not at max gil) ---
-    if current_gil < MAX_GIL:
+    # --- GIL FARM (only if the balance can't cover this iteration) ---
+    if phase == "gil" or (phase == "start" and needs_gil_farm(current_gil, gil_cost_this_iter)):
         if current_gil < GIL_MIN_START:
             print(f"ERROR: Insufficient gil ({current_gil:,}). Need at least {GIL_MIN_START:,}.")
             raise SystemExit
-        print(f"{'[Gil Farm]':<{TAG_W}}Farming to max gil... (ETA: {format_estimate(plan['gil_est'])})")
-        run_gil_farm(current_gil, run_start_monotonic)
-        current_gil = MAX_GIL
-
-        print(f"{'[Navigate]':<{TAG_W}}Gil Farm → Stat Farm")
-        navigate_gil_farm_to_stat_farm()
+        gil_target = gil_farm_target(iteration_costs[iteration - 1:])
+        print(f"{'[Gil Farm]':<{TAG_W}}Farming to {gil_target:,} gil... (ETA: {format_estimate(plan['gil_est'])})")
+        with PROFILER.phase("Gil farm"):
+            current_gil = run_gil_farm(current_gil, run_start_monotonic, gil_target, to_stat_farm=True,
+                                       cycles_done=checkpoint["gil_cycle"] if phase == "gil" else 0)
+        save_checkpoint("stat")
 
     # --- STAT FARM ---
-    print(f"{'[St. Farm]':<{TAG_W}}Farming stat-up items... (ETA: {format_estimate(plan['stat_est'])})")
-    run_stat_up_farm(stat, runs_this_iter, run_start_monotonic, last_run_cycles)
-    current_gil -= gil_cost_this_iter
-
-    # --- ITEM USAGE ---
-    print(f"{'[Navigate]':<{TAG_W}}Stat Farm → Item Use ({stat['stat_up']} on {character_name})")
-    navigate_stat_farm_to_item_usage(character_position, stat['stat_up'], items_this_iter)
-
-    print(f"{'[Item Use]':<{TAG_W}}Using {items_this_iter}x {stat['stat_up']} on {character_name}... (ETA: {format_estimate(plan['item_est'])})")
-    use_stat_items(items_this_iter, run_start_monotonic)
-    remaining_items -= items_this_iter
-
-    # --- NAVIGATE BACK FOR NEXT ITERATION ---
+    if done <= PHASES.index("refined"):
+        resume_at = (phase, checkpoint["run"], checkpoint["cycle"]) if phase in ("stat", "refine", "refined") else None
+        print(f"{'[St. Farm]':<{TAG_W}}Farming stat-up items... (ETA: {format_estimate(plan['stat_est'])})")
+        with PROFILER.phase("Stat farm"):
+            run_stat_up_farm(stat, runs_this_iter, run_start_monotonic, last_run_cycles, resume_at)
+        current_gil -= gil_cost_this_iter
+
+        # --- ITEM USAGE ---
+        print(f"{'[Navigate]':<{TAG_W}}Stat Farm → Item Use ({stat['stat_up']} on {character_name})")
+        with PROFILER.phase("Navigation"):
+            navigate_stat_farm_to_item_usage(character_position, stat['stat_up'])
+        save_checkpoint("use")
+
+    if done <= PHASES.index("use"):
+        print(f"{'[Item Use]':<{TAG_W}}Using {items_this_iter}x {stat['stat_up']} on {character_name}... (ETA: {format_estimate(plan['item_est'])})")
+        use_stat_items(items_this_iter, character_position, run_start_monotonic)
+        remaining_items -= items_this_iter
+        save_checkpoint("used")
+
+    # --- NAVIGATE TO NEXT ITERATION'S FIRST PHASE ---
     if remaining_items > 0:
-        print(f"{'[Navigate]':<{TAG_W}}Item Use → Gil Farm")
-        navigate_item_usage_to_gil_farm()
+        with PROFILER.phase("Navigation"):
+            if needs_gil_farm(current_gil, execution_plan[iteration]['cost']):
+                print(f"{'[Navigate]':<{TAG_W}}Item Use → Gil Farm")
+                navigate_item_usage_to_gil_farm()
+            else:
+                print(f"{'[Navigate]':<{TAG_W}}Item Use → Stat Farm (gil covers next iteration)")
+                navigate_item_usage_to_stat_farm()
 
     # --- ITERATION COMPLETE LOGGING ---
     iter_end_mono = time.perf_counter()
     iter_seconds = iter_end_mono - iter_start_mono
     iteration_times.append(iter_seconds)
+    TELEMETRY.record("iteration", iteration=iteration, start=iter_start_mono, end=iter_end_mono,
+                     planned=plan['total'], gil=current_gil, items_remaining=remaining_items)
     elapsed = timedelta(seconds=(iter_end_mono - run_start_monotonic))
     remaining_iters = total_iterations - iteration
 
@@ -1002,6 +1205,8 @@ for iteration in range(1, total_iterations + 1):
         log_line("  ETA remaining:", format_estimate(eta_remaining_s))
         log_line("  ETA finish:", format_timestamp(eta_finish))
     print("------------------------------------------")
+    if remaining_items > 0:
+        save_checkpoint("start", iteration_num=iteration + 1)
 
 # ====================================================================
 # FINISH
@@ -1029,16 +1234,18 @@ print("==========================================")
 # MAX GIL FARM
 # ====================================================================
 if max_gil_when_done and current_gil < MAX_GIL:
-    gil_farm_start_mono = time.perf_counter()
+    with PROFILER.phase("Max gil farm") as max_gil_farm:
+        if resume_phase != "max_gil":
+            print(f"{'[Navigate]':<{TAG_W}}Item Use → Gil Farm")
+            with PROFILER.phase("Navigation"):
+                navigate_item_usage_to_gil_farm()
+            save_checkpoint("max_gil")
 
-    print(f"{'[Navigate]':<{TAG_W}}Item Use → Gil Farm")
-    navigate_item_usage_to_gil_farm()
+        print(f"{'[Gil Farm]':<{TAG_W}}Farming to max gil... (ETA: {format_estimate(max_gil_farm_est_s)})")
+        run_gil_farm(current_gil, run_start_monotonic,  # the only farm that targets max gil
+                     phase="max_gil", cycles_done=checkpoint["gil_cycle"] if resume_phase == "max_gil" else 0)
 
-    print(f"{'[Gil Farm]':<{TAG_W}}Farming to max gil... (ETA: {format_estimate(max_gil_farm_est_s)})")
-    run_gil_farm(current_gil, run_start_monotonic)
-
-    gil_farm_end_mono = time.perf_counter()
-    gil_farm_actual_s = gil_farm_end_mono - gil_farm_start_mono
+    gil_farm_actual_s = max_gil_farm.seconds
 
     final_end_time = datetime.now().astimezone()
     total_duration = final_end_time - start_time
@@ -1059,3 +1266,9 @@ if max_gil_when_done and current_gil < MAX_GIL:
              f"(estimated {format_estimate(total_est_s)})")
     log_line("Estimate error:", format_eta_error(total_delta, total_est_s))
     print("==========================================")
+
+print(PROFILER.report())
+print("==========================================")
+
+TELEMETRY.close()
+clear_checkpoint()
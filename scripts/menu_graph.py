@@ -0,0 +1,387 @@
+# ==================================================================
+# menu_graph.py — v1.0 (2026-10-17)
+# ==================================================================
+# Model of the FF8 menus the farm routines walk through, with
+# shortest-path key sequence generation.
+#
+# A state is (menu, cursor, memory):
+#   menu   — key into MENUS (e.g. "call_shop", "buy:Esthar Pet Shop")
+#   cursor — index of the highlighted entry
+#   memory — remembered cursor of menus that keep it (Call Shop list)
+#
+# Edges are single key presses: cursor moves inside a menu (with
+# wrap-around where the menu wraps) and enter/c links between menus.
+# Each link names the wait that follows it ("exit_shop", ...); the
+# routines map those names to their tunable waits.
+#
+# The layouts are the ones implied by the scripts' hard-coded
+# sequences (which must agree with each other):
+#   - Esthar Pet Shop Buy page 2 wraps every 8 entries: max_stat_farm
+#     goes "up" 4/3/2/1 and stat_up_farm "down" 4/5/6/7 to the same
+#     Giant's Ring / Power Wrist / Force Armlet / Hypno Crown.
+#   - The Call Shop list wraps with 3 entries: "up" 2 goes
+#     Esthar Shop!!! → Esthar Pet Shop and "up" 1 goes back.
+#   - Menus without such evidence do not wrap, so generated paths
+#     never rely on an unverified wrap.
+#
+# Med-RF lists show only the items held, in a fixed order (Menu
+# held=True): an item refined away drops out and the entries below
+# move up. Recov Med-RF lists Tent before Cottage. The gil routines
+# keep the "down" from Tent to Cottage that the original routine used
+# on the game: it is right if Tent stays listed, and with Tent gone
+# Cottage is the only entry, where the press changes nothing.
+#
+# Quantity selectors start at 1; Up/Down = ±10, Right/Left = ±1,
+# clamped to [1, limit] (limit = 100 or the owned count when selling).
+# The gil cycles keep Mega Potions from cycle to cycle, so the owned
+# count at a sale is not known in advance: limit=None gives a path
+# that never passes the target and is right for any limit above it.
+# Med-RF amount selectors also start at 1 but count with Down = +10,
+# clamped to the number of batches the owned items allow.
+#
+# Examples:
+#   python menu_graph.py "sell:Esthar Shop!!!/Mega Potion" "buy:Esthar Pet Shop/G-Potion"
+#   python menu_graph.py --quantity 75 --sell
+# ==================================================================
+
+import heapq
+from collections import deque
+from typing import NamedTuple
+
+from keyprog import press
+
+
+class Menu:
+    """
+    A cursor menu. Entries are laid out column-major in `columns`
+    columns; up/down (or left/right for horizontal menus) move within
+    a column, left/right switch columns on the same row. A `held`
+    menu lists only the entries in the inventory (see held_entries).
+    """
+
+    def __init__(self, entries, columns=1, wraps=False, horizontal=False,
+                 remembers=False, switch_waits=None, held=False):
+        self.entries = list(entries)
+        self.columns = columns
+        self.rows = len(self.entries) // columns
+        self.wraps = wraps
+        self.horizontal = horizontal
+        self.remembers = remembers
+        self.switch_waits = switch_waits or {}  # column switch key → wait name
+        self.held = held
+
+    def held_entries(self, held) -> list:
+        """Entries listed when holding `held` (item names, or name → count)."""
+        if isinstance(held, dict):
+            return [e for e in self.entries if held.get(e)]
+        return [e for e in self.entries if e in held]
+
+    def index(self, label: str) -> int:
+        try:
+            return self.entries.index(label)
+        except ValueError:
+            raise KeyError(f"No entry {label!r}") from None
+
+    def moves(self, cursor: int):
+        """
+        Yield (key, new_cursor, wait_name) for every cursor move from
+        `cursor`. Column switches come first so that, among equally
+        short paths, the search switches page before scrolling.
+        """
+        col, row = divmod(cursor, self.rows)
+        if self.horizontal:
+            size = len(self.entries)
+            for key, d in (("left", -1), ("right", 1)):
+                nxt = cursor + d
+                if self.wraps:
+                    nxt %= size
+                if 0 <= nxt < size:
+                    yield key, nxt, ""
+            return
+        for key, d in (("left", -1), ("right", 1)):
+            c = col + d
+            if 0 <= c < self.columns:
+                yield key, c * self.rows + row, self.switch_waits.get(key, "")
+        for key, d in (("up", -1), ("down", 1)):
+            r = row + d
+            if self.wraps:
+                r %= self.rows
+            if 0 <= r < self.rows:
+                yield key, col * self.rows + r, ""
+
+
+class Link(NamedTuple):
+    """enter/c from an entry: target menu, target cursor, wait name."""
+    menu: str
+    cursor: object  # entry label, or None = remembered/first entry
+    wait: str = ""
+
+
+def _layout(prefix, size, named):
+    """`size` placeholder entries with the known ones ({index: label}) filled in."""
+    entries = [f"({prefix} {i})" for i in range(size)]
+    for i, label in named.items():
+        entries[i] = label
+    return entries
+
+
+SHOPS = ("Esthar Shop!!!", "Esthar Pet Shop")
+# Held stat-ups list in this order (Item list, GFAbl/Forbid Med-RF lists).
+STAT_UPS = ("HP Up", "Str Up", "Vit Up", "Mag Up")
+ABILITY_ROWS = 10
+BUY_PAGE_ROWS = 8
+
+MENUS = {
+    "main": Menu(["Junction", "Item", "Magic", "Status", "GF", "Ability",
+                  "Switch", "Card", "Config", "Tutorial", "Save"]),
+    # Two columns; reopening from the main menu starts at the top left.
+    "abilities": Menu(_layout("ability", 2 * ABILITY_ROWS, {
+        3: "Call Shop",
+        ABILITY_ROWS + 2: "Recov Med-RF",
+        ABILITY_ROWS + 6: "Forbid Med-RF",
+        ABILITY_ROWS + 8: "GFAbl Med-RF",
+    }), columns=2, switch_waits={"left": "abilities_left", "right": "abilities_right"}),
+    "call_shop": Menu(["Esthar Shop!!!", "Esthar Pet Shop", "(call shop 2)"], wraps=True, remembers=True),
+    "refine:Recov Med-RF": Menu(["Tent", "Cottage"], held=True),
+    "refine:GFAbl Med-RF": Menu(_layout("gfabl", 2, {})),
+    "refine:Forbid Med-RF": Menu(_layout("forbid", 3, {})),
+    "shop:Esthar Shop!!!": Menu(["Buy", "Sell"], horizontal=True),
+    "shop:Esthar Pet Shop": Menu(["Buy", "Sell"], horizontal=True),
+    # Buy lists: two pages of BUY_PAGE_ROWS, "right" switches page.
+    "buy:Esthar Shop!!!": Menu(_layout("shop buy", 2 * BUY_PAGE_ROWS, {
+        0: "Potion",
+        BUY_PAGE_ROWS + 6: "Cottage",
+        BUY_PAGE_ROWS + 5: "Tent",
+    }), columns=2, wraps=True, switch_waits={"right": "buy_tab", "left": "buy_tab"}),
+    "buy:Esthar Pet Shop": Menu(_layout("pet buy", 2 * BUY_PAGE_ROWS, {
+        0: "G-Potion",
+        BUY_PAGE_ROWS + 4: "Giant's Ring",
+        BUY_PAGE_ROWS + 5: "Power Wrist",
+        BUY_PAGE_ROWS + 6: "Force Armlet",
+        BUY_PAGE_ROWS + 7: "Hypno Crown",
+    }), columns=2, wraps=True, switch_waits={"right": "buy_tab", "left": "buy_tab"}),
+    "sell:Esthar Shop!!!": Menu(_layout("sell", 5, {2: "Mega Potion"})),
+    # Item → Use list; refined stat-ups land in the (empty) first page.
+    "items": Menu(_layout("item", 8, {0: "Stat-up item"})),
+    "item_target": Menu(["Squall", "Zell", "Irvine", "Quistis", "Rinoa", "Selphie"]),
+}
+
+# enter links: (menu, entry) → Link. c links: menu → Link.
+ENTER = {
+    ("main", "Ability"): Link("abilities", None, "open_abilities"),
+    ("abilities", "Call Shop"): Link("call_shop", None, "open_call_shop"),
+    ("abilities", "Recov Med-RF"): Link("refine:Recov Med-RF", None, "open_refine"),
+    ("abilities", "GFAbl Med-RF"): Link("refine:GFAbl Med-RF", None, "open_refine"),
+    ("abilities", "Forbid Med-RF"): Link("refine:Forbid Med-RF", None, "open_refine"),
+    ("main", "Item"): Link("items", None, "open_items"),
+    ("items", "Stat-up item"): Link("item_target", None, "select_item"),
+}
+BACK = {
+    "abilities": Link("main", "Ability", "exit_abilities"),
+    "call_shop": Link("abilities", "Call Shop", "exit_call_shop"),
+    "refine:Recov Med-RF": Link("abilities", "Recov Med-RF", "exit_refine"),
+    "refine:GFAbl Med-RF": Link("abilities", "GFAbl Med-RF", "exit_refine"),
+    "refine:Forbid Med-RF": Link("abilities", "Forbid Med-RF", "exit_refine"),
+    "items": Link("main", "Item", "exit_items"),
+    "item_target": Link("items", "Stat-up item", "exit_target"),
+}
+for _shop in SHOPS:
+    ENTER["call_shop", _shop] = Link(f"shop:{_shop}", "Buy", "enter_shop")
+    ENTER[f"shop:{_shop}", "Buy"] = Link(f"buy:{_shop}", None, "open_buy")
+    BACK[f"shop:{_shop}"] = Link("call_shop", _shop, "exit_shop")
+    BACK[f"buy:{_shop}"] = Link(f"shop:{_shop}", "Buy", "exit_buy")
+ENTER["shop:Esthar Shop!!!", "Sell"] = Link("sell:Esthar Shop!!!", None, "open_sell")
+BACK["sell:Esthar Shop!!!"] = Link("shop:Esthar Shop!!!", "Sell", "exit_sell")
+
+
+# ----------------------------
+# STATES
+# ----------------------------
+class State(NamedTuple):
+    menu: str
+    cursor: int
+    memory: tuple = ()  # ((menu, cursor), ...) for menus that remember
+
+
+def state(spec: str, memory: dict = None) -> State:
+    """Parse "menu/entry" (e.g. "buy:Esthar Pet Shop/G-Potion")."""
+    menu_name, _, label = spec.partition("/")
+    menu = MENUS[menu_name]
+    cursor = menu.index(label) if label else 0
+    return State(menu_name, cursor, _memory_tuple(memory or {}))
+
+
+def _memory_tuple(memory: dict) -> tuple:
+    return tuple(sorted((m, MENUS[m].index(v) if isinstance(v, str) else v) for m, v in memory.items()))
+
+
+def _follow(link: Link, st: State) -> State:
+    menu = MENUS[link.menu]
+    memory = dict(st.memory)
+    if MENUS[st.menu].remembers:
+        memory[st.menu] = st.cursor
+    if link.cursor is None:
+        cursor = memory.get(link.menu, 0) if menu.remembers else 0
+    else:
+        cursor = menu.index(link.cursor)
+    return State(link.menu, cursor, tuple(sorted(memory.items())))
+
+
+def edges(st: State):
+    """Yield (key, wait_name, next_state) for every press from `st`."""
+    menu = MENUS[st.menu]
+    for key, cursor, wait in menu.moves(st.cursor):
+        yield key, wait, State(st.menu, cursor, st.memory)
+    label = menu.entries[st.cursor]
+    link = ENTER.get((st.menu, label))
+    if link is not None:
+        yield "enter", link.wait, _follow(link, st)
+    link = BACK.get(st.menu)
+    if link is not None:
+        yield "c", link.wait, _follow(link, st)
+
+
+def shortest_path(start: State, goal: State, cost=None, match_memory=False):
+    """
+    Cheapest path from `start` to `goal` as a list of (key, wait_name).
+    `cost(key, wait_name)` defaults to 1 per press (fewest presses);
+    pass e.g. a press pause + wait lookup to minimise wall time.
+    Memory is ignored when matching the goal unless match_memory is set.
+    """
+    cost = cost or (lambda key, wait: 1)
+
+    def done(st):
+        if match_memory:
+            return st == goal
+        return st.menu == goal.menu and st.cursor == goal.cursor
+
+    best = {start: 0}
+    prev = {start: None}
+    heap = [(0, 0, start)]
+    order = 1  # tie-break: first discovered wins
+    while heap:
+        dist, _, st = heapq.heappop(heap)
+        if dist > best[st]:
+            continue
+        if done(st):
+            path = []
+            while prev[st] is not None:
+                st, key, wait = prev[st]
+                path.append((key, wait))
+            return path[::-1]
+        for key, wait, nxt in edges(st):
+            d = dist + cost(key, wait)
+            if nxt not in best or d < best[nxt]:
+                best[nxt] = d
+                prev[nxt] = (st, key, wait)
+                heapq.heappush(heap, (d, order, nxt))
+                order += 1
+    raise ValueError(f"No path from {start} to {goal}")
+
+
+def to_steps(path, wait_for=None):
+    """
+    Compress a path into keyprog steps. Consecutive presses of the
+    same key with no wait become one press(key, n); a named wait is
+    resolved through wait_for(name) (default: no wait).
+    """
+    steps = []
+    for key, wait in path:
+        seconds = wait_for(wait) if (wait and wait_for) else 0.0
+        if steps and steps[-1].key == key and not steps[-1].wait:
+            steps[-1] = press(key, steps[-1].times + 1, seconds)
+        else:
+            steps.append(press(key, 1, seconds))
+    return steps
+
+
+def cursor_moves(menu_name: str, src: str, dst: str, wait_for=None):
+    """
+    Fewest cursor moves between two entries of one menu, as steps.
+    src=None starts from the entry cursor (first entry).
+    """
+    menu = MENUS[menu_name]
+    start = 0 if src is None else menu.index(src)
+    goal = menu.index(dst)
+    prev = {start: None}
+    queue = deque([start])
+    while queue and goal not in prev:
+        cur = queue.popleft()
+        for key, nxt, wait in menu.moves(cur):
+            if nxt not in prev:
+                prev[nxt] = (cur, key, wait)
+                queue.append(nxt)
+    if goal not in prev:
+        raise ValueError(f"{dst!r} unreachable from {src!r} in {menu_name}")
+    path = []
+    cur = goal
+    while prev[cur] is not None:
+        cur, key, wait = prev[cur]
+        path.append((key, wait))
+    return to_steps(path[::-1], wait_for)
+
+
+# ----------------------------
+# QUANTITY SELECTORS
+# ----------------------------
+QUANTITY_KEYS = (("up", 10), ("down", -10), ("right", 1), ("left", -1))
+
+
+def quantity_moves(target: int, limit: int = 100, start: int = 1):
+    """
+    Fewest presses to set a shop quantity selector to `target`.
+    limit=None: the maximum is unknown (at least `target`), so the
+    path never relies on the clamp at the top.
+    """
+    if not 1 <= target <= (target if limit is None else limit):
+        raise ValueError(f"Quantity {target} outside 1..{limit}")
+    # Keys go in QUANTITY_KEYS order so each is one run: a state is
+    # (quantity, last key), and a key never follows a later one.
+    first = (start, 0)
+    prev = {first: None}
+    queue = deque([first])
+    end = first if start == target else None
+    while end is None:
+        q, last = queue.popleft()
+        for i in range(last, len(QUANTITY_KEYS)):
+            key, d = QUANTITY_KEYS[i]
+            if limit is None and q + d > target:
+                continue
+            nxt = (min(max(q + d, 1), limit or target), i)
+            if nxt not in prev:
+                prev[nxt] = ((q, last), key)
+                queue.append(nxt)
+                if nxt[0] == target:
+                    end = nxt
+                    break
+    path = []
+    while prev[end] is not None:
+        end, key = prev[end]
+        path.append((key, ""))
+    path.reverse()
+    return to_steps(path)
+
+
+def _describe(steps) -> str:
+    return ", ".join(f"{s.times}x{s.key.capitalize()}" if s.times > 1 else s.key.capitalize()
+                     for s in steps) or "(none)"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shortest key paths through the FF8 menu model.")
+    parser.add_argument("start", nargs="?", help='e.g. "sell:Esthar Shop!!!/Mega Potion"')
+    parser.add_argument("goal", nargs="?", help='e.g. "buy:Esthar Pet Shop/G-Potion"')
+    parser.add_argument("--quantity", type=int, help="quantity selector target")
+    parser.add_argument("--limit", type=int, default=100, help="quantity selector maximum")
+    parser.add_argument("--sell", action="store_true", help="selling: the maximum (owned count) is unknown")
+    args = parser.parse_args()
+
+    if args.quantity is not None:
+        print(_describe(quantity_moves(args.quantity, None if args.sell else args.limit)))
+    elif args.start and args.goal:
+        path = shortest_path(state(args.start), state(args.goal))
+        print(f"{len(path)} presses: " + ", ".join(f"{k}[{w}]" if w else k for k, w in path))
+    else:
+        parser.error("give START and GOAL states, or --quantity")
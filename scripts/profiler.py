@@ -0,0 +1,153 @@
+# ==================================================================
+# profiler.py — v1.0 (2026-10-17)
+# ==================================================================
+# Nested phase timer for the farm scripts' cycle loops.
+#
+#   PROFILER = profiler.attach()
+#   with PROFILER.phase("Gil cycle") as p:
+#       keyprog.run(GIL_CYCLE, backend)
+#   print(f"({p.seconds:.2f}s)")
+#
+# Loops on keyprog.run_ahead pass the finished job instead: the phase
+# then covers the job's run on the emitter thread, not the caller's
+# bookkeeping after it.
+#
+#   for n, job in keyprog.run_ahead(cycles, backend):
+#       with PROFILER.phase("Gil cycle", job) as p:
+#           ...
+#
+# Phases nest: a phase entered inside another is kept under its path
+# ("Gil farm > Gil cycle"). Every program run inside a phase is split
+# further at its sub-phase marks (keyprog.mark, e.g. "Buy Cottages &
+# Tents", "Recov Med-RF", "Sell Mega Potions"). Mark boundaries are
+# the events' deadlines on the scheduler timeline (start + planned
+# offset); the last sub-phase ends at the measured end of the run, so
+# it absorbs any lateness. Programs without marks count under their
+# routine name.
+#
+# Each path keeps its durations in an array, so the end-of-session
+# report can rank phases by total time with count, mean and p95. A
+# phase costs two clock reads and one array append.
+# ==================================================================
+
+import time
+from array import array
+
+import keyprog
+from telemetry import percentile
+
+SEPARATOR = " > "
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "job", "start", "end", "seconds")
+
+    def __init__(self, profiler, name: str, job=None):
+        self.profiler = profiler
+        self.name = name
+        self.job = job
+        self.start = self.end = self.seconds = 0.0
+
+    def __enter__(self) -> "_Phase":
+        self.profiler._stack.append(self.name)
+        if self.job is not None:
+            self.job.notify()  # its sub-phases land under this phase
+            self.start = self.job.start
+        else:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.end = self.job.end if self.job is not None else time.perf_counter()
+        self.seconds = self.end - self.start
+        stack = self.profiler._stack
+        self.profiler.add(tuple(stack), self.seconds)
+        stack.pop()
+
+
+class Profiler:
+    """Durations per phase path, fed by phase() blocks and keyprog runs."""
+
+    def __init__(self):
+        self.samples = {}   # path tuple -> array of seconds
+        self.created = time.perf_counter()
+        self._stack = []
+        self._segments = {}  # program -> ((name, start offset, end offset), ...)
+
+    def phase(self, name: str, job=None) -> _Phase:
+        """
+        Context manager timing one `name` phase under the current one
+        (or, given a finished keyprog.Job, that job's run).
+        """
+        return _Phase(self, name, job)
+
+    def add(self, path: tuple, seconds: float) -> None:
+        samples = self.samples.get(path)
+        if samples is None:
+            samples = self.samples[path] = array("d")
+        samples.append(seconds)
+
+    def segments(self, program):
+        """Sub-phases of `program` as (name, start offset, end offset or None)."""
+        segments = self._segments.get(program)
+        if segments is None:
+            offsets = [0.0]
+            for e in program.events:
+                offsets.append(offsets[-1] + e.hold + e.delay)
+            bounds = [(i, name) for i, name in program.marks if i < len(program.events)]
+            if not bounds or bounds[0][0] > 0:
+                bounds.insert(0, (0, program.name))
+            segments = tuple(
+                (name, offsets[i], offsets[bounds[k + 1][0]] if k + 1 < len(bounds) else None)
+                for k, (i, name) in enumerate(bounds)
+            )
+            self._segments[program] = segments
+        return segments
+
+    def observe(self, program, start: float, end: float) -> None:
+        """keyprog observer: add the run's sub-phases under the current phase."""
+        base = tuple(self._stack)
+        for name, a, b in self.segments(program):
+            t0 = min(start + a, end)
+            t1 = end if b is None else min(start + b, end)
+            self.add(base + (name,), t1 - t0)
+
+    # ----------------------------
+    # REPORT
+    # ----------------------------
+    def report(self, top: int = 10) -> str:
+        """Phase tree ranked by total time, then the top sub-phases."""
+        wall = time.perf_counter() - self.created
+        totals = {path: sum(v) for path, v in self.samples.items()}
+
+        def row(label, path):
+            v = self.samples[path]
+            share = f"{totals[path] / wall * 100:5.1f}%" if wall > 0 else "    -"
+            return (f"{label[:52]:<52} {len(v):>7,} {totals[path]:>10.1f}s {totals[path] / len(v):>8.2f}s "
+                    f"{percentile(v, 95):>8.2f}s {share:>7}")
+
+        header = f"{'Phase':<52} {'Count':>7} {'Total':>11} {'Mean':>9} {'p95':>9} {'Wall':>7}"
+        lines = [header, "-" * len(header)]
+
+        def walk(parent):
+            children = [p for p in self.samples if len(p) == len(parent) + 1 and p[:-1] == parent]
+            for path in sorted(children, key=lambda p: -totals[p]):
+                lines.append(row("  " * len(parent) + path[-1], path))
+                walk(path)
+
+        walk(())
+
+        leaves = [p for p in self.samples if not any(q[:-1] == p for q in self.samples)]
+        if leaves:
+            lines.append("")
+            lines.append(f"Critical path (top {min(top, len(leaves))} of {len(leaves)} leaf phases):")
+            for rank, path in enumerate(sorted(leaves, key=lambda p: -totals[p])[:top], 1):
+                lines.append(row(f"{rank:>2}. {SEPARATOR.join(path)}", path))
+        return "\n".join(lines)
+
+
+def attach() -> Profiler:
+    """A profiler fed by every keyprog.run from now on."""
+    profiler = Profiler()
+    keyprog.OBSERVERS.append(profiler.observe)
+    return profiler
@@ -0,0 +1,537 @@
+# ==================================================================
+# routines.py — v1.0 (2026-10-17)
+# ==================================================================
+# Declarative key routines for the farm scripts.
+#
+# Each builder returns a list of keyprog steps. Scripts compile the
+# routines they need ONCE at startup (keyprog.compile_routine) and run
+# the compiled programs inside their cycle loops.
+#
+# Starting/ending menu states are noted on each builder. Cursor and
+# quantity presses come from the menu model (menu_graph.py) rather than
+# hard-coded counts; column/page switches carry their named waits.
+#
+# Run this file directly to print a summary of every routine:
+#   python routines.py
+# ==================================================================
+
+import menu_graph
+from keyprog import Wait, compile_routine, mark, press, press_seconds, sleep
+
+# pydirectinput PAUSE the scripts pressed keys with (keyprog.PRESS_PAUSES
+# of them per press).
+GIL_PAUSE = 0.025
+STAT_PAUSE = 0.02
+
+# An Item menu slot holds at most 100 of one item; more of it takes
+# further slots, which use_burst moves on to when one runs out.
+ITEM_STACK = 100
+
+# Named waits (seconds) after menu transitions in the gil and stat
+# farm routines. These are the hand-calibrated defaults; a per-machine
+# timing profile (timing_profile.py, written by tune_delays.py) can
+# override any of them by name.
+WAITS = {
+    # gil_cycle
+    "gil.buy_tab": 0.2,
+    "gil.select_cottage": 0.15,
+    "gil.select_tent": 0.15,
+    "gil.exit_buy": 0.4,
+    "gil.exit_shop": 0.65,
+    "gil.exit_call_shop": 0.4,
+    "gil.abilities_right": 0.2,
+    "gil.open_recov": 0.65,
+    "gil.recov_list": 0.2,
+    "gil.refine_tents": 0.1,
+    "gil.confirm_tents": 0.2,
+    "gil.refine_cottages": 0.1,
+    "gil.exit_recov": 0.65,
+    "gil.abilities_left": 0.2,
+    "gil.open_call_shop": 0.4,
+    "gil.enter_shop": 0.65,
+    "gil.open_sell": 0.4,
+    "gil.select_mega": 0.2,
+    "gil.exit_sell": 0.4,
+    "gil.open_buy": 0.4,
+    # stat_cycle / stat_refine / stat_run_transition
+    "stat.buy_tab": 0.3,
+    "stat.select_item": 0.2,
+    "stat.exit_buy": 0.4,
+    "stat.exit_shop": 0.65,
+    "stat.exit_call_shop": 0.4,
+    "stat.abilities_right": 0.25,
+    "stat.open_gfabl": 0.65,
+    "stat.refine_select": 0.15,
+    "stat.refine_confirm": 0.15,
+    "stat.exit_gfabl": 0.65,
+    "stat.abilities_left": 0.25,
+    "stat.open_call_shop": 0.4,
+    "stat.enter_shop": 0.65,
+    "stat.open_buy": 0.4,
+    "stat.open_forbid": 0.65,
+    "stat.exit_forbid": 0.65,
+    # Phase joins (join / nav_*), named after the menu_graph links
+    "nav.exit_buy": 0.4,
+    "nav.exit_sell": 0.4,
+    "nav.exit_shop": 0.65,
+    "nav.exit_call_shop": 0.4,
+    "nav.exit_refine": 0.65,
+    "nav.exit_abilities": 0.8,
+    "nav.exit_target": 0.2,
+    "nav.exit_items": 0.65,
+    "nav.open_abilities": 0.65,
+    "nav.open_call_shop": 0.4,
+    "nav.open_refine": 0.65,
+    "nav.open_items": 0.65,
+    "nav.select_item": 0.2,
+    "nav.enter_shop": 0.65,
+    "nav.open_buy": 0.4,
+    "nav.open_sell": 0.4,
+    "nav.buy_tab": 0.2,
+    "nav.abilities_left": 0.2,
+    "nav.abilities_right": 0.2,
+    # use_burst: confirm character → usage dialog opens
+    "use.confirm_use": 0.2,
+}
+
+# Waits that cover the game's response to an input (cursor columns,
+# tabs, list selections, quantity selectors, dialogs) rather than a
+# screen animation. The Remastered speed booster shortens animations
+# only, so speed-mode timing profiles (timing_profile.GameMode) scale
+# every other wait and leave these as they are.
+INPUT_BOUND = frozenset({
+    "gil.buy_tab", "gil.select_cottage", "gil.select_tent", "gil.abilities_right",
+    "gil.recov_list", "gil.refine_tents", "gil.confirm_tents", "gil.refine_cottages",
+    "gil.abilities_left", "gil.select_mega",
+    "stat.buy_tab", "stat.select_item", "stat.abilities_right", "stat.refine_select",
+    "stat.refine_confirm", "stat.abilities_left",
+    "nav.exit_target", "nav.select_item", "nav.buy_tab", "nav.abilities_left", "nav.abilities_right",
+    "use.confirm_use",
+})
+
+
+def animation_bound(name):
+    """True if the named wait covers a screen animation (scaled by game speed)."""
+    return name not in INPUT_BOUND
+
+
+# Items bought and sold per gil cycle.
+GIL_BUY_QUANTITY = 100   # Cottages and Tents
+MEGA_POTIONS = 75        # refined Mega Potions sold
+# Mega Potions a full cycle keeps: 25 (Tents) + 75 (Cottages) made, 75 sold.
+MEGA_POTIONS_KEPT = GIL_BUY_QUANTITY // 4 + GIL_BUY_QUANTITY // 4 * 3 - MEGA_POTIONS
+STAT_BUY_QUANTITY = 100  # stat item purchases per cycle
+
+# A partial gil cycle buys Cottages only: every 4 Cottages refine into
+# 3 Mega Potions (+16,500 gil once sold).
+COTTAGE_BATCH = 4
+COTTAGE_BATCH_PROFIT = 3 * 7_500 - COTTAGE_BATCH * 1_500
+
+
+def w(name):
+    return Wait(name, WAITS[name])
+
+
+def moves(menu, src, dst, prefix=None):
+    """Cursor moves from src to dst (None = entry cursor) in a modelled menu."""
+    wait_for = (lambda name: w(f"{prefix}.{name}")) if prefix else None
+    return menu_graph.cursor_moves(menu, src, dst, wait_for)
+
+
+def join(start, goal, memory=None):
+    """
+    Fastest key path between two menu states ("menu/entry", see
+    menu_graph.state), timed with the nav.* waits. Used to fuse the
+    end of one phase directly into the start of the next.
+    memory: remembered cursors, e.g. {"call_shop": "Esthar Pet Shop"}.
+    """
+    def seconds(key, wait):
+        return press_seconds(STAT_PAUSE) + (WAITS[f"nav.{wait}"] if wait else 0.0)
+
+    path = menu_graph.shortest_path(menu_graph.state(start, memory), menu_graph.state(goal), cost=seconds)
+    return menu_graph.to_steps(path, lambda name: w(f"nav.{name}"))
+
+
+# ====================================================================
+# GIL FARM
+# ====================================================================
+def partial_gil_cycle_cottages(profit):
+    """Fewest Cottages (whole refine batches) whose Mega Potions earn `profit`."""
+    batches = max(1, -(-profit // COTTAGE_BATCH_PROFIT))
+    return min(batches * COTTAGE_BATCH, GIL_BUY_QUANTITY)
+
+
+def partial_gil_cycle_profit(cottages):
+    return cottages // COTTAGE_BATCH * COTTAGE_BATCH_PROFIT
+
+
+def gil_cycle(tail=True, cottages=None):
+    """
+    One Mega Potion cycle (buy → Recov Med-RF → sell).
+    tail: return to the Buy menu after selling.
+    cottages: partial cycle — buy only this many Cottages (a multiple
+              of 4), no Tents, and sell the Mega Potions they make.
+    Starting state: Esthar Shop!!! → Buy menu, cursor on "Potion"
+    Ending state:   Esthar Shop!!! → Buy menu
+                    (no tail: Sell list, cursor on "Mega Potion")
+    """
+    if cottages is not None:
+        return _partial_gil_cycle(cottages, tail)
+    steps = [
+        # PHASE 1 — BUY TENTS & COTTAGES
+        mark("Buy Cottages & Tents"),
+        *moves("buy:Esthar Shop!!!", "Potion", "Cottage", "gil"),
+        press("enter", wait=w("gil.select_cottage")),
+        *menu_graph.quantity_moves(GIL_BUY_QUANTITY),
+        press("enter"),
+        *moves("buy:Esthar Shop!!!", "Cottage", "Tent"),
+        press("enter", wait=w("gil.select_tent")),
+        *menu_graph.quantity_moves(GIL_BUY_QUANTITY),
+        press("enter"),
+        press("c", wait=w("gil.exit_buy")),
+        press("c", wait=w("gil.exit_shop")),
+
+        # PHASE 2 — REFINE ITEMS → MEGA POTIONS (Recov Med-RF)
+        mark("Recov Med-RF"),
+        press("c", wait=w("gil.exit_call_shop")),
+        *moves("abilities", "Call Shop", "Recov Med-RF", "gil"),
+        press("enter", wait=w("gil.open_recov")),
+        press("enter", wait=w("gil.recov_list")),          # select Tent
+        press("down", 3),                                  # amount → all (Tents → 25x Mega Potions)
+        press("enter", wait=w("gil.refine_tents")),
+        *moves("refine:Recov Med-RF", "Tent", "Cottage"),
+        press("enter", wait=w("gil.confirm_tents")),       # select Cottage
+        press("down", 5),                                  # amount → all (Cottages → 75x Mega Potions)
+        press("enter", wait=w("gil.refine_cottages")),
+        press("c", wait=w("gil.exit_recov")),
+
+        # PHASE 3 — SELL MEGA POTIONS
+        mark("Sell Mega Potions"),
+        *moves("abilities", "Recov Med-RF", "Call Shop", "gil"),
+        press("enter", wait=w("gil.open_call_shop")),
+        press("enter", wait=w("gil.enter_shop")),
+        *moves("shop:Esthar Shop!!!", "Buy", "Sell"),
+        press("enter", wait=w("gil.open_sell")),
+        *moves("sell:Esthar Shop!!!", None, "Mega Potion"),
+        press("enter", wait=w("gil.select_mega")),
+        *menu_graph.quantity_moves(MEGA_POTIONS, limit=None),   # owned count varies (kept ones)
+        press("enter"),
+    ]
+    if tail:
+        steps += [
+            mark("Return to Buy"),
+            press("c", wait=w("gil.exit_sell")),
+            *moves("shop:Esthar Shop!!!", "Sell", "Buy"),
+            press("enter", wait=w("gil.open_buy")),
+        ]
+    return steps
+
+
+def _partial_gil_cycle(cottages, tail):
+    batches = cottages // COTTAGE_BATCH
+    steps = [
+        # PHASE 1 — BUY COTTAGES
+        mark("Buy Cottages"),
+        *moves("buy:Esthar Shop!!!", "Potion", "Cottage", "gil"),
+        press("enter", wait=w("gil.select_cottage")),
+        *menu_graph.quantity_moves(cottages),
+        press("enter"),
+        press("c", wait=w("gil.exit_buy")),
+        press("c", wait=w("gil.exit_shop")),
+
+        # PHASE 2 — REFINE COTTAGES
+        mark("Recov Med-RF"),
+        press("c", wait=w("gil.exit_call_shop")),
+        *moves("abilities", "Call Shop", "Recov Med-RF", "gil"),
+        press("enter", wait=w("gil.open_recov")),
+        *moves("refine:Recov Med-RF", "Tent", "Cottage"),  # as in the full cycle
+        press("enter", wait=w("gil.recov_list")),          # select Cottage
+        press("down", -(-(batches - 1) // 10)),            # amount → all batches
+        press("enter", wait=w("gil.refine_cottages")),
+        press("c", wait=w("gil.exit_recov")),
+
+        # PHASE 3 — SELL MEGA POTIONS
+        mark("Sell Mega Potions"),
+        *moves("abilities", "Recov Med-RF", "Call Shop", "gil"),
+        press("enter", wait=w("gil.open_call_shop")),
+        press("enter", wait=w("gil.enter_shop")),
+        *moves("shop:Esthar Shop!!!", "Buy", "Sell"),
+        press("enter", wait=w("gil.open_sell")),
+        *moves("sell:Esthar Shop!!!", None, "Mega Potion"),
+        press("enter", wait=w("gil.select_mega")),
+        *menu_graph.quantity_moves(3 * batches, limit=None),  # owned count varies (kept ones)
+        press("enter"),
+    ]
+    if tail:
+        steps += [
+            mark("Return to Buy"),
+            press("c", wait=w("gil.exit_sell")),
+            *moves("shop:Esthar Shop!!!", "Sell", "Buy"),
+            press("enter", wait=w("gil.open_buy")),
+        ]
+    return steps
+
+
+def gil_cycle_to_stat(cottages=None):
+    """
+    Last gil cycle fused with the move to the stat farm: leaves the
+    Sell list straight for the Esthar Pet Shop.
+    cottages: make it a partial cycle (see gil_cycle).
+    Starting state: Esthar Shop!!! → Buy menu, cursor on "Potion"
+    Target state:   Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    """
+    return gil_cycle(tail=False, cottages=cottages) + [mark("To Esthar Pet Shop")] + join(
+        "sell:Esthar Shop!!!/Mega Potion", "buy:Esthar Pet Shop/G-Potion")
+
+
+# ====================================================================
+# STAT FARM
+# ====================================================================
+def stat_items(item):
+    """One Esthar Pet Shop item or several, as a list in Buy list order."""
+    if isinstance(item, str):
+        return [item]
+    return sorted(item, key=menu_graph.MENUS["buy:Esthar Pet Shop"].entries.index)
+
+
+def stat_cycle(item, later_run=False, final=False, held=None):
+    """
+    One stat farm cycle (buy item → GFAbl Med-RF → return to shop).
+    item: Esthar Pet Shop item to buy (e.g. "Power Wrist"), or several
+          items: each is bought in the same shop visit and refined in
+          the same GFAbl Med-RF visit.
+    later_run: runs after the first hold their stat-ups, which list
+               before the shop items in GFAbl.
+    final:     skip the return to shop (ends in the Abilities menu).
+    held:      stat-up kinds held on a later run (default: one per item).
+    Starting state: Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    Ending state:   Esthar Pet Shop → Buy menu (final: Abilities menu)
+    """
+    items = stat_items(item)
+    steps = [mark("Buy items")]
+    cursor = "G-Potion"
+    for name in items:
+        # PHASE 1.0 — BUY ITEM(S)
+        steps += [
+            *moves("buy:Esthar Pet Shop", cursor, name, "stat"),
+            press("enter", wait=w("stat.select_item")),
+            *menu_graph.quantity_moves(STAT_BUY_QUANTITY),
+            press("enter"),
+        ]
+        cursor = name
+    steps += [
+        press("c", wait=w("stat.exit_buy")),
+        press("c", wait=w("stat.exit_shop")),
+        press("c", wait=w("stat.exit_call_shop")),
+
+        # PHASE 1.2 — REFINE ITEM(S) → Mid Tier (GFAbl Med-RF)
+        mark("GFAbl Med-RF"),
+        *moves("abilities", "Call Shop", "GFAbl Med-RF", "stat"),
+        press("enter", wait=w("stat.open_gfabl")),
+        press("down", _held(later_run, held, len(items))),
+    ]
+    for _ in items:
+        # A refined item leaves the list; the next one moves up under the cursor.
+        steps += [
+            press("enter", wait=w("stat.refine_select")),
+            press("down"),              # amount → all
+            press("enter", wait=w("stat.refine_confirm")),
+        ]
+    steps += [
+        # PHASE 1.3 — RETURN TO SHOP (or exit on final cycle)
+        press("c", wait=w("stat.exit_gfabl")),
+    ]
+    if not final:
+        steps += [
+            mark("Return to shop"),
+            *moves("abilities", "GFAbl Med-RF", "Call Shop", "stat"),
+            press("enter", wait=w("stat.open_call_shop")),
+            press("enter", wait=w("stat.enter_shop")),
+            press("enter", wait=w("stat.open_buy")),
+        ]
+    return steps
+
+
+def _held(later_run, held, count):
+    if not later_run:
+        return 0
+    return count if held is None else held
+
+
+def stat_refine(later_run=False, count=1, held=None):
+    """
+    Final refine of the run's intermediates (Forbid Med-RF).
+    count: number of item kinds farmed together (see stat_cycle).
+    held:  stat-up kinds held on a later run (default: count); a later
+           run's items must all be among them.
+    Starting state: Abilities menu, cursor on GFAbl Med-RF
+    Ending state:   Abilities menu, inside Forbid Med-RF
+    """
+    steps = [
+        mark("Forbid Med-RF"),
+        *moves("abilities", "GFAbl Med-RF", "Forbid Med-RF"),
+        press("enter", wait=w("stat.open_forbid")),
+        press("down"),
+        press("down", _held(later_run, held, count)),
+    ]
+    for i in range(count):
+        # Forbid lists the stat-ups held before the intermediates: on the
+        # first run each refine adds its stat-up above the cursor.
+        if i > 0 and not later_run:
+            steps.append(press("down"))
+        steps += [
+            press("enter"),
+            press("down", 10),          # amount → all
+            press("enter", wait=w("stat.refine_confirm") if i < count - 1 else 0.0),
+        ]
+    return steps
+
+
+def stat_run_transition():
+    """
+    Return to the shop between runs.
+    Starting state: Abilities menu, inside Forbid Med-RF
+    Target state:   Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    """
+    return [
+        press("c", wait=w("stat.exit_forbid")),
+        *moves("abilities", "Forbid Med-RF", "Call Shop", "stat"),
+        press("enter", wait=w("stat.open_call_shop")),
+        press("enter", wait=w("stat.enter_shop")),
+        press("enter", wait=w("stat.open_buy")),
+    ]
+
+
+# ====================================================================
+# NAVIGATION (max_stat_farm)
+# ====================================================================
+def nav_gil_to_stat():
+    """
+    Starting state: Esthar Shop!!! → Buy menu (after last sell cycle)
+    Target state:   Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    """
+    return join("buy:Esthar Shop!!!/Potion", "buy:Esthar Pet Shop/G-Potion")
+
+
+def nav_stat_to_items(character_position):
+    """
+    Starting state: Abilities menu, inside Forbid Med-RF (after final refine)
+    Target state:   Item menu → stat-up item selected → target character
+                    highlighted → cursor on "Use" / Confirm
+    """
+    character = menu_graph.MENUS["item_target"].entries[character_position - 1]
+    return join("refine:Forbid Med-RF", f"item_target/{character}")
+
+
+def nav_stat_to_party_items(uses):
+    """
+    Use every held stat-up in one Item menu visit.
+    uses: [(stat_up, character_position, count)], covering all held
+          stat-ups. Kinds are used up in Item list order (so the next
+          kind is always first), characters top to bottom.
+    Starting state: Abilities menu, inside Forbid Med-RF (after final refine)
+    Target state:   Item menu, last character highlighted (all items used)
+    """
+    items = menu_graph.MENUS["items"].entries
+    order = menu_graph.STAT_UPS
+    uses = sorted(uses, key=lambda u: (order.index(u[0]), u[1]))
+    kinds = []  # [(stat_up, [(position, count), ...])]
+    for stat_up, position, count in uses:
+        if not kinds or kinds[-1][0] != stat_up:
+            kinds.append((stat_up, []))
+        kinds[-1][1].append((position, count))
+    steps = join("refine:Forbid Med-RF", f"items/{items[0]}")
+    for k, (stat_up, per_character) in enumerate(kinds):
+        if k:
+            steps.append(press("c", wait=w("nav.exit_target")))
+        steps.append(press("enter", wait=w("nav.select_item")))
+        steps += use_burst(per_character)
+    return steps
+
+
+def nav_items_to_gil():
+    """
+    Starting state: Item menu (after using all stat-up items)
+    Target state:   Esthar Shop!!! → Buy menu, cursor on "Potion"
+    """
+    return join("item_target", "buy:Esthar Shop!!!/Potion", {"call_shop": "Esthar Pet Shop"})
+
+
+def nav_items_to_stat():
+    """
+    Starting state: Item menu (after using all stat-up items)
+    Target state:   Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    """
+    return join("item_target", "buy:Esthar Pet Shop/G-Potion", {"call_shop": "Esthar Pet Shop"})
+
+
+# ====================================================================
+# ITEM USAGE
+# ====================================================================
+def use_burst(uses, start=None, slot=ITEM_STACK):
+    """
+    Use the selected stat-up on one or more characters in one pass.
+    Each use = 2 confirm presses: confirm character, then confirm
+    usage once the dialog has opened (use.confirm_use, tunable with
+    tune_delays.py). The target cursor moves between characters.
+    uses:  [(character_position, count)], in pass order
+    start: position highlighted at the start (None = the list's entry
+           cursor, i.e. right after selecting the item)
+    slot:  uses left in the selected slot; later slots of the item hold
+           ITEM_STACK. When a slot runs out with uses to go, the game
+           drops back to the Item list with the next slot under the
+           cursor: the burst selects it and returns to the character.
+    Starting state: Item menu, stat-up item selected, target list open
+    Target state:   same list, last character highlighted
+    """
+    if not 1 <= slot <= ITEM_STACK:
+        raise ValueError(f"A slot holds 1 to {ITEM_STACK} items, not {slot}")
+    targets = menu_graph.MENUS["item_target"].entries
+    character = targets[start - 1] if start else None
+    left = slot
+    steps = []
+    for position, count in uses:
+        target = targets[position - 1]
+        for i in range(count):
+            if not left:
+                steps += [
+                    sleep(w("nav.exit_target")),                 # slot empty: Item list
+                    press("enter", wait=w("nav.select_item")),   # next slot of the item
+                ]
+                character = None
+                left = ITEM_STACK
+            if i == 0 or character is None:
+                steps += moves("item_target", character, target, "nav")
+                character = target
+            steps += [
+                press("enter", wait=w("use.confirm_use")),
+                press("enter"),
+            ]
+            left -= 1
+    return steps
+
+
+# ====================================================================
+# SUMMARY
+# ====================================================================
+def _summary_programs():
+    yield compile_routine("gil_cycle", gil_cycle(), GIL_PAUSE)
+    yield compile_routine("gil_cycle_to_stat", gil_cycle_to_stat(), GIL_PAUSE)
+    for later in (False, True):
+        for final in (False, True):
+            name = f"stat_cycle(later_run={later}, final={final})"
+            yield compile_routine(name, stat_cycle("Power Wrist", later_run=later, final=final), STAT_PAUSE)
+    yield compile_routine("stat_refine", stat_refine(), STAT_PAUSE)
+    yield compile_routine("stat_run_transition", stat_run_transition(), STAT_PAUSE)
+    yield compile_routine("nav_gil_to_stat", nav_gil_to_stat(), STAT_PAUSE)
+    yield compile_routine("nav_stat_to_items(1)", nav_stat_to_items(1), STAT_PAUSE)
+    yield compile_routine("nav_items_to_gil", nav_items_to_gil(), STAT_PAUSE)
+    yield compile_routine("nav_items_to_stat", nav_items_to_stat(), STAT_PAUSE)
+    yield compile_routine("use_burst([(1, 60)])", use_burst([(1, 60)], 1), STAT_PAUSE)
+
+
+if __name__ == "__main__":
+    print(f"{'Routine':<40} {'Presses':>7} {'Waits':>8} {'Planned':>8}")
+    print("-" * 66)
+    for prog in _summary_programs():
+        print(f"{prog.name:<40} {len(prog):>7} {prog.wait_sum:>7.2f}s {prog.duration:>7.2f}s")
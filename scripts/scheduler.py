@@ -0,0 +1,186 @@
+# ==================================================================
+# scheduler.py — v1.0 (2026-10-17)
+# ==================================================================
+# Deadline-based timing for key programs.
+#
+# Chained relative sleeps (press, sleep 0.2, press, sleep 0.4, ...)
+# accumulate every sleep overshoot and every press's call overhead.
+# The scheduler instead places each event on an absolute
+# perf_counter timeline:
+#
+#   deadline[n] = start + sum(planned gaps before n)
+#
+# and waits for each deadline with a hybrid wait: time.sleep() until
+# spin_margin before the deadline, then a short busy-wait. The margin
+# is calibrated at startup from the host's measured sleep overshoot.
+#
+# Back-to-back programs continue the same timeline (begin/end), so
+# small gaps between them (logging, loop bookkeeping) are absorbed by
+# the next program instead of adding up across thousands of cycles.
+#
+# Every planned gap is a minimum. A deadline missed by more than
+# MAX_LAG (a GC pause, a busy emitter, a stalled game window) moves the
+# rest of the program back by the miss (`slip`), so the presses after
+# a stall keep their planned spacing instead of firing back-to-back to
+# catch up. A program starts a new timeline unless the previous one
+# ended at most MAX_LAG ago.
+#
+# cancel() makes every later wait raise Cancelled, which stops a
+# program running on another thread (keyprog.run_ahead) at its next
+# event; reset() clears it.
+#
+# Benchmark (relative sleeps vs deadlines):
+#   python scheduler.py
+#   python scheduler.py --events 500 --gap 0.02
+# ==================================================================
+
+import time
+
+DEFAULT_SPIN_MARGIN = 0.002  # used until calibrate() runs
+MAX_SPIN_MARGIN = 0.02       # cap (coarse ~15.6 ms Windows timers)
+MAX_LAG = 0.002              # lateness absorbed by the timeline; beyond it, re-anchor
+
+
+class Cancelled(Exception):
+    """Raised by wait_until() after cancel()."""
+
+
+class DeadlineScheduler:
+    def __init__(self, clock=time.perf_counter, sleep=time.sleep,
+                 spin_margin: float = DEFAULT_SPIN_MARGIN, max_lag: float = MAX_LAG):
+        self.clock = clock
+        self.sleep = sleep
+        self.spin_margin = spin_margin
+        self.max_lag = max_lag
+        self.cursor = None  # end deadline of the last program
+        self.slip = 0.0     # seconds the running program has been moved back
+        self.cancelled = False
+
+    def calibrate(self, samples: int = 25, probe: float = 0.001) -> float:
+        """
+        Measure how far sleep(probe) overshoots and set spin_margin to
+        the worst observed overshoot (plus 0.5 ms), capped at
+        MAX_SPIN_MARGIN. Returns the new margin.
+        """
+        clock = self.clock
+        overshoots = []
+        for _ in range(samples):
+            t0 = clock()
+            self.sleep(probe)
+            overshoots.append(clock() - t0 - probe)
+        self.spin_margin = min(max(max(overshoots), 0.0) + 0.0005, MAX_SPIN_MARGIN)
+        return self.spin_margin
+
+    def wait_until(self, deadline: float) -> None:
+        """Wait for `deadline` (program time; the scheduler adds `slip`)."""
+        if self.cancelled:
+            raise Cancelled
+        clock = self.clock
+        deadline += self.slip
+        remaining = deadline - clock()
+        if remaining <= 0:
+            if remaining < -self.max_lag:
+                self.slip -= remaining
+            return
+        if remaining > self.spin_margin:
+            self.sleep(remaining - self.spin_margin)
+        while clock() < deadline:
+            pass
+
+    def begin(self) -> float:
+        """Start time for the next program on the timeline."""
+        now = self.clock()
+        self.slip = 0.0
+        if self.cursor is not None and 0 <= now - self.cursor <= self.max_lag:
+            return self.cursor
+        return now
+
+    def end(self, deadline: float) -> None:
+        """Wait out the program's trailing delay and advance the timeline."""
+        self.wait_until(deadline)
+        self.cursor = deadline + self.slip
+
+    def detach(self) -> None:
+        """Start the next program at its begin() time instead of continuing the timeline."""
+        self.cursor = None
+        self.slip = 0.0
+
+    def cancel(self) -> None:
+        """Stop whatever program is waiting on this scheduler (any thread)."""
+        self.cancelled = True
+
+    def reset(self) -> None:
+        """Drop the timeline (e.g. after a prompt or a long pause) and any cancel()."""
+        self.cursor = None
+        self.slip = 0.0
+        self.cancelled = False
+
+
+_default = None
+
+
+def default_scheduler() -> DeadlineScheduler:
+    """Process-wide scheduler, calibrated on first use."""
+    global _default
+    if _default is None:
+        _default = DeadlineScheduler()
+        _default.calibrate()
+    return _default
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def _bench(events: int, gap: float) -> None:
+    clock = time.perf_counter
+
+    # Chained relative sleeps (what the scripts did before).
+    t0 = clock()
+    stamps = []
+    for _ in range(events):
+        stamps.append(clock())
+        time.sleep(gap)
+    relative_total = clock() - t0
+    relative_err = [abs(s - (t0 + i * gap)) for i, s in enumerate(stamps)]
+
+    sched = DeadlineScheduler()
+    margin = sched.calibrate()
+    start = sched.begin()
+    stamps = []
+    for i in range(events):
+        sched.wait_until(start + i * gap)
+        stamps.append(clock())
+    sched.end(start + events * gap)
+    deadline_total = clock() - start
+    deadline_err = [abs(s - (start + i * gap)) for i, s in enumerate(stamps)]
+
+    # A 100 ms stall halfway through: the later gaps must not shrink.
+    start = sched.begin()
+    stamps = []
+    for i in range(events):
+        if i == events // 2:
+            time.sleep(0.1)
+        sched.wait_until(start + i * gap)
+        stamps.append(clock())
+    sched.end(start + events * gap)
+    stalled_gap = min(b - a for a, b in zip(stamps[events // 2:], stamps[events // 2 + 1:]))
+
+    planned = events * gap
+    print(f"Events:                   {events} x {gap}s (planned {planned:.3f}s)")
+    print(f"Calibrated spin margin:   {margin * 1000:.3f}ms")
+    print(f"Relative sleeps:          {relative_total:.3f}s total, drift {relative_total - planned:+.4f}s, "
+          f"max event error {max(relative_err) * 1000:.3f}ms")
+    print(f"Deadline scheduler:       {deadline_total:.3f}s total, drift {deadline_total - planned:+.4f}s, "
+          f"max event error {max(deadline_err) * 1000:.3f}ms")
+    print(f"After a 100ms stall:      moved back {sched.slip * 1000:.1f}ms, "
+          f"shortest later gap {stalled_gap * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare chained sleeps with deadline scheduling.")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--gap", type=float, default=0.02)
+    args = parser.parse_args()
+    _bench(args.events, args.gap)
@@ -0,0 +1,223 @@
+# ==================================================================
+# settle.py — v1.0 (2026-10-17)
+# ==================================================================
+# Wait-until-stable for menu transitions (--settle).
+#
+# The 0.4 s and 0.65 s waits after opening or closing a menu are
+# worst-case animation times. With keyprog.SETTLER set to a Settler,
+# every animation-bound wait (routines.animation_bound) ends as soon
+# as the screen has settled:
+#
+#   1. the watched region (capture.py ROI, default "menu_title")
+#      changes — the animation has started — and then
+#   2. holds still for STABLE_FRAMES captured frames.
+#
+# Frames are compared downsampled (every DOWNSAMPLE-th pixel, summed
+# over B, G, R) by mean absolute difference into preallocated buffers,
+# so a check costs tens of microseconds. The compiled wait is the
+# timeout: a transition that never changes the region, or a capture
+# that stalls, waits exactly as long as before. Input-bound waits stay
+# fixed.
+#
+# enable() starts the capture thread on the game window (Windows;
+# needs NumPy) and installs the settler:
+#
+#   python gil_farm.py --settle
+#
+# Offline, the simulator models the same rule (--settle there), and
+# movement_times() applies the same test to a recorded ring
+# (tune_delays.py --oracle capture).
+#
+# Benchmark (replayed transitions, any platform):
+#   python settle.py
+#   python settle.py --animation-ms 300 --timeout-ms 650
+# ==================================================================
+
+import atexit
+import time
+
+import numpy as np
+
+import capture
+import routines
+
+STABLE_FRAMES = 3      # unchanged frames that end a wait (~50 ms at 60 fps)
+DOWNSAMPLE = 4         # compare every 4th pixel in both directions
+THRESHOLD = 3.0        # mean |difference| of the B+G+R sums that counts as movement
+POLL_S = 0.002         # sleep between checks for a new frame
+REGION = "menu_title"  # capture.ROIS entry that every menu transition redraws
+
+
+class Settler:
+    """Ends a named wait once `region` has changed and then held still."""
+
+    def __init__(self, ring: capture.FrameRing, region: str = REGION, applies=routines.animation_bound,
+                 stable: int = STABLE_FRAMES, step: int = DOWNSAMPLE, threshold: float = THRESHOLD,
+                 clock=time.perf_counter):
+        roi = next(r for r in ring.rois if r.name == region)
+        shape = (-(-roi.height // step), -(-roi.width // step))
+        self.ring = ring
+        self.region = region
+        self.applies = applies
+        self.stable = stable
+        self.step = step
+        self.threshold = threshold
+        self.clock = clock
+        self._prev = np.zeros(shape, np.int16)
+        self._cur = np.zeros(shape, np.int16)
+        self._diff = np.zeros(shape, np.int16)
+        self.settled = 0       # waits ended early
+        self.timeouts = 0      # waits that ran their full time
+        self.saved = 0.0       # seconds ended early, in total
+
+    def _load(self, seq: int, out) -> None:
+        frame = self.ring.get(seq, self.region)
+        np.add.reduce(frame[::self.step, ::self.step, :3], axis=2, dtype=np.int16, out=out)
+
+    def _moved(self) -> bool:
+        np.subtract(self._cur, self._prev, out=self._diff)
+        np.abs(self._diff, out=self._diff)
+        return self._diff.mean() > self.threshold
+
+    def wait(self, name: str, timeout: float) -> None:
+        clock = self.clock
+        ring = self.ring
+        start = clock()
+        deadline = start + timeout
+        seq = ring.count - 1
+        if seq < 0:
+            time.sleep(timeout)
+            self.timeouts += 1
+            return
+        self._load(seq, self._prev)
+        changed = False
+        still = 0
+        while True:
+            now = clock()
+            if now >= deadline:
+                self.timeouts += 1
+                return
+            latest = ring.count - 1
+            if latest == seq:
+                time.sleep(min(POLL_S, deadline - now))
+                continue
+            seq = latest
+            self._load(seq, self._cur)
+            if self._moved():
+                changed = True
+                still = 0
+            elif changed:
+                still += 1
+                if still >= self.stable:
+                    self.settled += 1
+                    self.saved += deadline - clock()
+                    return
+            self._prev, self._cur = self._cur, self._prev
+
+    def describe(self) -> str:
+        return f"{self.settled:,} waits settled early ({self.saved:,.1f}s saved), {self.timeouts:,} ran full time"
+
+
+def movement_times(ring: capture.FrameRing, region: str = REGION, step: int = DOWNSAMPLE,
+                   threshold: float = THRESHOLD) -> list:
+    """Capture times of the frames in which `region` moved (the Settler's test)."""
+    times = []
+    prev = None
+    for seq in range(ring.oldest(), ring.count):
+        cur = np.add.reduce(ring.get(seq, region)[::step, ::step, :3], axis=2, dtype=np.int16)
+        if prev is not None and np.abs(cur - prev).mean() > threshold:
+            times.append(float(ring.times[seq % ring.capacity]))
+        prev = cur
+    return times
+
+
+def enable(rois=capture.ROIS, fps: float = capture.CAPTURE_FPS) -> str:
+    """
+    Capture the game window and install a Settler as keyprog.SETTLER;
+    returns a summary. `rois` are scaled to the window's client area.
+    """
+    import keyprog
+
+    rois = capture.window_rois(rois)
+    source = capture.GdiSource(rois)
+    ring = capture.FrameRing(rois)
+    thread = capture.CaptureThread(source, ring, fps)
+    thread.start()
+    settler = keyprog.SETTLER = Settler(ring)
+    atexit.register(lambda: print(f"Settle: {settler.describe()}"))
+    atexit.register(source.close)
+    atexit.register(thread.stop)
+    return f"watching {REGION!r} at {fps:g} fps"
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def _transition_recording(rois, fps: float, animation: float, hold: float) -> dict:
+    """Static menu, a sweeping animation of `animation` s, then the new static menu."""
+    moving = max(1, round(animation * fps))
+    still = max(1, round(hold * fps))
+    frames = still + moving + still
+    data = {"times": np.arange(frames) / fps}
+    for r in rois:
+        clip = np.zeros((frames, r.height, r.width, capture.CHANNELS), np.uint8)
+        clip[:still] = 40
+        for i in range(moving):
+            x = (i + 1) * r.width // moving
+            clip[still + i, :, :x] = 200
+            clip[still + i, :, x:] = 40
+        clip[still + moving:] = 200
+        data[r.name] = clip
+    return data
+
+
+def _bench(animation: float, timeout: float, fps: float, trials: int) -> None:
+    rois = capture.ROIS
+    hold = 0.05
+    recording = _transition_recording(rois, fps, animation, hold)
+    waited = []
+    for _ in range(trials):
+        ring = capture.FrameRing(rois)
+        source = capture.ReplaySource(recording, rois, loop=False)
+        thread = capture.CaptureThread(source, ring, fps)
+        thread.start()
+        while ring.count == 0:
+            time.sleep(0.001)
+        settler = Settler(ring)
+        start = time.perf_counter()
+        settler.wait("benchmark", timeout)
+        waited.append(time.perf_counter() - start)
+        thread.stop()
+
+    ring = capture.FrameRing(rois)
+    source = capture.ReplaySource(recording, rois)
+    for _ in range(2):
+        source.grab(ring.slot())
+        ring.commit(0.0)
+    settler = Settler(ring)
+    n = 10_000
+    start = time.perf_counter()
+    for _ in range(n):
+        settler._load(1, settler._cur)
+        settler._moved()
+    check = (time.perf_counter() - start) / n
+
+    mean = sum(waited) / len(waited)
+    print(f"Transition:               {hold * 1000:.0f}ms still, {animation * 1000:.0f}ms animation, "
+          f"captured at {fps:g} fps")
+    print(f"Fixed wait:               {timeout * 1000:.0f}ms")
+    print(f"Settled after:            {mean * 1000:.0f}ms mean, {max(waited) * 1000:.0f}ms max "
+          f"({trials} trials, {max(0.0, timeout - mean) * 1000:.0f}ms saved per wait)")
+    print(f"Check cost:               {check * 1e6:.1f}us per frame ({REGION}, 1/{DOWNSAMPLE} downsampled)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure how early wait-until-stable ends a menu transition.")
+    parser.add_argument("--animation-ms", type=float, default=250.0, help="length of the replayed animation")
+    parser.add_argument("--timeout-ms", type=float, default=650.0, help="the fixed wait it replaces")
+    parser.add_argument("--fps", type=float, default=capture.CAPTURE_FPS, help="capture rate")
+    parser.add_argument("--trials", type=int, default=10)
+    args = parser.parse_args()
+    _bench(args.animation_ms / 1000, args.timeout_ms / 1000, args.fps, args.trials)
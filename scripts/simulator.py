@@ -0,0 +1,700 @@
+# ==================================================================
+# simulator.py — v1.0 (2026-10-17)
+# ==================================================================
+# Deterministic, in-process FF8 menu simulator for offline runs.
+#
+# The Simulator is a keyprog backend (like PdiBackend / Emitter): it
+# receives the same compiled programs and applies every key press to a
+# model of the menus the scripts use — Call Shop, the shop Buy/Sell
+# lists and quantity selectors, the Med-RF refine lists, the Item
+# menu — plus the inventory and gil. Time is virtual: a full
+# max_stat_farm plan runs in seconds.
+#
+# Menu layout and cursor rules come from menu_graph.py. On top of it
+# the simulator models:
+#   - Input latency: menu transitions (opening a shop, a refine list,
+#     a quantity selector, ...) keep the game busy for LATENCY seconds;
+#     keys arriving while busy are DROPPED.
+#   - Input rate: with --input-gap, keys closer together than that to
+#     the previous accepted key are dropped too.
+#   - Frames: with --frame HZ, the menus read input on frame ticks; a
+#     key is handled at the first tick after it arrives, and a second
+#     key before that tick is dropped, and so is a key released
+#     before any tick saw it down. --frame-lock also hands the
+#     script the frame grid (keyprog.FRAME_GRID, frames.py), as a live
+#     run with an estimated grid would; --frame-error MS offsets the
+#     phase the script is given.
+#   - Settling: --settle ends every animation-bound wait once the
+#     transition is over plus settle.py's detection time (SimSettler),
+#     as the live --settle mode does from screen captures.
+#   - Game speed: --boost runs the script with the Remastered speed
+#     booster (its --boost timing profile) against latencies scaled
+#     like the profile (mode_latency); --fps N does the same for a
+#     menu frame rate (the script gets --fps N, so its pause scales).
+#
+# A press with no time between key-down and key-up is dropped with or
+# without --frame: a game that polls the keyboard state cannot see it.
+#
+# Any dropped key, rejected action (buying without gil, refining
+# nothing, confirming an entry with no action) or key pressed after
+# the menus closed is recorded as a desync. So is drift: when the
+# script records its gil/item deltas (telemetry.py), the final gil,
+# stat-ups, Mega Potions and every other item held must match what
+# those deltas expect.
+#
+# Game data below (prices, recipes) is the model's assumption, chosen
+# to match the scripts' own numbers (210k per gil cycle, 1.5M per stat
+# cycle, 25 + 75 Mega Potions, 10 intermediates per stat cycle).
+# An Item menu slot holds at most 100 (ITEM_STACK); more of a stat-up
+# is listed as several slots, full ones first. Using up the selected
+# slot while more is held drops back to the Item list with the next
+# slot under the cursor.
+#
+# Run a script's whole plan on the simulator (answers = the script's
+# prompts, in order):
+#   python simulator.py gil_farm.py 30m max --gil 30m
+#   python simulator.py stat_up_farm.py str 50m --gil 50m
+#   python simulator.py max_stat_farm.py zell str 200 50m y --gil 50m
+#   python simulator.py use_x_stat_boost.py "squall 40, zell 60" --gil 0 --items "Str Up=100"
+#   python simulator.py gil_farm.py 30m max --gil 30m --frame 60 --frame-lock
+#   python simulator.py gil_farm.py 30m max --gil 30m --boost
+#   python simulator.py gil_farm.py 30m 31m --gil 30m --fps 30 --frame 30
+#   python simulator.py gil_farm.py 30m max --gil 30m --settle
+# ==================================================================
+
+import argparse
+import math
+import sys
+import time
+from collections import Counter
+
+import keyprog
+import routines
+import telemetry
+import timing_profile
+from frames import FrameGrid, FrameLock
+from menu_graph import BACK, ENTER, MENUS, STAT_UPS, Link, Menu
+
+# ----------------------------
+# GAME DATA (model assumptions)
+# ----------------------------
+MAX_GIL = 99_999_999
+BUY_LIMIT = 100
+ITEM_STACK = routines.ITEM_STACK  # Item menu slot size; more of a stat-up takes several slots
+
+BUY_PRICES = {
+    "Cottage": 1_500, "Tent": 600,
+    "Giant's Ring": 15_000, "Power Wrist": 15_000,
+    "Force Armlet": 15_000, "Hypno Crown": 15_000,
+}
+SELL_PRICES = {"Mega Potion": 7_500}
+
+# refine list → {source: (count_in, product, count_out)}
+RECIPES = {
+    "refine:Recov Med-RF": {
+        "Tent": (4, "Mega Potion", 1),
+        "Cottage": (4, "Mega Potion", 3),
+    },
+    "refine:GFAbl Med-RF": {
+        "Giant's Ring": (10, "Gaea's Ring", 1),
+        "Power Wrist": (10, "Hyper Wrist", 1),
+        "Force Armlet": (10, "Magic Armlet", 1),
+        "Hypno Crown": (10, "Royal Crown", 1),
+    },
+    "refine:Forbid Med-RF": {
+        "Gaea's Ring": (1, "HP Up", 1),
+        "Hyper Wrist": (10, "Str Up", 1),
+        "Magic Armlet": (10, "Vit Up", 1),
+        "Royal Crown": (10, "Mag Up", 1),
+    },
+}
+
+# Seconds the game ignores input after each transition (~60% of the
+# hand-calibrated wait that guards it in routines.py).
+LATENCY = {
+    "open_abilities": 0.39, "exit_abilities": 0.48,
+    "open_call_shop": 0.24, "exit_call_shop": 0.24,
+    "enter_shop": 0.39, "exit_shop": 0.39,
+    "open_buy": 0.24, "exit_buy": 0.24,
+    "open_sell": 0.24, "exit_sell": 0.24,
+    "open_refine": 0.39, "exit_refine": 0.39,
+    "buy_tab": 0.12, "abilities_left": 0.12, "abilities_right": 0.12,
+    "open_items": 0.39, "exit_items": 0.39,
+    "select_item": 0.12, "exit_target": 0.12,
+    "open_quantity": 0.09, "open_amount": 0.015, "confirm_use": 0.12,
+    "commit_buy": 0.0, "commit_sell": 0.0, "commit_refine": 0.015, "use_item": 0.0,
+}
+
+
+def mode_latency(mode, latency=LATENCY) -> dict:
+    """
+    Transition latencies in a timing_profile.GameMode, scaled like the
+    nav.* wait that guards each transition (others by frame rate only).
+    """
+    fps_only = timing_profile.BASE_FPS / mode.fps
+    return {k: v * (mode.scale(f"nav.{k}") if f"nav.{k}" in routines.WAITS else fps_only)
+            for k, v in latency.items()}
+
+MAX_DESYNC_EVENTS = 20
+
+
+class VirtualClock:
+    def __init__(self, start: float = 0.0):
+        self.t = start
+
+    def now(self) -> float:
+        return self.t
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.t += seconds
+
+    def advance_to(self, t: float) -> None:
+        self.t = max(self.t, t)
+
+
+class Dialog:
+    """An open quantity/amount selector or use confirmation."""
+
+    def __init__(self, kind, item, limit=1, menu=None):
+        self.kind = kind    # "buy", "sell", "refine" or "use"
+        self.item = item
+        self.amount = 1
+        self.limit = limit
+        self.menu = menu    # refine list the recipe comes from
+
+    def __repr__(self):
+        return f"{self.kind} {self.item} x{self.amount}"
+
+
+# Selector steps: shop quantities count with Up, Med-RF amounts with Down.
+SHOP_STEPS = {"up": 10, "down": -10, "right": 1, "left": -1}
+REFINE_STEPS = {"down": 10, "up": -10}
+
+
+class Simulator:
+    def __init__(self, clock=None, latency=None, input_gap: float = 0.0, frame: FrameGrid = None):
+        self.clock = clock or VirtualClock()
+        self.latency = dict(LATENCY, **(latency or {}))
+        self.input_gap = input_gap
+        self.frame = frame  # game frame ticks; None reads input continuously
+        self.lock = None    # FrameLock the script's presses are placed with
+        self.setup()
+
+    # ----------------------------
+    # STATE
+    # ----------------------------
+    def setup(self, start: str = "buy:Esthar Shop!!!/Potion", gil: int = 0,
+              inventory: dict = None, memory: dict = None) -> None:
+        """Reset the game to `start` ("menu/entry") with the given gil and items."""
+        menu, _, label = start.partition("/")
+        self.menu = menu
+        self.inventory = Counter(inventory or {})
+        self.cursor = self.entries().index(label) if label else 0
+        self.memory = dict(memory or {})
+        if not self.memory and menu.startswith(("shop:", "buy:", "sell:")):
+            self.memory["call_shop"] = menu.split(":", 1)[1]
+        self.gil = self.start_gil = gil
+        self.dialog = None
+        # Starting in the target list means a stat-up is already selected.
+        self.using = next((i for i in STAT_UPS if self.inventory[i]), None) if menu == "item_target" else None
+        self.slot_left = min(ITEM_STACK, self.inventory[self.using]) if self.using else 0  # uses left in its slot
+        self.used = Counter()     # (character, item) → count
+        self.busy_until = 0.0
+        self.last_press = None
+        self.down = {}            # key name → virtual time of its key_down()
+        self.last_frame = None
+        self.program = None
+        self.counts = Counter()   # accepted, dropped, rejected, noop
+        self.desyncs = []
+        self.expected = None      # gil/items the script's telemetry expects (None: it records none)
+
+    def entries(self, menu: str = None):
+        """Entries of `menu`; inventory-backed lists are built from the items."""
+        menu = menu or self.menu
+        inv = self.inventory
+        if menu == "refine:GFAbl Med-RF":
+            # Stat-ups from earlier runs sort before the shop items.
+            return ([i for i in STAT_UPS if inv[i]]
+                    + [i for i in RECIPES[menu] if inv[i]] or ["(empty)"])
+        if MENUS[menu].held:
+            return MENUS[menu].held_entries(inv) or ["(empty)"]
+        if menu == "refine:Forbid Med-RF":
+            return (["(forbid 0)"] + [i for i in STAT_UPS if inv[i]]
+                    + [i for i in RECIPES[menu] if inv[i]])
+        if menu == "sell:Esthar Shop!!!":
+            return ["(sell 0)", "(sell 1)"] + [i for i in SELL_PRICES if inv[i]]
+        if menu == "items":
+            # A stat-up over ITEM_STACK fills several slots: full ones first.
+            return [i for i in STAT_UPS for _ in range(-(-inv[i] // ITEM_STACK))] or ["(empty)"]
+        return MENUS[menu].entries
+
+    def _menu(self) -> Menu:
+        base = MENUS[self.menu]
+        entries = self.entries()
+        if entries is base.entries:
+            return base
+        return Menu(entries, base.columns, base.wraps, base.horizontal,
+                    base.remembers, base.switch_waits)
+
+    def describe(self) -> str:
+        if self.menu == "field":
+            return "field (menus closed)"
+        entries = self.entries()
+        label = entries[min(self.cursor, len(entries) - 1)]
+        text = f"{self.menu}/{label}"
+        if self.dialog:
+            text += f" [{self.dialog!r}]"
+        return text
+
+    # ----------------------------
+    # INPUT
+    # ----------------------------
+    def press(self, key: str, t: float, up: float = None) -> None:
+        """Apply one key press arriving at virtual time `t` (released at `up`, if known)."""
+        if up is not None and up <= t:
+            self._desync(key, t, "dropped (zero-length press)", "dropped")
+            return
+        if self.frame is not None:
+            if up is not None and self.frame.slot(up) == self.frame.slot(t):
+                self._desync(key, t, "dropped (released before a frame read it)", "dropped")
+                return
+            slot = self.frame.slot(t)
+            if slot == self.last_frame:
+                self._desync(key, t, "dropped (same frame)", "dropped")
+                return
+            t = self.frame.phase + slot * self.frame.period
+        if t < self.busy_until:
+            self._desync(key, t, "dropped (menu busy)", "dropped")
+            return
+        if self.input_gap and self.last_press is not None and t - self.last_press < self.input_gap:
+            self._desync(key, t, "dropped (too fast)", "dropped")
+            return
+        self.last_press = t
+        if self.frame is not None:
+            self.last_frame = slot
+        self.counts["accepted"] += 1
+        if self.menu == "field":
+            self._desync(key, t, "pressed with menus closed")
+        elif self.dialog is not None:
+            self._dialog_key(key, t)
+        else:
+            self._menu_key(key, t)
+
+    def _busy(self, t: float, transition: str) -> None:
+        self.busy_until = t + self.latency.get(transition, 0.0)
+
+    def _desync(self, key, t, reason, kind="rejected"):
+        self.counts[kind] += 1
+        if len(self.desyncs) < MAX_DESYNC_EVENTS:
+            self.desyncs.append((t, self.program, key, reason, self.describe()))
+
+    def _goto(self, link: Link, t: float) -> None:
+        if MENUS[self.menu].remembers:
+            self.memory[self.menu] = self.entries()[self.cursor]
+        self.menu = link.menu
+        entries = self.entries()
+        if link.cursor is not None:
+            label = link.cursor
+        else:
+            label = self.memory.get(link.menu) if MENUS[link.menu].remembers else None
+        self.cursor = entries.index(label) if label in entries else 0
+        self._busy(t, link.wait)
+
+    def _menu_key(self, key: str, t: float) -> None:
+        menu = self._menu()
+        self.cursor = min(self.cursor, len(menu.entries) - 1)
+        label = menu.entries[self.cursor]
+        if key == "enter":
+            self._enter(label, t)
+        elif key == "c":
+            link = BACK.get(self.menu)
+            if link is not None:
+                self._goto(link, t)
+            elif self.menu == "main":
+                self.menu = "field"
+            else:
+                self._desync(key, t, "no way back")
+        else:
+            for move, cursor, wait in menu.moves(self.cursor):
+                if move == key:
+                    self.cursor = cursor
+                    self._busy(t, wait)
+                    return
+            self.counts["noop"] += 1
+
+    def _enter(self, label: str, t: float) -> None:
+        menu = self.menu
+        if menu.startswith("buy:") and label in BUY_PRICES:
+            limit = min(BUY_LIMIT, self.gil // BUY_PRICES[label])
+            if limit < 1:
+                self._desync("enter", t, f"cannot afford {label}")
+                return
+            self.dialog = Dialog("buy", label, limit)
+            self._busy(t, "open_quantity")
+        elif menu.startswith("sell:") and label in SELL_PRICES:
+            self.dialog = Dialog("sell", label, min(BUY_LIMIT, self.inventory[label]))
+            self._busy(t, "open_quantity")
+        elif menu in RECIPES and label in RECIPES[menu]:
+            limit = self.inventory[label] // RECIPES[menu][label][0]
+            if limit < 1:
+                self._desync("enter", t, f"nothing to refine ({label})")
+                return
+            self.dialog = Dialog("refine", label, limit, menu)
+            self._busy(t, "open_amount")
+        elif menu == "items" and label in STAT_UPS:
+            slot = self.entries()[:self.cursor].count(label)  # slots of this stat-up above the cursor
+            self.using = label
+            self.slot_left = min(ITEM_STACK, self.inventory[label] - slot * ITEM_STACK)
+            self.menu = "item_target"
+            self.cursor = 0
+            self._busy(t, "select_item")
+        elif menu == "item_target":
+            if self.inventory[self.using]:
+                self.dialog = Dialog("use", self.using)
+                self._busy(t, "confirm_use")
+            else:
+                self.counts["noop"] += 1  # all used; extra confirms do nothing
+        elif (menu, label) in ENTER:
+            self._goto(ENTER[menu, label], t)
+        else:
+            self._desync("enter", t, f"no action for {label!r}")
+
+    def _dialog_key(self, key: str, t: float) -> None:
+        dialog = self.dialog
+        if key == "c":
+            self.dialog = None
+            return
+        if key != "enter":
+            steps = REFINE_STEPS if dialog.kind == "refine" else SHOP_STEPS
+            if dialog.kind == "use" or key not in steps:
+                self.counts["noop"] += 1
+                return
+            dialog.amount = min(max(dialog.amount + steps[key], 1), dialog.limit)
+            return
+        inv = self.inventory
+        if dialog.kind == "buy":
+            self.gil -= dialog.amount * BUY_PRICES[dialog.item]
+            inv[dialog.item] += dialog.amount
+            self._busy(t, "commit_buy")
+        elif dialog.kind == "sell":
+            inv[dialog.item] -= dialog.amount
+            self.gil = min(MAX_GIL, self.gil + dialog.amount * SELL_PRICES[dialog.item])
+            self._busy(t, "commit_sell")
+        elif dialog.kind == "refine":
+            count_in, product, count_out = RECIPES[dialog.menu][dialog.item]
+            inv[dialog.item] -= dialog.amount * count_in
+            inv[product] += dialog.amount * count_out
+            self._busy(t, "commit_refine")
+        else:
+            inv[dialog.item] -= 1
+            self.used[MENUS["item_target"].entries[self.cursor], dialog.item] += 1
+            self._busy(t, "use_item")
+            self.slot_left -= 1
+            if not self.slot_left and inv[dialog.item]:
+                # Slot used up with more held: back to the Item list, the
+                # next slot of the item moved up under the cursor.
+                self.dialog = None
+                self._goto(BACK["item_target"], t)
+                self.cursor = self.entries().index(dialog.item)
+                return
+        self.dialog = None
+
+    # ----------------------------
+    # BACKEND INTERFACE
+    # ----------------------------
+    def key_down(self, name: str) -> None:
+        self.down[name] = self.clock.now()
+
+    def key_up(self, name: str) -> None:
+        down = self.down.pop(name, None)
+        if down is not None:
+            self.press(name, down, self.clock.now())
+
+    def run_program(self, program) -> None:
+        self.program = program.name
+        names = keyprog.KEY_NAMES
+        lock = self.lock
+        shift = 0.0  # frame placement so far, as in frames.FrameLockedScheduler
+        t = self.clock.now()
+        for code, hold, delay in program.events:
+            if lock is not None:
+                shift = lock.place(t + shift) - t
+            down = t + shift
+            t += hold
+            if lock is not None:  # key-up is placed too
+                shift = lock.place(t + shift) - t
+            self.press(names[code], down, t + shift)
+            t += delay
+        self.clock.advance_to(t + shift)
+
+    # ----------------------------
+    # EXPECTED STATE (telemetry listener)
+    # ----------------------------
+    def _held(self) -> Counter:
+        """Items held, stat-ups counted together (the scripts' items_delta)."""
+        held = Counter({i: k for i, k in self.inventory.items() if i not in STAT_UPS})
+        held["stat-ups"] = sum(self.inventory[i] for i in STAT_UPS)
+        return held
+
+    def expect(self, record: dict) -> None:
+        """Add a telemetry record's gil/item deltas to the expected final state."""
+        if self.expected is None:
+            self.expected = self._held()
+            self.expected["gil"] = self.start_gil
+        exp = self.expected
+        exp["gil"] = min(MAX_GIL, exp["gil"] + record.get("gil_delta", 0))
+        exp["stat-ups"] += record.get("items_delta", 0)
+        exp["Mega Potion"] += record.get("mega_delta", 0)
+
+    def drift(self):
+        """(what, expected, actual) for each final count off from the expected one."""
+        if self.expected is None:
+            return []
+        actual = self._held()
+        actual["gil"] = self.gil
+        return [(name, self.expected[name], actual[name])
+                for name in sorted(set(self.expected) | set(actual), key=lambda n: (n != "gil", n))
+                if self.expected[name] != actual[name]]
+
+    # ----------------------------
+    # REPORT
+    # ----------------------------
+    def report(self) -> str:
+        c = self.counts
+        drift = self.drift()
+        lines = [
+            f"{'Simulated time:':<22}{self.clock.now():,.2f}s",
+            f"{'Presses:':<22}{c['accepted']:,} accepted, {c['dropped']:,} dropped, "
+            f"{c['rejected']:,} rejected, {c['noop']:,} no-op",
+            f"{'Final state:':<22}{self.describe()}",
+            f"{'Gil:':<22}{self.start_gil:,} → {self.gil:,}",
+            f"{'Inventory:':<22}" + (", ".join(f"{n} x{k}" for n, k in sorted(self.inventory.items()) if k)
+                                     or "(empty)"),
+        ]
+        for (who, item), count in sorted(self.used.items()):
+            lines.append(f"{'Used:':<22}{count}x {item} on {who}")
+        if not self.desyncs and not drift:
+            lines.append(f"{'Desync:':<22}none")
+        else:
+            total = c["dropped"] + c["rejected"] + len(drift)
+            lines.append(f"{'Desync:':<22}{total:,} events (first {len(self.desyncs) + len(drift)}):")
+            for t, program, key, reason, where in self.desyncs:
+                lines.append(f"  {t:>10.3f}s  {program or '-':<24} {key:<6} {reason} @ {where}")
+            for name, expected, actual in drift:
+                lines.append(f"  {'end':>11}  {name + ' drift':<31} script expects {expected:,}, game has {actual:,}")
+        return "\n".join(lines)
+
+
+_default = None
+
+
+def default_simulator() -> Simulator:
+    """Process-wide simulator (keyprog.default_backend("sim"))."""
+    global _default
+    if _default is None:
+        _default = Simulator()
+    return _default
+
+
+# Time settle.py needs to see a finished transition: STABLE_FRAMES
+# still frames at capture.CAPTURE_FPS.
+SETTLE_DETECT_S = 3 / 60
+
+
+class SimSettler:
+    """keyprog.SETTLER for a Simulator: a wait ends when the game is no longer busy."""
+
+    def __init__(self, sim: Simulator, applies=routines.animation_bound, detect: float = SETTLE_DETECT_S):
+        self.sim = sim
+        self.applies = applies
+        self.detect = detect
+        self.saved = 0.0
+
+    def wait(self, name: str, timeout: float) -> None:
+        clock = self.sim.clock
+        now = clock.now()
+        end = min(now + timeout, max(now, self.sim.busy_until) + self.detect)
+        self.saved += now + timeout - end
+        clock.advance_to(end)
+
+
+# ----------------------------
+# SCRIPT RUNNER
+# ----------------------------
+def parse_gil(s: str) -> int:
+    s = s.strip().lower().replace(",", "").replace("_", "")
+    if s == "max":
+        return MAX_GIL
+    scale = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s.rstrip("km")) * scale)
+
+
+START_STATES = {
+    "shop": "buy:Esthar Shop!!!/Potion",
+    "pet": "buy:Esthar Pet Shop/G-Potion",
+    "items": "item_target/Squall",
+}
+
+
+def parse_items(s: str) -> dict:
+    """'Str Up=100, HP Up=50' → {"Str Up": 100, "HP Up": 50}."""
+    items = {}
+    for part in s.split(","):
+        name, _, count = part.partition("=")
+        if name.strip():
+            label = next((i for i in STAT_UPS if i.lower() == name.strip().lower()), None)
+            if label is None:
+                raise ValueError(f"Unknown stat-up {name.strip()!r} (one of {', '.join(STAT_UPS)})")
+            items[label] = int(count)
+    return items
+
+
+class _LineWatcher:
+    """stdout wrapper that hands every printed line to on_line."""
+
+    def __init__(self, out, on_line):
+        self.out = out
+        self.on_line = on_line
+
+    def write(self, text):
+        for line in text.splitlines():
+            self.on_line(line)
+        return self.out.write(text)
+
+    def flush(self):
+        self.out.flush()
+
+
+def run_script(path: str, answers, sim: Simulator, show_output: bool = False, on_line=None,
+               argv=None, settler=None) -> str:
+    """
+    Run a farm script end to end on `sim`: prompts are answered from
+    `answers`, time.sleep/perf_counter follow the virtual clock, and
+    keyprog.default_backend() returns the simulator. With sim.lock set,
+    the script also gets its frame grid as keyprog.FRAME_GRID, and with
+    `settler` set, keyprog.SETTLER. The script's telemetry records go
+    to sim.expect, so sim.report() shows any gil/item drift.
+    on_line(line) sees every line the script prints. argv (e.g.
+    ["--boost"]) replaces the script's command-line flags; None keeps
+    sys.argv as the caller set it. Returns how the script ended.
+    """
+    import builtins
+    import contextlib
+    import io
+    import runpy
+
+    global _default
+    feed = iter(answers)
+
+    def answer(prompt=""):
+        try:
+            value = next(feed)
+        except StopIteration:
+            raise SystemExit(f"no answer left for prompt {prompt!r}") from None
+        print(f"{prompt}{value}")
+        return value
+
+    saved = (builtins.input, time.sleep, time.perf_counter, keyprog.INPUT_BACKEND, keyprog.FRAME_GRID,
+             keyprog.SETTLER, sys.argv, _default, telemetry.LISTENERS[:])
+    builtins.input = answer
+    time.sleep = sim.clock.sleep
+    time.perf_counter = sim.clock.now
+    keyprog.INPUT_BACKEND = "sim"
+    keyprog.FRAME_GRID = sim.lock.grid if sim.lock is not None else None
+    keyprog.SETTLER = settler
+    if argv is not None:
+        sys.argv = [path, *argv]
+    _default = sim
+    telemetry.LISTENERS.append(sim.expect)
+    out = sys.stdout if show_output else io.StringIO()
+    if on_line is not None:
+        out = _LineWatcher(out, on_line)
+    try:
+        with contextlib.redirect_stdout(out):
+            runpy.run_path(path, run_name="__main__")
+        return "completed"
+    except SystemExit as e:
+        return f"exited ({e.code})" if e.code not in (None, 0) else "completed"
+    finally:
+        (builtins.input, time.sleep, time.perf_counter, keyprog.INPUT_BACKEND, keyprog.FRAME_GRID,
+         keyprog.SETTLER, sys.argv, _default, telemetry.LISTENERS[:]) = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a farm script's whole plan on the FF8 menu simulator.")
+    parser.add_argument("script", help="gil_farm.py, stat_up_farm.py, max_stat_farm.py, use_x_stat_boost.py, ...")
+    parser.add_argument("answers", nargs="*", help="answers to the script's prompts, in order")
+    parser.add_argument("--gil", required=True, help="gil in the simulated save (e.g. 30m, max)")
+    parser.add_argument("--start", choices=tuple(START_STATES),
+                        help="starting Buy menu (default: the one the script requires)")
+    parser.add_argument("--items", default="", help="stat-ups in the simulated save (e.g. 'Str Up=100')")
+    parser.add_argument("--input-gap", type=float, default=0.0,
+                        help="drop keys closer than this to the previous key (s)")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="scale every transition latency (e.g. 1.5 for a slower machine)")
+    parser.add_argument("--frame", type=float, metavar="HZ",
+                        help="menus read input on frame ticks at this rate (e.g. 60)")
+    parser.add_argument("--frame-lock", action="store_true",
+                        help="give the script the frame grid, so every press is placed in its own frame")
+    parser.add_argument("--frame-error", type=float, default=0.0, metavar="MS",
+                        help="with --frame-lock: error of the phase the script is given")
+    parser.add_argument("--boost", action="store_true",
+                        help="Remastered speed booster: the script's --boost profile, animations 3x faster")
+    parser.add_argument("--fps", type=int, default=timing_profile.BASE_FPS,
+                        help="game menu frame rate: the script's --fps N profile and pause, latencies scaled "
+                             "(add --frame N to model the ticks)")
+    parser.add_argument("--settle", action="store_true",
+                        help="end animation waits once the transition is over (settle.py)")
+    parser.add_argument("--show-output", action="store_true", help="print the script's own output")
+    args = parser.parse_args()
+
+    gil = parse_gil(args.gil)
+    try:
+        items = parse_items(args.items)
+    except ValueError as e:
+        parser.error(str(e))
+    start = args.start
+    if start is None:
+        script = args.script.replace("\\", "/").rsplit("/", 1)[-1]
+        start = {"gil_farm.py": "shop", "use_x_stat_boost.py": "items"}.get(script, "pet")
+    if args.frame_lock and not args.frame:
+        parser.error("--frame-lock needs --frame")
+    frame = FrameGrid(1 / args.frame) if args.frame else None
+    mode = timing_profile.GameMode("boost" if args.boost else "normal", args.fps)
+    sim = Simulator(latency={k: v * args.latency_scale for k, v in mode_latency(mode).items()},
+                    input_gap=args.input_gap, frame=frame)
+    if args.frame_lock:
+        sim.lock = FrameLock(FrameGrid(frame.period, frame.phase + args.frame_error / 1000))
+    sim.setup(START_STATES[start], gil, items)
+
+    def on_line(line):
+        # max_stat_farm prints the menu it must start in ("REQUIRED: ...").
+        if args.start is None and line.startswith("REQUIRED: "):
+            sim.setup(START_STATES["pet" if "Esthar Pet Shop" in line else "shop"], gil, items)
+
+    real_start = time.perf_counter()
+    settler = SimSettler(sim) if args.settle else None
+    argv = ["--boost"] if args.boost else []
+    if args.fps != timing_profile.BASE_FPS:
+        argv += ["--fps", str(args.fps)]
+    outcome = run_script(args.script, args.answers, sim, args.show_output, on_line,
+                         argv=argv, settler=settler)
+    real_seconds = time.perf_counter() - real_start
+
+    print("==========================================")
+    print(f"Simulated {args.script}: {outcome}")
+    print("------------------------------------------")
+    print(sim.report())
+    if settler is not None:
+        print(f"{'Settle saved:':<22}{settler.saved:,.2f}s")
+    print("------------------------------------------")
+    speedup = sim.clock.now() / real_seconds if real_seconds > 0 else math.inf
+    print(f"{'Real time:':<22}{real_seconds:.2f}s ({speedup:,.0f}x real speed)")
+    print("==========================================")
+
+
+if __name__ == "__main__":
+    import simulator  # run through the importable module so keyprog sees the same instance
+
+    simulator.main()
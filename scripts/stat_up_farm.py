@@ -1,5 +1,5 @@
 # ==================================================================
-# stat_up_farm.py — v1.0 (2026-02-21)
+# stat_up_farm.py — v1.2 (2026-10-17)
 # ==================================================================
 
 # ==================================================================
@@ -30,12 +30,16 @@
 # 4) Keep FF8 focused while running (do not alt-tab). Borderless Windowed is recommended.
 #
 # Runtime prompts:
-#   Stat  — Choose which stat to farm (HP, Str, Vit, Mag).
+#   Stat  — Choose which stat to farm (HP, Str, Vit, Mag), or several
+#           separated by commas/spaces (e.g. "str,vit,mag"): every cycle
+#           then buys all their items in one shop visit and refines them
+#           in one GFAbl Med-RF visit.
 #   Gil   — Enter current gil (e.g. 15m, 99m, max) or press Enter to skip.
 #           When provided, the script calculates how many runs you can afford:
-#             runs = (current_gil - 210k) / 15m  (rounded down)
+#             runs = (current_gil - 210k) / (15m x stats)  (rounded down)
 #           When skipped, it defaults to 1 run.
-#           HP always runs once (inventory fills up; cannot batch further).
+#           HP always runs once, also with other stats (inventory fills up;
+#           cannot batch further).
 #
 # Script structure (each run):
 #   Phase 1 (looped 10 cycles): Buy item → Refine via GFAbl Med-RF → Return to shop.
@@ -48,30 +52,54 @@
 #   Str → Power Wrist   → Hyper Wrist  → Str Up  (10 per run)
 #   Vit → Force Armlet  → Magic Armlet → Vit Up  (10 per run)
 #   Mag → Hypno Crown   → Royal Crown  → Mag Up  (10 per run)
+#
+# LOW JITTER:
+#   `python stat_up_farm.py --low-jitter` freezes the GC, pins the
+#   process to one core and raises timer resolution and priority
+#   where the OS allows (low_jitter.py) for a steadier key timeline.
+#
+# GAME SPEED:
+#   `python stat_up_farm.py --boost` runs with the Remastered speed
+#   booster on (`--fps 30`: menus at 30 fps). Waits come from that
+#   mode's timing profile (timing_profile.py), and so do the ETAs.
+#
+# SETTLE:
+#   `python stat_up_farm.py --settle` ends each menu-transition wait as soon
+#   as the screen has settled (settle.py; Windows, needs NumPy).
+#   The tuned wait stays the timeout.
+#
+# FRAME LOCK:
+#   `python stat_up_farm.py --frame-lock` puts every press in its own game
+#   frame (frames.py; Windows, needs NumPy). The frame grid is fitted
+#   from captured screen changes and re-fitted as the farm runs.
 # ==================================================================
 
 import time
 import re
+import sys
 from datetime import datetime, timedelta
 
-import pydirectinput as pdi
+import frames
+import keyprog
+import low_jitter
+import profiler
+import routines
+import telemetry
+import timing_model
+import timing_profile
 
 # ----------------------------
 # CONFIG
 # ----------------------------
-pdi.PAUSE = 0.02 # Remove built-in delay
 FOCUS_GRACE_SECONDS = 5  # time to click back into FF8 after starting script
 CYCLES = 10
-ESTIMATED_FIRST_RUN = timedelta(seconds=92)
-ESTIMATED_EXTRA_RUN = timedelta(seconds=98)
-TOTAL_COST = 15_000_000  # gil required to complete all cycles
-MIN_GIL_REQUIRED = TOTAL_COST + 210_000  # reserve 210k for mega potion farm startup
+COST_PER_STAT = 15_000_000  # gil required to complete all cycles for one stat
 
 STAT_OPTIONS = {
-    "hp":  {"presses": 4, "item": "Giant's Ring",  "stat_up": "HP Up"},
-    "str": {"presses": 5, "item": "Power Wrist",   "stat_up": "Str Up"},
-    "vit": {"presses": 6, "item": "Force Armlet",  "stat_up": "Vit Up"},
-    "mag": {"presses": 7, "item": "Hypno Crown",   "stat_up": "Mag Up"},
+    "hp":  {"item": "Giant's Ring",  "stat_up": "HP Up",  "per_run": 100},
+    "str": {"item": "Power Wrist",   "stat_up": "Str Up", "per_run": 10},
+    "vit": {"item": "Force Armlet",  "stat_up": "Vit Up", "per_run": 10},
+    "mag": {"item": "Hypno Crown",   "stat_up": "Mag Up", "per_run": 10},
 }
 
 # ----------------------------
@@ -172,16 +200,62 @@ def parse_gil_input(s: str) -> int:
 # ----------------------------
 print("------------------------------------------")
 print("Which stat do you want to farm?")
-print("Options: HP, Str, Vit, Mag")
+print("Options: HP, Str, Vit, Mag (several: e.g. str,vit,mag)")
 print("------------------------------------------")
 
 while True:
-    stat_choice = input("Stat: ").strip().lower()
-    if stat_choice in STAT_OPTIONS:
+    stat_choices = re.split(r"[,\s]+", input("Stat: ").strip().lower())
+    if stat_choices and all(c in STAT_OPTIONS for c in stat_choices):
+        stat_choices = list(dict.fromkeys(stat_choices))
         break
-    print("Invalid choice. Enter one of: HP, Str, Vit, Mag")
+    print("Invalid choice. Enter one or more of: HP, Str, Vit, Mag")
+
+stats = [STAT_OPTIONS[c] for c in stat_choices]
+items = [s["item"] for s in stats]
+stat_ups = ", ".join(s["stat_up"] for s in stats)
+TOTAL_COST = COST_PER_STAT * len(stats)  # gil per run
+MIN_GIL_REQUIRED = TOTAL_COST + 210_000  # reserve 210k for mega potion farm startup
+
+# ----------------------------
+# COMPILE ROUTINES (once)
+# ----------------------------
+MODE = timing_profile.mode_from_argv()  # game speed / frame rate (--boost, --fps N)
+WAITS = timing_profile.load_waits(mode=MODE)  # per-machine tuned waits (tune_delays.py)
+MODEL = timing_model.attach()  # learns each routine's real duration as it runs
+FRAME_LOCK = frames.enable(MODE.fps) if "--frame-lock" in sys.argv[1:] else ""  # before compiling
+
 
-stat = STAT_OPTIONS[stat_choice]
+def compile_stat(name, steps):
+    return keyprog.compile_routine(name, steps, MODE.pause(routines.STAT_PAUSE), waits=WAITS)
+
+
+STAT_CYCLE = {
+    (later, final): compile_stat(
+        "stat_cycle",
+        routines.stat_cycle(items, later_run=later, final=final),
+    )
+    for later in (False, True)
+    for final in (False, True)
+}
+STAT_REFINE = {
+    later: compile_stat("stat_refine", routines.stat_refine(later, count=len(items)))
+    for later in (False, True)
+}
+RUN_TRANSITION = compile_stat("stat_run_transition", routines.stat_run_transition())
+
+# Presses run on a deadline timeline; the timing model adds the
+# overhead this machine has shown on top of the planned duration.
+ESTIMATED_FIRST_RUN = timedelta(seconds=(
+    (CYCLES - 1) * MODEL.predict(STAT_CYCLE[False, False])
+    + MODEL.predict(STAT_CYCLE[False, True])
+    + MODEL.predict(STAT_REFINE[False])
+))
+ESTIMATED_EXTRA_RUN = timedelta(seconds=(
+    (CYCLES - 1) * MODEL.predict(STAT_CYCLE[True, False])
+    + MODEL.predict(STAT_CYCLE[True, True])
+    + MODEL.predict(STAT_REFINE[True])
+    + MODEL.predict(RUN_TRANSITION)
+))
 
 # ----------------------------
 # GIL CHECK (optional)
@@ -208,7 +282,7 @@ while True:
                 f"Insufficient gil: You entered {current_gil:,} gil. "
                 f"You need at least {MIN_GIL_REQUIRED:,} gil."
             )
-        if stat_choice != "hp":
+        if "hp" not in stat_choices:
             outer_loops = (current_gil - 210_000) // TOTAL_COST
         total_cost = outer_loops * TOTAL_COST
         remaining_gil = current_gil - total_cost
@@ -228,22 +302,41 @@ estimated_duration = ESTIMATED_FIRST_RUN + ESTIMATED_EXTRA_RUN * (outer_loops -
 estimated_finish_time = start_time + estimated_duration
 
 print("==========================================")
-print(f"{stat['stat_up']} Farming Script Started")
-log_line("Farming:", f"{stat['item']} → {stat['stat_up']}")
+print(f"{stat_ups} Farming Script Started")
+log_line("Farming:", f"{', '.join(items)} → {stat_ups}")
 log_line("Start Time:", format_timestamp(start_time))
 print("------------------------------------------")
 log_line("Runs:", str(outer_loops))
 log_line("Cycles per run:", str(CYCLES))
+log_line("Timing profile:", timing_profile.describe(WAITS, mode=MODE))
+log_line("Timing model:", MODEL.describe())
 log_line("Estimated duration:", str(estimated_duration))
 log_line("Estimated finish time:", format_timestamp(estimated_finish_time))
 print("==========================================")
 
+backend = keyprog.default_backend()
+if "--low-jitter" in sys.argv[1:]:
+    prepared = low_jitter.warm(backend, (*STAT_CYCLE.values(), *STAT_REFINE.values(), RUN_TRANSITION))
+    log_line("Low jitter:", f"{low_jitter.enable()}; {prepared} programs prepared")
+
+if "--settle" in sys.argv[1:]:
+    import settle
+
+    log_line("Settle:", settle.enable())
+
+if FRAME_LOCK:
+    log_line("Frame lock:", FRAME_LOCK)
+
 print(f"Click into FF8 now. Starting in {FOCUS_GRACE_SECONDS} seconds...")
 time.sleep(FOCUS_GRACE_SECONDS)
 
 run_start_monotonic = time.perf_counter()
+TELEMETRY = telemetry.start("stat_up_farm", WAITS, mode=MODE.key, stats=stat_choices, runs=outer_loops,
+                            plan_seconds=estimated_duration.total_seconds())
+PROFILER = profiler.attach()
 
 for run in range(outer_loops):
+    low_jitter.collect()  # between key programs, never during one
     if outer_loops > 1:
         print(f"--- Run {run + 1}/{outer_loops} ---")
 
@@ -252,79 +345,27 @@ for run in range(outer_loops):
     # Goal: repeatedly buy Entry Item and convert them into Mid Tier Refinement.
     # ============================================================
 
-    for cycle in range(1, CYCLES + 1):
-        cycle_start = time.perf_counter()
-        # ------------------------------------------------------------
-        # PHASE 1.0 — BUY ITEM
-        # Starting state (assumed): Esthar Pet Shop → Buy menu, cursor on "G-Potion"
-        # ------------------------------------------------------------
-
-        pdi.press('right')
-        time.sleep(0.3)
-        for i in range(stat["presses"]):
-            pdi.press('down')
-        pdi.press('enter')
-        time.sleep(0.2)
-        for i in range(10):
-            pdi.press('up')
-        pdi.press('enter')
-
-        # Exit back out of shop menus
-        pdi.press('c')
-        time.sleep(0.4)
-        pdi.press('c')
-        time.sleep(0.65)
-        pdi.press('c')
-        time.sleep(0.4)
-
-        # ------------------------------------------------------------
-        # PHASE 1.2 — REFINE ITEM → Mid Tier Refinement (GFAbl Med-RF)
-        # ------------------------------------------------------------
-
-        pdi.press('right')
-        time.sleep(0.25)
-        for i in range(5):
-            pdi.press('down')
-        pdi.press('enter')
-        time.sleep(0.65)
-        if run > 0:
-            pdi.press('down')
-        pdi.press('enter')
-        time.sleep(0.15)
-        pdi.press('down')
-        pdi.press('enter')
-        time.sleep(0.15)
-
-        # ------------------------------------------------------------
-        # PHASE 1.3 — RETURN TO ESTHAR PET SHOP
-        # ------------------------------------------------------------
-
-        pdi.press('c')
-        time.sleep(0.65)
-        if cycle == CYCLES: #end loop at final cycle to get to phase 2
+    # PHASE 1.0 — BUY ITEM
+    # PHASE 1.2 — REFINE ITEM → Mid Tier Refinement (GFAbl Med-RF)
+    # PHASE 1.3 — RETURN TO ESTHAR PET SHOP (skipped on final cycle)
+    # Starting state (assumed): Esthar Pet Shop → Buy menu, cursor on "G-Potion"
+    # Cycles run back to back on the emitter thread (keyprog.run_ahead).
+    cycle_programs = ((c, STAT_CYCLE[run > 0, c == CYCLES]) for c in range(1, CYCLES + 1))
+    for cycle, job in keyprog.run_ahead(cycle_programs, backend):
+        with PROFILER.phase("Stat cycle", job) as phase:
+            TELEMETRY.record("cycle", phase="stat", run=run + 1, cycle=cycle, gil_delta=-TOTAL_COST // CYCLES)
+        if cycle == CYCLES: #final cycle ends in Abilities: on to phase 2
             break
-        pdi.press('left')
-        time.sleep(0.25)
-        for i in range(5):
-            pdi.press('up')
-        pdi.press('enter')
-        time.sleep(0.4)
-        pdi.press('enter')
-        time.sleep(0.65)
-        pdi.press('enter')
-        time.sleep(0.4)
 
         # ----------------------------
         # PER-CYCLE LOGGING (one line)
         # ----------------------------
-        cycle_end = time.perf_counter()
-        cycle_seconds = cycle_end - cycle_start
-        elapsed = timedelta(seconds=(cycle_end - run_start_monotonic))
+        elapsed = timedelta(seconds=(phase.end - run_start_monotonic))
 
         run_prefix = f"Run: {run + 1}/{outer_loops} | " if outer_loops > 1 else ""
         print(
             f"{run_prefix}"
-            f"Cycle: {cycle}/{CYCLES} ({cycle_seconds:.2f}s) | "
+            f"Cycle: {cycle}/{CYCLES} ({phase.seconds:.2f}s) | "
             f"Elapsed: {format_elapsed(elapsed)}"
         )
 
@@ -332,34 +373,20 @@ for run in range(outer_loops):
     # PHASE 2 — FINAL REFINE (run once after batching)
     # Goal: refine accumulated Mid Tier Refinement into Stat Up (Forbid Med-RF).
     # ============================================================
-    phase2_start = time.perf_counter()
-
-    # Navigate to Forbid Med-RF
-    for i in range(2):
-        pdi.press('up')
-    pdi.press('enter')
-    time.sleep(0.65)
-
-    # Refine to Stat Up
-    pdi.press('down')
-    if run > 0:
-        pdi.press('down')
-    pdi.press('enter')
-    for i in range(10):
-        pdi.press('down')
-    pdi.press('enter')
+    with PROFILER.phase("Stat refine") as phase:
+        # Navigate to Forbid Med-RF → Refine to Stat Up
+        keyprog.run(STAT_REFINE[run > 0], backend)
+        TELEMETRY.record("phase", phase="stat", run=run + 1, items_delta=sum(s["per_run"] for s in stats))
 
     # ----------------------------
     # PHASE 2 LOGGING
     # ----------------------------
-    phase2_end = time.perf_counter()
-    phase2_seconds = phase2_end - phase2_start
-    elapsed = timedelta(seconds=(phase2_end - run_start_monotonic))
+    elapsed = timedelta(seconds=(phase.end - run_start_monotonic))
 
     run_prefix = f"Run: {run + 1}/{outer_loops} | " if outer_loops > 1 else ""
     print(
         f"{run_prefix}"
-        f"Stat Ref: 1/1 ({phase2_seconds:.2f}s) | "
+        f"Stat Ref: 1/1 ({phase.seconds:.2f}s) | "
         f"Elapsed: {format_elapsed(elapsed)}"
     )
 
@@ -369,18 +396,9 @@ for run in range(outer_loops):
     # Target state:   Esthar Pet Shop → Buy menu, cursor on "G-Potion"
     # ============================================================
     if run < outer_loops - 1:
-        pdi.press('c')
-        time.sleep(0.65)
-        pdi.press('left')
-        time.sleep(0.25)
-        for i in range(3):
-            pdi.press('up')
-        pdi.press('enter')
-        time.sleep(0.4)
-        pdi.press('enter')
-        time.sleep(0.65)
-        pdi.press('enter')
-        time.sleep(0.4)
+        with PROFILER.phase("Run transition"):
+            keyprog.run(RUN_TRANSITION, backend)
+            TELEMETRY.record("nav", phase="stat", run=run + 2)
 
 # ----------------------------
 # FINISH LOGGING
@@ -390,7 +408,7 @@ actual_duration = end_time - start_time
 delta = end_time - estimated_finish_time
 
 print("==========================================")
-print(f"{stat['stat_up']} Farming Script Finished")
+print(f"{stat_ups} Farming Script Finished")
 log_line("Finish Time:", format_timestamp(end_time))
 log_line("Actual duration:", str(actual_duration))
 print("------------------------------------------")
@@ -398,3 +416,7 @@ log_line("Estimated duration:", str(estimated_duration))
 log_line("Estimated finish time:", format_timestamp(estimated_finish_time))
 log_line("Estimate error:", format_eta_error(delta))
 print("==========================================")
+print(PROFILER.report())
+print("==========================================")
+
+TELEMETRY.close()
@@ -0,0 +1,225 @@
+# ==================================================================
+# telemetry.py — v1.0 (2026-10-17)
+# ==================================================================
+# Structured event stream for the farm scripts.
+#
+# Every session writes one JSONL file to ~/.ff8-toolkit/telemetry/,
+# one record per line:
+#
+#   {"kind": "cycle", "phase": "gil", "routine": "gil_cycle",
+#    "start": 812.4, "end": 825.6, "actual": 13.2, "planned": 13.15,
+#    "presses": 61, "gil_delta": 352500, "session": "...", "seq": 17,
+#    "profile": "3f2a9c1e", ...}
+#
+#   kind     — session | cycle | phase | nav | items | iteration | end
+#   start/end — time.perf_counter() (monotonic) of the programs run
+#               since the previous record; planned is their duration
+#   profile  — id of the active timing profile (its waits are in the
+#              session record)
+#
+# Program times come from the keyprog observer hook; the scripts add
+# one record() per cycle, phase, navigation, item-use burst and
+# iteration with their gil/item deltas (gil_delta, items_delta for
+# stat-ups, mega_delta for Mega Potions kept). A background thread
+# does the JSON encoding and buffered file writes, off the key
+# timeline; LISTENERS see every record as it is emitted (the
+# simulator checks the deltas against its game state).
+#
+# Analyzer (p50/p95/max per phase, gil/hour and stat-ups/hour):
+#   python telemetry.py                     # every saved session
+#   python telemetry.py FILE.jsonl ... --include-sim
+# ==================================================================
+
+import atexit
+import hashlib
+import json
+import platform
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import keyprog
+from timing_profile import DATA_DIR
+
+TELEMETRY_DIR = DATA_DIR / "telemetry"
+FLUSH_INTERVAL_S = 1.0
+
+# Callables given every record as it is emitted.
+LISTENERS = []
+
+
+def profile_id(waits: dict) -> str:
+    """Short stable id of a set of named waits."""
+    blob = json.dumps(waits, sort_keys=True).encode()
+    return hashlib.sha1(blob).hexdigest()[:8]
+
+
+class _Writer(threading.Thread):
+    """Encodes queued records and appends them to `path`."""
+
+    def __init__(self, path: Path):
+        super().__init__(name="telemetry-writer", daemon=True)
+        self.path = path
+        self.queue = queue.SimpleQueue()
+
+    def run(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                try:
+                    record = self.queue.get(timeout=FLUSH_INTERVAL_S)
+                except queue.Empty:
+                    f.flush()
+                    continue
+                if record is None:
+                    break
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+class Session:
+    """One script run's event stream (see start())."""
+
+    def __init__(self, script: str, waits: dict, path: Path = None, **fields):
+        now = datetime.now().astimezone()
+        self.id = f"{now:%Y%m%d-%H%M%S}-{script}-{uuid.uuid4().hex[:6]}"
+        self.path = path or TELEMETRY_DIR / f"{self.id}.jsonl"
+        self.profile = profile_id(waits)
+        self.seq = 0
+        self._pending = []  # (name, start, end, planned, presses) since the last record
+        self._writer = _Writer(self.path)
+        self._writer.start()
+        self._closed = False
+        self.emit({
+            "kind": "session", "script": script, "machine": platform.node(),
+            "backend": keyprog.INPUT_BACKEND, "wall": now.isoformat(timespec="seconds"),
+            "t": time.perf_counter(), "waits": waits, **fields,
+        })
+
+    def emit(self, record: dict) -> None:
+        self.seq += 1
+        record.update(session=self.id, seq=self.seq, profile=self.profile)
+        for listener in LISTENERS:
+            listener(record)
+        self._writer.queue.put(record)
+
+    def observe(self, program, start: float, end: float) -> None:
+        """keyprog observer: remember the run until the next record()."""
+        self._pending.append((program.name, start, end, program.duration, len(program)))
+
+    def record(self, kind: str, **fields) -> None:
+        """
+        One record for the programs run since the previous record (their
+        span, planned duration and presses) plus `fields`. Records with
+        no programs (iterations) pass start/end/planned themselves.
+        """
+        pending, self._pending = self._pending, []
+        record = {"kind": kind}
+        if pending:
+            names = list(dict.fromkeys(p[0] for p in pending))
+            record.update(
+                routine="+".join(names), start=pending[0][1], end=pending[-1][2],
+                planned=sum(p[3] for p in pending), presses=sum(p[4] for p in pending),
+            )
+        record.update(fields)
+        if "actual" not in record and "start" in record and "end" in record:
+            record["actual"] = record["end"] - record["start"]
+        self.emit(record)
+
+    def close(self, status: str = "completed") -> None:
+        """Write the end record and wait for the writer (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        self.emit({"kind": "end", "status": status, "t": time.perf_counter()})
+        self._writer.queue.put(None)
+        self._writer.join(timeout=5)
+
+
+def start(script: str, waits: dict, **fields) -> Session:
+    """Open a session stream fed by every keyprog.run; closed at exit if not before."""
+    session = Session(script, waits, **fields)
+    keyprog.OBSERVERS.append(session.observe)
+    atexit.register(session.close, "stopped")
+    return session
+
+
+# ----------------------------
+# ANALYZER
+# ----------------------------
+def load_sessions(paths):
+    """{session id: [records]} from JSONL files (truncated lines skipped)."""
+    sessions = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                sessions.setdefault(record.get("session", str(path)), []).append(record)
+    return sessions
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _duration_h(records) -> float:
+    times = [r[k] for r in records for k in ("t", "start", "end") if k in r]
+    return (max(times) - min(times)) / 3600 if times else 0.0
+
+
+def analyze(sessions, include_sim: bool = False) -> None:
+    rows = {}
+    totals = {"hours": 0.0, "gil": 0, "items": 0}
+    print(f"{'Session':<40} {'Status':<10} {'Duration':>9} {'Gil/hour':>13} {'Stat-ups/hour':>14}")
+    print("-" * 90)
+    for sid, records in sorted(sessions.items()):
+        head = next((r for r in records if r.get("kind") == "session"), {})
+        if head.get("backend") == "sim" and not include_sim:
+            continue
+        end = next((r for r in records if r.get("kind") == "end"), {})
+        hours = _duration_h(records)
+        gil = sum(r.get("gil_delta", 0) for r in records if r.get("gil_delta", 0) > 0)
+        items = sum(r.get("items_delta", 0) for r in records if r.get("items_delta", 0) > 0)
+        totals["hours"] += hours
+        totals["gil"] += gil
+        totals["items"] += items
+        rate = (lambda n: f"{n / hours:,.0f}") if hours > 0 else (lambda n: "-")
+        print(f"{sid:<40} {end.get('status', 'stopped'):<10} {hours * 60:>8.1f}m {rate(gil):>13} {rate(items):>14}")
+        for r in records:
+            if "actual" in r and r.get("kind") not in ("session", "end"):
+                key = (r["kind"], r.get("phase", ""), r.get("routine", ""))
+                rows.setdefault(key, []).append(r)
+    if totals["hours"] > 0:
+        print("-" * 90)
+        print(f"{'All sessions':<40} {'':<10} {totals['hours'] * 60:>8.1f}m "
+              f"{totals['gil'] / totals['hours']:>13,.0f} {totals['items'] / totals['hours']:>14,.0f}")
+    print()
+    print(f"{'Kind':<10} {'Phase':<8} {'Routine':<36} {'N':>6} {'p50':>8} {'p95':>8} {'Max':>8} {'Planned':>8}")
+    print("-" * 100)
+    for (kind, phase, routine), recs in sorted(rows.items()):
+        actual = [r["actual"] for r in recs]
+        planned = sum(r.get("planned", 0) for r in recs) / len(recs)
+        print(f"{kind:<10} {phase:<8} {routine[:36]:<36} {len(recs):>6} {percentile(actual, 50):>7.2f}s "
+              f"{percentile(actual, 95):>7.2f}s {max(actual):>7.2f}s {planned:>7.2f}s")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize farm script telemetry (JSONL).")
+    parser.add_argument("files", nargs="*", type=Path,
+                        help=f"session files (default: every file in {TELEMETRY_DIR})")
+    parser.add_argument("--include-sim", action="store_true", help="include simulator sessions")
+    args = parser.parse_args()
+    files = args.files or sorted(TELEMETRY_DIR.glob("*.jsonl"))
+    if not files:
+        raise SystemExit(f"No telemetry in {TELEMETRY_DIR}")
+    analyze(load_sessions(files), args.include_sim)
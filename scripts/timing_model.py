@@ -0,0 +1,157 @@
+# ==================================================================
+# timing_model.py — v1.0 (2026-10-17)
+# ==================================================================
+# Per-machine timing model for the farm scripts' estimates.
+#
+# A program's planned duration (keyprog.Program.duration) leaves out
+# what a real session adds around it: scheduler start-up, input call
+# overhead, the logging and checkpoint writes between programs. The
+# model learns that extra time from every program the scripts run
+# (keyprog observers) and persists it.
+#
+# Programs of one name can differ in length (a partial gil cycle, a
+# use burst of any count), so the extra is fitted per name as a line
+# in the program's press count:
+#
+#   extra = mean_extra + per_press * (presses - mean_presses)
+#
+# from exponentially weighted moments (newest sample weight ALPHA).
+# With every sample at one press count the slope stays 0 and the
+# extra is the moving average, as before:
+#
+#   {
+#     "version": 2,
+#     "machine": "DESKTOP-1234",
+#     "updated": "2026-10-17T12:00:00+00:00",
+#     "routines": {
+#       "gil_cycle": {"extra": 0.031, "presses": 68.0, "per_press": 0.0,
+#                     "var": 0.0, "cov": 0.0, "samples": 412},
+#       "use_burst": {"extra": 0.024, "presses": 61.3, "per_press": 0.00021,
+#                     "var": 980.5, "cov": 0.205905, "samples": 9}, ...}
+#   }
+#
+# Estimates use predict(program) = duration + learned extra, so they
+# tighten as the tool runs. Routines never measured predict their
+# planned duration, as before. A version 1 file (one average per name,
+# whatever the length) is not carried over.
+# ==================================================================
+
+import atexit
+import json
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+
+import keyprog
+from timing_profile import DATA_DIR, atomic_write_json
+
+MODEL_VERSION = 3  # 3: plans hold keys as pydirectinput.press did (earlier extras are off by that)
+MODEL_PATH = DATA_DIR / "timing_model.json"
+
+ALPHA = 0.2               # EWMA weight of the newest sample
+GAP_LIMIT_S = 1.0         # longer gaps before a program are idle time, not overhead
+SAVE_INTERVAL_S = 60.0    # write the model at most this often while learning
+MIN_VAR = 1.0             # press-count variance (presses²) needed to fit a slope
+
+
+class TimingModel:
+    """Per routine: measured-minus-planned seconds as an EWMA line in the press count."""
+
+    def __init__(self, routines: dict = None, path: Path = MODEL_PATH):
+        self.routines = routines if routines is not None else {}
+        self.path = path
+        self._last_end = None
+        self._last_save = time.perf_counter()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> "TimingModel":
+        """Model from `path`, or an empty one if none exists."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path=path)
+        if data.get("version") in (1, 2):
+            return cls(path=path)
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported timing model version in {path}: {data.get('version')!r}")
+        return cls(data.get("routines", {}), path)
+
+    def extra(self, name: str, presses: int) -> float:
+        """Learned seconds a `name` program of `presses` presses takes beyond its plan (0 if unseen)."""
+        entry = self.routines.get(name)
+        if not entry:
+            return 0.0
+        return entry["extra"] + entry["per_press"] * (presses - entry["presses"])
+
+    def predict(self, program) -> float:
+        """Expected wall seconds of `program`."""
+        return program.duration + self.extra(program.name, len(program))
+
+    def observe(self, program, start: float, end: float) -> None:
+        """keyprog observer: fold one measured run into the model."""
+        # The simulator's virtual clock measures exactly the plan.
+        if keyprog.INPUT_BACKEND == "sim":
+            return
+        # Settled waits and frame-locked presses run shorter than the
+        # fixed timeline the model predicts; don't learn from them.
+        if keyprog.SETTLER is not None or keyprog.FRAME_GRID is not None:
+            return
+        seconds = end - start
+        if self._last_end is not None and start - self._last_end <= GAP_LIMIT_S:
+            seconds = end - self._last_end
+        self._last_end = end
+
+        sample = seconds - program.duration
+        presses = len(program)
+        entry = self.routines.get(program.name)
+        if entry is None:
+            self.routines[program.name] = {"extra": sample, "presses": float(presses), "per_press": 0.0,
+                                           "var": 0.0, "cov": 0.0, "samples": 1}
+        else:
+            dx = presses - entry["presses"]
+            dy = sample - entry["extra"]
+            entry["presses"] += ALPHA * dx
+            entry["extra"] += ALPHA * dy
+            entry["var"] = (1 - ALPHA) * (entry["var"] + ALPHA * dx * dx)
+            entry["cov"] = (1 - ALPHA) * (entry["cov"] + ALPHA * dx * dy)
+            entry["per_press"] = entry["cov"] / entry["var"] if entry["var"] >= MIN_VAR else 0.0
+            entry["samples"] += 1
+        self._dirty = True
+        if end - self._last_save >= SAVE_INTERVAL_S:
+            self.save()
+
+    def save(self) -> None:
+        """Write the model atomically (no-op if nothing was learned)."""
+        if not self._dirty:
+            return
+        atomic_write_json(self.path, {
+            "version": MODEL_VERSION,
+            "machine": platform.node(),
+            "updated": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "routines": {
+                name: {"extra": round(e["extra"], 4) or 0.0, "presses": round(e["presses"], 2),
+                       "per_press": round(e["per_press"], 6) or 0.0, "var": round(e["var"], 4),
+                       "cov": round(e["cov"], 6), "samples": e["samples"]}
+                for name, e in self.routines.items()
+            },
+        })
+        self._last_save = time.perf_counter()
+        self._dirty = False
+
+    def describe(self) -> str:
+        """One-line summary for the scripts' startup log."""
+        if not self.routines:
+            return "planned durations (nothing learned yet)"
+        samples = sum(e["samples"] for e in self.routines.values())
+        return f"{self.path} ({len(self.routines)} routines, {samples:,} samples)"
+
+
+def attach(path: Path = MODEL_PATH) -> TimingModel:
+    """Load the model and learn from every keyprog.run until exit."""
+    model = TimingModel.load(path)
+    keyprog.OBSERVERS.append(model.observe)
+    atexit.register(model.save)
+    return model
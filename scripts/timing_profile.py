@@ -0,0 +1,158 @@
+# ==================================================================
+# timing_profile.py — v1.0 (2026-10-17)
+# ==================================================================
+# Per-machine timing profile for the named waits in routines.py.
+#
+# The profile is a small JSON file written by tune_delays.py:
+#
+#   {
+#     "version": 1,
+#     "machine": "DESKTOP-1234",
+#     "updated": "2026-10-17T12:00:00+00:00",
+#     "waits": {"gil.exit_shop": 0.45, ...},
+#     "modes": {"boost@60": {"gil.exit_shop": 0.16, ...}}
+#   }
+#
+# The farm scripts load it once at startup and pass the waits to
+# keyprog.compile_routine. Waits missing from the profile keep their
+# hand-calibrated defaults, so an empty or absent profile changes
+# nothing.
+#
+# "waits" holds normal game speed at 60 fps. Other game modes (the
+# Remastered speed booster, another frame rate) are picked with
+#
+#   python max_stat_farm.py --boost            # speed booster on
+#   python max_stat_farm.py --fps 30           # menus at 30 fps
+#
+# and get their own section under "modes". A wait not tuned for the
+# mode is derived from its normal-speed value: scaled by frame rate,
+# and animation-bound waits (routines.animation_bound) also divided by
+# the booster speed. The per-press pause (GameMode.pause) scales by
+# frame rate too: it has to span the same number of frames. Compiled
+# programs, and every estimate built from them, follow the mode.
+# ==================================================================
+
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+PROFILE_VERSION = 1
+DATA_DIR = Path.home() / ".ff8-toolkit"
+PROFILE_PATH = DATA_DIR / "timing_profile.json"
+
+# Game speed multiplier per mode (the Remastered booster runs 3x).
+SPEEDS = {"normal": 1.0, "boost": 3.0}
+BASE_FPS = 60  # frame rate the default waits were calibrated at
+
+
+class GameMode(NamedTuple):
+    speed: str = "normal"
+    fps: int = BASE_FPS
+
+    @property
+    def key(self) -> str:
+        return f"{self.speed}@{self.fps}"
+
+    def scale(self, name: str) -> float:
+        """Factor applied to the normal-speed value of the named wait."""
+        import routines
+
+        factor = BASE_FPS / self.fps
+        if routines.animation_bound(name):
+            factor /= SPEEDS[self.speed]
+        return factor
+
+    def pause(self, seconds: float) -> float:
+        """Per-press pause for this mode: menus at a lower frame rate read input less often."""
+        return seconds * BASE_FPS / self.fps
+
+
+NORMAL = GameMode()
+
+
+def mode_from_argv(argv=None) -> GameMode:
+    """Game mode from the command line: --boost, --fps N (default NORMAL)."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    speed = "boost" if "--boost" in args else "normal"
+    fps = BASE_FPS
+    if "--fps" in args:
+        i = args.index("--fps")
+        try:
+            fps = int(args[i + 1])
+        except (IndexError, ValueError):
+            raise SystemExit("--fps needs a frame rate, e.g. --fps 30") from None
+    return GameMode(speed, fps)
+
+
+def atomic_write_json(path: Path, data: dict) -> None:
+    """Write JSON via a temp file + os.replace so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load_profile(path: Path = PROFILE_PATH) -> dict:
+    """Return the profile dict, or an empty profile if none exists."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {"version": PROFILE_VERSION, "waits": {}}
+    if data.get("version") != PROFILE_VERSION:
+        raise ValueError(f"Unsupported timing profile version in {path}: {data.get('version')!r}")
+    data.setdefault("waits", {})
+    return data
+
+
+def load_waits(path: Path = PROFILE_PATH, mode: GameMode = NORMAL) -> dict:
+    """
+    Named wait overrides from the profile ({} if none). For any mode
+    but NORMAL every routine wait is returned: tuned for the mode, or
+    derived from its normal-speed value with mode.scale().
+    """
+    data = load_profile(path)
+    waits = {name: float(seconds) for name, seconds in data["waits"].items()}
+    if mode == NORMAL:
+        return waits
+    import routines
+
+    derived = {name: round(waits.get(name, default) * mode.scale(name), 4)
+               for name, default in routines.WAITS.items()}
+    derived.update((name, float(s)) for name, s in data.get("modes", {}).get(mode.key, {}).items())
+    return derived
+
+
+def save_waits(waits: dict, path: Path = PROFILE_PATH, mode: GameMode = NORMAL) -> None:
+    """Merge `waits` into the profile (the mode's section) and write it atomically."""
+    data = load_profile(path)
+    section = data["waits"] if mode == NORMAL else data.setdefault("modes", {}).setdefault(mode.key, {})
+    section.update({name: round(seconds, 4) for name, seconds in waits.items()})
+    data["machine"] = platform.node()
+    data["updated"] = datetime.now().astimezone().isoformat(timespec="seconds")
+    atomic_write_json(path, data)
+
+
+def describe(waits: dict, path: Path = PROFILE_PATH, mode: GameMode = NORMAL) -> str:
+    """One-line summary for the scripts' startup log."""
+    if mode != NORMAL:
+        tuned = len(load_profile(path).get("modes", {}).get(mode.key, {}))
+        return f"{mode.key} ({tuned} tuned waits, others scaled from normal speed)"
+    if not waits:
+        return "defaults (no tuned waits)"
+    return f"{path} ({len(waits)} tuned waits)"
@@ -0,0 +1,364 @@
+# ==================================================================
+# tune_delays.py — v1.0 (2026-10-17)
+# ==================================================================
+# Finds the minimal reliable value of each named wait in the gil and
+# stat farm routines and saves it to the per-machine timing profile
+# (timing_profile.py) that the farm scripts load at startup.
+#
+# For each wait, a search runs down from its current value: it steps
+# down by a quarter of the value and halves the step after every
+# failure, until the step is below `--resolution`. A candidate is
+# accepted only if the success oracle passes `--trials` times in a
+# row, and no candidate is ever more than one step below a value that
+# passed — live trials never run with a zero or far-too-short wait.
+# The accepted value is padded by `--margin` (default 15%) and never
+# exceeds the default.
+#
+# Oracles (--oracle):
+#   model   — deterministic offline menu model; every transition needs
+#             a fixed animation time. Use it to test the search itself.
+#   sim     — runs each trial on the offline menu simulator
+#             (simulator.py); passes when the routine neither desyncs
+#             nor ends anywhere else than it does with the defaults.
+#   manual  — runs the routine live in FF8 and asks you to confirm on
+#             screen that it ended in the expected menu state.
+#   capture — runs the routine live while capturing the game window
+#             (capture.py) and judges each wait from the frames: it
+#             passes when the watched region (settle.REGION) moved
+#             after the press and then held still for
+#             settle.STABLE_FRAMES frames before the wait ended. A
+#             wait whose transition never shows in the region cannot
+#             be judged and is kept at its current value. Windows
+#             only; needs NumPy.
+#   WARNING: live trials buy/sell/refine for real (each stat cycle
+#   costs 1,500,000 gil). Watch every trial.
+#
+# Examples:
+#   python tune_delays.py --oracle model
+#   python tune_delays.py --oracle sim --dry-run
+#   python tune_delays.py --oracle manual --routine gil --waits gil.exit_shop,gil.open_recov
+#   python tune_delays.py --oracle capture --routine gil
+#   python tune_delays.py --oracle manual --routine use    # item-use pacing
+#   python tune_delays.py --oracle manual --boost          # speed booster profile
+#
+# --boost / --fps N tune that game mode's section of the profile; the
+# search starts from the mode's derived waits (timing_profile.py) and
+# the offline oracles scale their transitions the same way.
+# ==================================================================
+
+import argparse
+import math
+import time
+
+import keyprog
+import routines
+import timing_profile
+
+# Esthar Pet Shop item bought by the stat routines.
+STAT_ITEMS = {"hp": "Giant's Ring", "str": "Power Wrist", "vit": "Force Armlet", "mag": "Hypno Crown"}
+
+
+def routine_table(stat_item, mode=timing_profile.NORMAL):
+    """(name, steps, pause, starting state) for each tunable routine group."""
+    gil_pause, stat_pause = mode.pause(routines.GIL_PAUSE), mode.pause(routines.STAT_PAUSE)
+    return {
+        "gil": [
+            ("gil_cycle", routines.gil_cycle(), gil_pause,
+             'Esthar Shop!!! → Buy menu, cursor on "Potion"'),
+        ],
+        "stat": [
+            ("stat_cycle", routines.stat_cycle(stat_item), stat_pause,
+             'Esthar Pet Shop → Buy menu, cursor on "G-Potion"'),
+            ("stat_refine", routines.stat_refine(), stat_pause,
+             "Abilities menu, cursor on GFAbl Med-RF (10 intermediates in inventory)"),
+            ("stat_run_transition", routines.stat_run_transition(), stat_pause,
+             "Abilities menu, inside Forbid Med-RF"),
+        ],
+        "nav": [
+            ("nav_gil_to_stat", routines.nav_gil_to_stat(), stat_pause,
+             'Esthar Shop!!! → Buy menu, cursor on "Potion"'),
+            ("nav_stat_to_items", routines.nav_stat_to_items(1), stat_pause,
+             "Abilities menu, inside Forbid Med-RF (stat-ups in inventory)"),
+            ("nav_items_to_gil", routines.nav_items_to_gil(), stat_pause,
+             "Item menu, character highlighted (last shop called: Esthar Pet Shop)"),
+            ("nav_items_to_stat", routines.nav_items_to_stat(), stat_pause,
+             "Item menu, character highlighted (last shop called: Esthar Pet Shop)"),
+        ],
+        "use": [
+            ("use_burst", routines.use_burst([(1, 3)], 1), stat_pause,
+             "Item menu, stat-up selected, Squall highlighted (uses 3 stat-ups per trial)"),
+        ],
+    }
+
+
+# ----------------------------
+# ORACLES
+# ----------------------------
+class ModelOracle:
+    """
+    Deterministic offline oracle: each named wait guards a menu
+    transition that needs `required[name]` seconds (default: `ratio`
+    of the hand-calibrated value). A trial passes when every wait in
+    the routine, plus the rest of its press (keyprog.press_seconds),
+    covers its transition.
+    """
+
+    def __init__(self, ratio=0.6, required=None):
+        self.required = dict(required or {})
+        self.ratio = ratio
+        self.trials = 0
+
+    def check(self, name, steps, pause, waits) -> bool:
+        self.trials += 1
+        for wait in keyprog.named_waits(steps):
+            need = self.required.get(wait.name, wait.seconds * self.ratio)
+            if keyprog.resolve_wait(wait, waits) + keyprog.press_seconds(pause) < need:
+                return False
+        return True
+
+
+class SimulatorOracle:
+    """
+    Offline oracle on simulator.py: a trial passes when the routine
+    runs with no desync and ends in the same state (menu, gil, items)
+    as it does with the default waits. Cycles run twice back to back
+    and other routines are followed by the first key of the routine
+    that comes next, so their trailing wait is exercised too.
+    """
+
+    REPEAT = {"gil_cycle": 2, "stat_cycle": 2, "use_burst": 2}
+    FOLLOW = {
+        "stat_refine": "c", "stat_run_transition": "right", "nav_gil_to_stat": "right",
+        "nav_stat_to_items": "enter", "nav_items_to_gil": "right",
+        "nav_items_to_stat": "right", "use_burst": "enter",
+    }
+
+    def __init__(self, stat_item="Power Wrist", latency=None):
+        import simulator
+
+        self.simulator = simulator
+        self.sim = simulator.Simulator(latency=latency)
+        mid = simulator.RECIPES["refine:GFAbl Med-RF"][stat_item][1]
+        pet = {"call_shop": "Esthar Pet Shop"}
+        self.starts = {
+            "gil_cycle": ("buy:Esthar Shop!!!/Potion", 1_000_000, {}, None),
+            "stat_cycle": ("buy:Esthar Pet Shop/G-Potion", 3_000_000, {}, pet),
+            "stat_refine": ("abilities/GFAbl Med-RF", 0, {mid: 100}, pet),
+            "stat_run_transition": ("refine:Forbid Med-RF", 0, {}, pet),
+            "nav_gil_to_stat": ("buy:Esthar Shop!!!/Potion", 0, {}, None),
+            "nav_stat_to_items": ("refine:Forbid Med-RF", 0, {"Str Up": 1}, pet),
+            "nav_items_to_gil": ("item_target/Squall", 0, {}, pet),
+            "nav_items_to_stat": ("item_target/Squall", 0, {}, pet),
+            "use_burst": ("item_target/Squall", 0, {"Str Up": 7}, pet),
+        }
+        self.expected = {}
+        self.trials = 0
+
+    def _run(self, name, steps, pause, waits):
+        start, gil, inventory, memory = self.starts[name]
+        sim = self.sim
+        sim.setup(start, gil, inventory, memory)
+        program = keyprog.compile_routine(name, steps, pause, waits=waits)
+        for _ in range(self.REPEAT.get(name, 1)):
+            sim.run_program(program)
+        if name in self.FOLLOW:
+            sim.press(self.FOLLOW[name], sim.clock.now())
+        if sim.desyncs:
+            return None
+        return sim.describe(), sim.gil, sorted((+sim.inventory).items())
+
+    def check(self, name, steps, pause, waits) -> bool:
+        self.trials += 1
+        if name not in self.expected:
+            self.expected[name] = self._run(name, steps, pause, {})
+        result = self._run(name, steps, pause, waits)
+        return result is not None and result == self.expected[name]
+
+
+class ManualOracle:
+    """Runs the routine live and asks the operator whether it landed correctly."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or keyprog.default_backend()
+        self.trials = 0
+
+    def check(self, name, steps, pause, waits) -> bool:
+        self.trials += 1
+        program = keyprog.compile_routine(name, steps, pause, waits=waits)
+        input(f"  Set up for {name}, then press Enter and click into FF8 (3s)...")
+        time.sleep(3)
+        keyprog.run(program, self.backend)
+        while True:
+            answer = input("  Did it end in the expected menu state with nothing misnavigated? (y/n): ")
+            answer = answer.strip().lower()
+            if answer in ("y", "yes"):
+                return True
+            if answer in ("n", "no"):
+                return False
+
+
+class CaptureOracle:
+    """
+    Live oracle that reads the screen instead of asking (see the
+    header). The operator sets up the starting state; routines that
+    end where they start (SimulatorOracle.REPEAT) chain from trial to
+    trial until one fails.
+    """
+
+    def __init__(self, current_waits, backend=None, fps=None):
+        import capture
+        import settle
+
+        self.capture = capture
+        self.settle = settle
+        self.rois = tuple(r for r in capture.window_rois() if r.name == settle.REGION)
+        self.source = capture.GdiSource(self.rois)
+        self.backend = backend or keyprog.default_backend()
+        self.fps = fps or capture.CAPTURE_FPS
+        self.current = dict(current_waits)  # floors for the waits the screen cannot judge
+        self.ready = set()
+        self.trials = 0
+
+    def settled(self, program, start, moves) -> bool:
+        """True if every named wait of `program`, run from `start`, outlasted its transition."""
+        still = self.settle.STABLE_FRAMES / self.fps
+        downs = []
+        t = start
+        for _, hold, delay in program.events:
+            downs.append(t)
+            t += hold + delay
+        downs.append(t)
+        for i, name, seconds in program.waits:
+            end = downs[i + 1]
+            seen = [m for m in moves if downs[i] < m <= end]
+            if not seen:
+                if seconds < self.current.get(name, seconds):
+                    return False
+            elif seen[-1] > end - still:
+                return False
+        return True
+
+    def check(self, name, steps, pause, waits) -> bool:
+        self.trials += 1
+        capture = self.capture
+        program = keyprog.compile_routine(name, steps, pause, waits=waits)
+        if name not in self.ready:
+            input(f"  Set up for {name}, then press Enter and click into FF8 (3s)...")
+            time.sleep(3)
+        ring = capture.FrameRing(self.rois, math.ceil((program.duration + 1) * self.fps))
+        thread = capture.CaptureThread(self.source, ring, self.fps)
+        thread.start()
+        time.sleep(0.1)  # a still frame before the first press
+        start = time.perf_counter()
+        keyprog.run(program, self.backend)
+        thread.stop()
+        ok = self.settled(program, start, self.settle.movement_times(ring))
+        if ok and name in SimulatorOracle.REPEAT:
+            self.ready.add(name)
+        else:
+            self.ready.discard(name)  # a failed trial may have misnavigated
+        return ok
+
+
+# ----------------------------
+# SEARCH
+# ----------------------------
+def bisect_wait(oracle, routine, wait, waits, trials=3, resolution=0.01):
+    """
+    Smallest value of `wait` that passes `trials` consecutive oracle
+    checks, searched downward from its current value (see the header).
+    Returns (value, ok); ok is False if even the current value failed.
+    """
+    name, steps, pause, _ = routine
+
+    def passes(value):
+        candidate = dict(waits)
+        candidate[wait.name] = value
+        return all(oracle.check(name, steps, pause, candidate) for _ in range(trials))
+
+    value = keyprog.resolve_wait(wait, waits)
+    if not passes(value):
+        return value, False
+    step = value / 4
+    while step >= resolution:
+        candidate = round(value - step, 4)
+        if candidate > 0 and passes(candidate):
+            value = candidate
+        else:
+            step /= 2
+    return value, True
+
+
+def padded(value, margin, default):
+    """Apply the safety margin, round up to 5 ms, never exceed the default."""
+    return min(default, math.ceil(value * (1 + margin) * 200) / 200)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune routine waits down to their minimal reliable values.")
+    parser.add_argument("--oracle", choices=("model", "sim", "manual", "capture"), default="model")
+    parser.add_argument("--routine", choices=("gil", "stat", "nav", "use", "all"), default="all")
+    parser.add_argument("--stat", choices=tuple(STAT_ITEMS), default="str",
+                        help="shop item used by the stat routines")
+    parser.add_argument("--waits", default="", help="comma-separated wait names to tune (default: all)")
+    parser.add_argument("--trials", type=int, default=3, help="consecutive passes required")
+    parser.add_argument("--margin", type=float, default=0.15, help="safety margin added to each result")
+    parser.add_argument("--resolution", type=float, default=0.01, help="search stops at this interval (s)")
+    parser.add_argument("--boost", action="store_true", help="tune the speed booster profile")
+    parser.add_argument("--fps", type=int, default=timing_profile.BASE_FPS, help="game menu frame rate")
+    parser.add_argument("--dry-run", action="store_true", help="print results without saving")
+    args = parser.parse_args()
+
+    mode = timing_profile.GameMode("boost" if args.boost else "normal", args.fps)
+    waits = timing_profile.load_waits(mode=mode)
+    if args.oracle == "model":
+        oracle = ModelOracle(required={name: seconds * 0.6 * mode.scale(name)
+                                       for name, seconds in routines.WAITS.items()})
+    elif args.oracle == "sim":
+        import simulator
+
+        oracle = SimulatorOracle(STAT_ITEMS[args.stat], latency=simulator.mode_latency(mode))
+    elif args.oracle == "capture":
+        oracle = CaptureOracle(waits)
+    else:
+        oracle = ManualOracle()
+    table = routine_table(STAT_ITEMS[args.stat], mode)
+    groups = ("gil", "stat", "nav", "use") if args.routine == "all" else (args.routine,)
+    only = {n.strip() for n in args.waits.split(",") if n.strip()}
+
+    tuned = {}
+    if mode != timing_profile.NORMAL:
+        print(f"Game mode: {mode.key}")
+
+    print(f"{'Wait':<24} {'Current':>8} {'Minimal':>8} {'Tuned':>8}")
+    print("-" * 52)
+    done = set()
+    for group in groups:
+        for routine in table[group]:
+            for wait in keyprog.named_waits(routine[1]):
+                if wait.name in done or (only and wait.name not in only):
+                    continue
+                done.add(wait.name)
+                if args.oracle in ("manual", "capture"):
+                    print(f"Tuning {wait.name} in {routine[0]} (start: {routine[3]})")
+                current = keyprog.resolve_wait(wait, waits)
+                minimal, ok = bisect_wait(oracle, routine, wait, waits, args.trials, args.resolution)
+                if not ok:
+                    print(f"{wait.name:<24} {current:>7.3f}s {'FAILED':>8} {'(kept)':>8}")
+                    continue
+                value = padded(minimal, args.margin, wait.seconds * mode.scale(wait.name))
+                waits[wait.name] = value
+                tuned[wait.name] = value
+                print(f"{wait.name:<24} {current:>7.3f}s {minimal:>7.3f}s {value:>7.3f}s")
+
+    print("-" * 52)
+    print(f"Oracle trials: {oracle.trials}")
+    if args.dry_run or not tuned:
+        print("Profile not saved.")
+        return
+    timing_profile.save_waits(tuned, mode=mode)
+    print(f"Saved {len(tuned)} waits to {timing_profile.PROFILE_PATH} ({mode.key})")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,45 +16,92 @@
 # REQUIRED SETUP (before running)
 # ==================================================================
 # Purpose:
-# Rapidly use a stat-boosting item (e.g., HP Up) multiple times on a character.
+# Rapidly use a stat-boosting item (e.g., HP Up) multiple times on one
+# or more characters.
 #
 # Starting state assumptions:
 # 1) Open the Item menu.
 # 2) Select the desired stat-boost item (e.g., HP Up).
-# 3) Highlight the character you want to apply the item to.
+# 3) Highlight the character you want to apply the item to (with
+#    several characters: the first one you enter).
 # 4) Leave the cursor positioned on "Use" / Confirm.
 #
+# Runtime prompt:
+#   Uses — "40" (all on the highlighted character) or
+#          "squall 40, zell 60" (in that order, moving the cursor
+#          between characters).
+#   Slot   — only asked above 100 uses: how many the selected slot
+#            holds. An Item menu slot holds up to 100; when it runs
+#            out, the script selects the item's next slot (which must
+#            follow it in the list) and carries on.
+#
 # Each item use requires TWO confirm presses:
 #   - Confirm character
-#   - Confirm item usage
+#   - Confirm item usage (once the dialog has opened)
+# The gap between them is the use.confirm_use wait, which
+# tune_delays.py can measure for this machine (--routine use).
 # ==================================================================
 
 import time
-import pydirectinput as pdi
 
-# Remove built-in delay
-pdi.PAUSE = 0.00000000001
+import keyprog
+import menu_graph
+import routines
+import timing_profile
+
+CHARACTERS = [c.lower() for c in menu_graph.MENUS["item_target"].entries]
+
 
-# Ask user how many items to use
+def parse_uses(text):
+    """'40' → [(None, 40)]; 'squall 40, zell 60' → [(1, 40), (2, 60)]."""
+    text = text.strip().lower()
+    if text.isdigit():
+        return [(None, int(text))]
+    uses = []
+    for part in text.split(","):
+        name, count = part.split()
+        uses.append((CHARACTERS.index(name) + 1, int(count)))
+    return uses
+
+
+# Ask user how many items to use (and on whom)
 try:
-    uses = int(input("How many items would you like to use? "))
-    if uses <= 0 or uses > 150:
+    uses = parse_uses(input("How many items would you like to use? (e.g. 40, or squall 40, zell 60) "))
+    total = sum(count for _, count in uses)
+    if any(count <= 0 for _, count in uses):
         raise ValueError
 except ValueError:
-    print("Please enter a valid positive integer.")
+    print("Please enter positive counts and character names.")
     exit()
 
-# Each item use requires 2 confirm presses
-total_presses = uses * 2
+slot = routines.ITEM_STACK
+if total > routines.ITEM_STACK:
+    try:
+        slot = int(input(f"How many are in the selected slot? (1-{routines.ITEM_STACK}) "))
+        if not 1 <= slot <= routines.ITEM_STACK:
+            raise ValueError
+    except ValueError:
+        print(f"Please enter a number from 1 to {routines.ITEM_STACK}.")
+        exit()
+
+if uses[0][0] is None:
+    burst = routines.use_burst([(1, total)], 1, slot)
+else:
+    burst = routines.use_burst(uses, uses[0][0], slot)
+MODE = timing_profile.mode_from_argv()  # game speed / frame rate (--boost, --fps N)
+WAITS = timing_profile.load_waits(mode=MODE)  # per-machine tuned waits (tune_delays.py)
+program = keyprog.compile_routine("use_burst", burst, MODE.pause(routines.STAT_PAUSE), waits=WAITS)
+backend = keyprog.default_backend()
 
-print(f"\nUsing item {uses} time(s)...")
+print(f"\nUsing item {total} time(s)...")
 print("Switch to FF8 window now.")
 
 # Give yourself time to click back into FF8
 time.sleep(5)
 
 # Send confirm inputs
-for i in range(total_presses):
-    pdi.press('enter')
+start = time.perf_counter()
+keyprog.run(program, backend)
+seconds = time.perf_counter() - start
 
-print("Done.")
\ No newline at end of file
+print(f"Done. {total} used in {seconds:.2f}s ({total / seconds:.1f}/s).")
@@ -0,0 +1,49 @@
+"""Simulator drift check: final gil/items against the script's telemetry deltas."""
+
+import simulator
+import telemetry
+from conftest import SCRIPTS
+
+
+def test_matching_deltas_leave_no_drift():
+    sim = simulator.Simulator()
+    sim.setup(simulator.START_STATES["shop"], 1_000_000, {"Str Up": 10})
+    sim.expect({"kind": "cycle", "gil_delta": 352_500, "mega_delta": 25})
+    sim.expect({"kind": "items", "items_delta": -10})
+    sim.gil += 352_500
+    sim.inventory["Mega Potion"] += 25
+    sim.inventory["Str Up"] -= 10
+    assert sim.drift() == []
+    assert "Desync:               none" in sim.report()
+
+
+def test_drift_is_reported_as_desync():
+    sim = simulator.Simulator()
+    sim.setup(simulator.START_STATES["shop"], 99_900_000)
+    sim.expect({"kind": "cycle", "gil_delta": 352_500, "mega_delta": 25})  # capped at MAX_GIL
+    sim.gil = simulator.MAX_GIL
+    sim.inventory["Mega Potion"] += 19
+    sim.inventory["Power Wrist"] += 100
+    assert sim.drift() == [("Mega Potion", 25, 19), ("Power Wrist", 0, 100)]
+    report = sim.report()
+    assert "Desync:               2 events" in report
+    assert "Mega Potion drift" in report
+
+
+def test_scripts_without_telemetry_are_not_checked():
+    sim = simulator.Simulator()
+    sim.setup(simulator.START_STATES["items"], 0, {"Str Up": 100})
+    sim.inventory["Str Up"] = 0
+    assert sim.expected is None
+    assert sim.drift() == []
+
+
+def test_gil_farm_ends_where_it_expects(monkeypatch, tmp_path):
+    monkeypatch.setattr(telemetry, "TELEMETRY_DIR", tmp_path)
+    sim = simulator.Simulator()
+    sim.setup(simulator.START_STATES["shop"], 30_000_000)
+    outcome = simulator.run_script(str(SCRIPTS / "gil_farm.py"), ["30m", "32m"], sim, argv=[])
+    assert outcome == "completed"
+    assert sim.expected is not None
+    assert sim.drift() == []
+    assert sim.inventory["Mega Potion"] > 0  # kept from the full cycles
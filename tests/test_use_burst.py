@@ -0,0 +1,65 @@
+"""use_burst on the menu simulator: no press lost, across item slots."""
+
+import pytest
+
+import keyprog
+import routines
+import simulator
+from conftest import SCRIPTS
+
+
+def run_burst(uses, start, inventory, slot=routines.ITEM_STACK):
+    sim = simulator.Simulator()
+    sim.setup(simulator.START_STATES["items"], 0, inventory)
+    program = keyprog.compile_routine("use_burst", routines.use_burst(uses, start, slot), routines.STAT_PAUSE)
+    sim.run_program(program)
+    return sim
+
+
+def assert_clean(sim):
+    assert sim.counts["dropped"] == 0
+    assert sim.counts["rejected"] == 0
+    assert not sim.desyncs
+
+
+def test_one_slot_several_characters():
+    sim = run_burst([(1, 40), (2, 60)], 1, {"Str Up": 100})
+    assert_clean(sim)
+    assert sim.used == {("Squall", "Str Up"): 40, ("Zell", "Str Up"): 60}
+    assert sim.inventory["Str Up"] == 0
+
+
+@pytest.mark.parametrize("uses, held", [
+    ([(1, 150)], 150),                    # runs out mid-character
+    ([(1, 100), (2, 50)], 150),           # runs out between characters
+    ([(1, 30), (2, 130), (3, 90)], 250),  # three slots
+])
+def test_bursts_continue_on_the_next_slot(uses, held):
+    sim = run_burst(uses, 1, {"Str Up": held})
+    assert_clean(sim)
+    targets = simulator.MENUS["item_target"].entries
+    assert sim.used == {(targets[p - 1], "Str Up"): n for p, n in uses}
+    assert sim.inventory["Str Up"] == 0
+    assert sim.describe() == f"item_target/{targets[uses[-1][0] - 1]}"
+
+
+def test_slots_of_one_item_are_listed_separately():
+    sim = simulator.Simulator()
+    sim.setup("items", 0, {"Str Up": 250, "HP Up": 40})
+    assert sim.entries("items") == ["HP Up", "Str Up", "Str Up", "Str Up"]
+
+
+def test_slot_out_of_range_is_rejected():
+    with pytest.raises(ValueError):
+        routines.use_burst([(1, 10)], 1, slot=0)
+    with pytest.raises(ValueError):
+        routines.use_burst([(1, 10)], 1, slot=routines.ITEM_STACK + 1)
+
+
+def test_use_x_stat_boost_over_one_slot():
+    sim = simulator.Simulator()
+    sim.setup(simulator.START_STATES["items"], 0, {"Str Up": 150})
+    outcome = simulator.run_script(str(SCRIPTS / "use_x_stat_boost.py"), ["squall 100, zell 50", "100"], sim, argv=[])
+    assert outcome == "completed"
+    assert_clean(sim)
+    assert sim.used == {("Squall", "Str Up"): 100, ("Zell", "Str Up"): 50}